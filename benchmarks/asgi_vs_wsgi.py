@@ -0,0 +1,190 @@
+"""
+Compare the WSGI and ASGI deployments on the same box.
+
+Starts each server in turn and measures one JSON endpoint (validate_word by
+default) while a number of slow clients hold connections open by trickling
+their request bodies, the way phones on poor connections do. A sync worker
+is tied up by each slow client until its body arrives; the ASGI server keeps
+reading them in the background and carries on answering everyone else.
+
+    python benchmarks/asgi_vs_wsgi.py --workers 2 --concurrency 50 --slow-clients 8
+
+Needs gunicorn (WSGI) and uvicorn (ASGI) installed; either command can be
+replaced with --wsgi-cmd / --asgi-cmd. Uses only the standard library as
+the client so the numbers don't depend on a client package.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shlex
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from client import Connection, build_request, read_response
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+WSGI_CMD = "gunicorn mysite.wsgi:application --workers {workers} --bind 127.0.0.1:{port}"
+ASGI_CMD = "uvicorn mysite.asgi:application --workers {workers} --host 127.0.0.1 --port {port} --no-access-log"
+
+
+async def fast_client(port, path, body, deadline, latencies, errors):
+    """Send requests back to back until the deadline, reusing the connection when allowed"""
+    connection = Connection('127.0.0.1', port)
+    while time.perf_counter() < deadline:
+        try:
+            start = time.perf_counter()
+            status, _headers, _content = await connection.request('POST', path, body)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+        except (OSError, ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+            errors.append(type(exc).__name__)
+            await asyncio.sleep(0.05)
+    connection.close()
+
+
+async def slow_client(port, path, body, deadline, interval):
+    """Send the headers, then one body byte per interval until the deadline"""
+    while time.perf_counter() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            head = build_request('POST', path, body)[:-len(body)]
+            writer.write(head)
+            for byte in body:
+                if time.perf_counter() >= deadline:
+                    break
+                await asyncio.sleep(interval)
+                writer.write(bytes([byte]))
+                await writer.drain()
+            else:
+                await asyncio.wait_for(read_response(reader), 30)
+            writer.close()
+        except (OSError, ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            await asyncio.sleep(0.05)
+
+
+async def run_load(port, args):
+    body = json.dumps({'word': args.word}).encode()
+    latencies, errors = [], []
+
+    # Let the slow clients occupy their connections before measuring
+    slow_deadline = time.perf_counter() + args.warmup + args.duration + 1
+    slow = [
+        asyncio.create_task(slow_client(port, args.path, body * 20, slow_deadline, args.slow_interval))
+        for _ in range(args.slow_clients)
+    ]
+    await asyncio.sleep(args.warmup)
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(
+        fast_client(port, args.path, body, deadline, latencies, errors) for _ in range(args.concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+
+    for task in slow:
+        task.cancel()
+    await asyncio.gather(*slow, return_exceptions=True)
+    return latencies, errors, elapsed
+
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'Server exited with code {process.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server did not start listening on {port}')
+
+
+def benchmark(label, command, args):
+    port = free_port()
+    argv = shlex.split(command.format(workers=args.workers, port=port))
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': args.settings}
+    process = subprocess.Popen(argv, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port, process)
+        latencies, errors, elapsed = asyncio.run(run_load(port, args))
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    return {
+        'server': label,
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed if elapsed else 0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mean_ms': statistics.fmean(latencies) * 1000 if latencies else float('nan'),
+        'errors': len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--path', default='/studio/api/validate-word/')
+    parser.add_argument('--word', default='HELLO')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=50, help='keep-alive clients sending requests back to back')
+    parser.add_argument('--slow-clients', type=int, default=8, help='connections trickling their request body')
+    parser.add_argument('--slow-interval', type=float, default=0.5, help='seconds between slow-client body bytes')
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--warmup', type=float, default=1.0)
+    parser.add_argument('--settings', default='mysite.settings.dev')
+    parser.add_argument('--wsgi-cmd', default=WSGI_CMD)
+    parser.add_argument('--asgi-cmd', default=ASGI_CMD)
+    parser.add_argument('--only', choices=['wsgi', 'asgi'])
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = []
+    for label, command in (('wsgi', args.wsgi_cmd), ('asgi', args.asgi_cmd)):
+        if args.only and args.only != label:
+            continue
+        try:
+            results.append(benchmark(label, command, args))
+        except (OSError, RuntimeError) as exc:
+            print(f'{label}: could not run {command.split()[0]!r}: {exc}', file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f'{args.path}  workers={args.workers} concurrency={args.concurrency} '
+          f'slow_clients={args.slow_clients} duration={args.duration}s')
+    print(f"{'server':<6} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for row in results:
+        print(f"{row['server']:<6} {row['requests']:>9} {row['rps']:>9.0f} {row['p50_ms']:>8.1f} "
+              f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Minimal asyncio HTTP/1.1 client shared by the benchmark scripts.
+
+Standard library only, so load numbers don't depend on a client package
+and the scripts run anywhere Python does.
+"""
+
+import asyncio
+
+
+async def read_response(reader):
+    """Read one response; returns (status, headers, body) with lower-cased header names"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Connection closed')
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _sep, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        parts = []
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            parts.append(await reader.readexactly(size + 2))
+            if size == 0:
+                break
+        body = b''.join(part[:-2] for part in parts)
+    else:
+        body = await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers, body
+
+
+def build_request(method, path, body=b'', headers=None, host='127.0.0.1'):
+    lines = [f'{method} {path} HTTP/1.1', f'Host: {host}', f'Content-Length: {len(body)}']
+    if body:
+        lines.append('Content-Type: application/json')
+    lines.extend(f'{name}: {value}' for name, value in (headers or {}).items())
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+class Connection:
+    """One keep-alive connection; reconnects when the server closes it"""
+
+    def __init__(self, host, port, timeout=30):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=b'', headers=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.timeout
+            )
+        try:
+            self.writer.write(build_request(method, path, body, headers, self.host))
+            status, response_headers, content = await asyncio.wait_for(
+                read_response(self.reader), self.timeout
+            )
+        except BaseException:
+            self.close()
+            raise
+        if 'close' in response_headers.get('connection', '').lower():
+            self.close()
+        return status, response_headers, content
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
@@ -0,0 +1,245 @@
+"""
+Load generator that replays realistic player sessions against a running server.
+
+Sessions arrive at --rate per second (Poisson arrivals, an open model: slow
+responses don't slow the arrivals down, as with real visitors), up to
+--concurrency sessions in flight. Each session follows one flow, chosen by
+--mix weights:
+
+- browse:    home page, game room, a search with search-as-you-type calls
+- crossword: crossword page, puzzle JSON, a couple of answer checks
+- scrabble:  studio page, then several turns, each ending in a burst of
+             parallel validate-word calls (one per word formed on submit)
+
+Pauses between steps are drawn around --think seconds. At the end it
+prints throughput, latency percentiles and error rates per endpoint:
+
+    python manage.py runserver --noreload &   # or gunicorn/uvicorn
+    python benchmarks/loadgen.py --rate 5 --concurrency 100 --duration 60
+
+429 responses (rate limiting) are counted separately from errors.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+from client import Connection
+
+WORDS = [
+    'HELLO', 'QUIZ', 'GARDEN', 'TEA', 'CAT', 'ZEBRA', 'JAM', 'OX', 'QI', 'ROSE',
+    'PLANT', 'WORD', 'TILE', 'STORY', 'MUSIC', 'XYZZY', 'QWRT', 'AAAAB',
+]
+SEARCH_TERMS = ['garden', 'story', 'health', 'travel', 'recipes', 'music', 'crossword', 'scrabble']
+
+
+class Stats:
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.throttled = defaultdict(int)
+        self.sessions = defaultdict(int)
+        self.failed_sessions = 0
+
+    def record(self, endpoint, status, latency):
+        self.latencies[endpoint].append(latency)
+        if status == 429:
+            self.throttled[endpoint] += 1
+        elif status is None or status >= 400:
+            self.errors[endpoint] += 1
+
+    def report(self, elapsed):
+        rows = []
+        for endpoint in sorted(self.latencies):
+            values = sorted(self.latencies[endpoint])
+            count = len(values)
+            rows.append({
+                'endpoint': endpoint,
+                'requests': count,
+                'rps': count / elapsed,
+                'p50_ms': percentile(values, 50) * 1000,
+                'p90_ms': percentile(values, 90) * 1000,
+                'p99_ms': percentile(values, 99) * 1000,
+                'max_ms': values[-1] * 1000,
+                'error_rate': self.errors[endpoint] / count,
+                'throttled': self.throttled[endpoint],
+            })
+        return rows
+
+
+def percentile(ordered, pct):
+    if not ordered:
+        return float('nan')
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Session:
+
+    def __init__(self, args, stats):
+        self.args = args
+        self.stats = stats
+        self.connection = Connection(args.host, args.port, timeout=args.timeout)
+
+    async def think(self):
+        await asyncio.sleep(random.uniform(0.5, 1.5) * self.args.think)
+
+    async def request(self, endpoint, method, path, data=None, connection=None):
+        body = json.dumps(data).encode() if data is not None else b''
+        start = time.perf_counter()
+        status = content = None
+        try:
+            status, _headers, content = await (connection or self.connection).request(method, path, body)
+        except (OSError, ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            pass
+        self.stats.record(endpoint, status, time.perf_counter() - start)
+        return status, content
+
+    async def browse(self):
+        await self.request('GET /', 'GET', '/')
+        await self.think()
+        await self.request('GET /game-room/', 'GET', '/game-room/')
+        await self.think()
+        term = random.choice(SEARCH_TERMS)
+        for length in range(2, min(len(term), 5) + 1):  # typing
+            await self.request('GET /search/autocomplete/', 'GET', '/search/autocomplete/?' + urlencode({'q': term[:length]}))
+            await asyncio.sleep(0.15)
+        await self.request('GET /search/', 'GET', '/search/?' + urlencode({'query': term}))
+
+    async def crossword(self):
+        await self.request('GET /games/crossword/', 'GET', '/games/crossword/')
+        slug = self.args.puzzle
+        if not slug:
+            return
+        status, content = await self.request('GET puzzle', 'GET', f'/games/api/puzzles/{slug}/')
+        if status != 200:
+            return
+        grid = json.loads(content).get('grid', '')
+        for _check in range(2):
+            await self.think()
+            cells = ''.join(c if c == '#' else random.choice('ABCDE-') for c in grid)
+            await self.request('POST puzzle check', 'POST', f'/games/api/puzzles/{slug}/check/', {'cells': cells})
+
+    async def scrabble(self):
+        await self.request('GET /studio/', 'GET', '/studio/')
+        extra = []
+        try:
+            for _turn in range(random.randint(2, 6)):
+                await self.think()
+                # Submitting a move validates every word it forms at once
+                words = random.sample(WORDS, random.randint(1, 4))
+                while len(extra) < len(words) - 1:
+                    extra.append(Connection(self.args.host, self.args.port, timeout=self.args.timeout))
+                connections = [self.connection] + extra
+                await asyncio.gather(*(
+                    self.request('POST validate-word', 'POST', '/studio/api/validate-word/', {'word': word}, conn)
+                    for word, conn in zip(words, connections)
+                ))
+        finally:
+            for conn in extra:
+                conn.close()
+
+    async def run(self, flow):
+        try:
+            await getattr(self, flow)()
+        finally:
+            self.connection.close()
+
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(','):
+        name, _sep, weight = item.partition('=')
+        if name not in ('browse', 'crossword', 'scrabble'):
+            raise argparse.ArgumentTypeError(f'Unknown flow {name!r}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def run(args):
+    stats = Stats()
+    flows, weights = zip(*args.mix.items())
+    limit = asyncio.Semaphore(args.concurrency)
+    tasks = set()
+    dropped = 0
+
+    async def session(flow):
+        try:
+            await Session(args, stats).run(flow)
+            stats.sessions[flow] += 1
+        except Exception:
+            stats.failed_sessions += 1
+        finally:
+            limit.release()
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(random.expovariate(args.rate))
+        if limit.locked():
+            dropped += 1  # at --concurrency: this visitor never got a session
+            continue
+        await limit.acquire()
+        task = asyncio.create_task(session(random.choices(flows, weights)[0]))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.wait(tasks, timeout=args.drain)
+    elapsed = time.perf_counter() - started
+    return stats, elapsed, dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='server to load (http only)')
+    parser.add_argument('--rate', type=float, default=2.0, help='new sessions per second')
+    parser.add_argument('--concurrency', type=int, default=50, help='max sessions in flight')
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds to keep starting sessions')
+    parser.add_argument('--drain', type=float, default=30.0, help='seconds to wait for running sessions at the end')
+    parser.add_argument('--think', type=float, default=1.0, help='mean pause between steps, seconds')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('browse=3,crossword=2,scrabble=5'))
+    parser.add_argument('--puzzle', default='', help='puzzle slug for the crossword API calls')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    if url.scheme != 'http':
+        parser.error('only http:// URLs are supported')
+    args.host, args.port = url.hostname, url.port or 80
+    random.seed(args.seed)
+
+    stats, elapsed, dropped = asyncio.run(run(args))
+    rows = stats.report(elapsed)
+    summary = {
+        'elapsed_s': round(elapsed, 1),
+        'sessions': dict(stats.sessions),
+        'failed_sessions': stats.failed_sessions,
+        'dropped_arrivals': dropped,
+        'endpoints': rows,
+    }
+    if args.json:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+        return
+
+    total = sum(row['requests'] for row in rows)
+    print(f'{elapsed:.1f}s, {total} requests ({total / elapsed:.1f} req/s), sessions {dict(stats.sessions)}, '
+          f'failed {stats.failed_sessions}, dropped arrivals {dropped}')
+    print(f"{'endpoint':<26} {'reqs':>6} {'req/s':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'errors':>7} {'429':>5}")
+    for row in rows:
+        print(f"{row['endpoint']:<26} {row['requests']:>6} {row['rps']:>7.1f} {row['p50_ms']:>8.1f} "
+              f"{row['p90_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f} "
+              f"{row['error_rate']:>6.1%} {row['throttled']:>5}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,11 @@
 from django.contrib import admin
+from .models import Puzzle
 
-# Register your models here.
+
+@admin.register(Puzzle)
+class PuzzleAdmin(admin.ModelAdmin):
+    list_display = ['title', 'slug', 'size', 'is_published', 'publish_date', 'updated_at']
+    list_filter = ['is_published']
+    search_fields = ['title', 'slug']
+    prepopulated_fields = {'slug': ('title',)}
+    readonly_fields = ['etag', 'created_at', 'updated_at']
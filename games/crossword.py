@@ -0,0 +1,125 @@
+"""
+Crossword grid helpers shared by the Puzzle model, the import command and
+the grid filler.
+
+A grid is a flat row-major string of ``size * size`` cells where ``#`` marks a
+black square. Solutions use the same layout with a letter in every open cell.
+Numbering follows the rule crossword.js used to apply in the browser: a cell
+gets a number when it starts an across or a down word of two or more cells.
+"""
+
+BLACK = '#'
+OPEN = '.'
+EMPTY = '-'
+
+
+def grid_from_black_squares(size, black_squares):
+    """Build a grid string from a list of black-square cell indexes."""
+    cells = [OPEN] * (size * size)
+    for index in black_squares:
+        cells[index] = BLACK
+    return ''.join(cells)
+
+
+def black_squares_from_grid(grid):
+    return [i for i, cell in enumerate(grid) if cell == BLACK]
+
+
+def find_slots(size, grid):
+    """
+    Number the grid and return (numbers, slots).
+    numbers: [[cell, number], ...] in reading order
+    slots: {'across': [...], 'down': [...]}, each slot {'number', 'cell', 'length', 'cells'}
+    """
+    def is_open(index):
+        return grid[index] != BLACK
+
+    numbers = []
+    slots = {'across': [], 'down': []}
+    current_number = 1
+
+    for index in range(size * size):
+        if not is_open(index):
+            continue
+        row, col = divmod(index, size)
+
+        across = (
+            (col == 0 or not is_open(index - 1))
+            and col < size - 1 and is_open(index + 1)
+        )
+        down = (
+            (row == 0 or not is_open(index - size))
+            and row < size - 1 and is_open(index + size)
+        )
+        if not (across or down):
+            continue
+
+        if across:
+            cells = []
+            c = col
+            while c < size and is_open(row * size + c):
+                cells.append(row * size + c)
+                c += 1
+            slots['across'].append(
+                {'number': current_number, 'cell': index, 'length': len(cells), 'cells': cells}
+            )
+        if down:
+            cells = []
+            r = row
+            while r < size and is_open(r * size + col):
+                cells.append(r * size + col)
+                r += 1
+            slots['down'].append(
+                {'number': current_number, 'cell': index, 'length': len(cells), 'cells': cells}
+            )
+
+        numbers.append([index, current_number])
+        current_number += 1
+
+    return numbers, slots
+
+
+def compile_puzzle(slug, title, size, grid, solution='', clues=None):
+    """
+    Precompute everything the front end needs to draw a puzzle: grid mask,
+    numbering, word slots and the clue lists exactly as authored. Nothing
+    derived from the solution is included (the JSON is public); answers are
+    checked server-side.
+    """
+    clues = clues or {}
+    numbers, slots = find_slots(size, grid)
+
+    compiled_slots = {}
+    for direction in ('across', 'down'):
+        compiled_slots[direction] = []
+        for slot in slots[direction]:
+            compiled_slots[direction].append(
+                {'number': slot['number'], 'cell': slot['cell'], 'length': slot['length']}
+            )
+
+    return {
+        'slug': slug,
+        'title': title,
+        'size': size,
+        'grid': grid,
+        'numbers': numbers,
+        'slots': compiled_slots,
+        'clues': {direction: clues.get(direction, []) for direction in ('across', 'down')},
+        'hasSolution': bool(solution),
+    }
+
+
+def check_cells(grid, solution, cells):
+    """
+    Compare submitted cells against the solution in a single pass.
+    Returns the indexes of filled-but-wrong cells and how many open cells are filled.
+    """
+    wrong = []
+    filled = 0
+    for index, (expected, given) in enumerate(zip(solution, cells)):
+        if grid[index] == BLACK or given in (EMPTY, OPEN, ' '):
+            continue
+        filled += 1
+        if given.upper() != expected:
+            wrong.append(index)
+    return wrong, filled
@@ -0,0 +1,213 @@
+"""
+Offline crossword grid filler.
+
+Fills the open cells of a black-square pattern with words from a word list
+using backtracking search. Candidates for a slot come from a letter index:
+for every (length, position, letter) there is a bitmask (a Python int) of the
+words of that length with that letter at that position, so the words matching
+a partly filled slot are the AND of a handful of masks. The search always
+fills the most constrained slot next and abandons a word as soon as any
+crossing slot is left with no candidates.
+
+Each grid is an independent search, so the fill_crossword command runs one per
+worker process; see fill_many().
+"""
+
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .crossword import BLACK, find_slots
+
+MAX_CANDIDATES = 40
+
+
+class WordIndex:
+    """Words bucketed by length with a letter/position bitmask index"""
+
+    def __init__(self, words, seed=None):
+        rng = random.Random(seed)
+        self.words = {}
+        self.masks = {}
+        self.full = {}
+
+        by_length = {}
+        for word in words:
+            if word.isalpha() and word.isascii():
+                by_length.setdefault(len(word), []).append(word.upper())
+
+        for length, bucket in by_length.items():
+            # Shuffled so the low bits (tried first) differ from seed to seed
+            bucket = sorted(set(bucket))
+            rng.shuffle(bucket)
+            masks = [{} for _ in range(length)]
+            for bit, word in enumerate(bucket):
+                flag = 1 << bit
+                for position, letter in enumerate(word):
+                    masks[position][letter] = masks[position].get(letter, 0) | flag
+            self.words[length] = bucket
+            self.masks[length] = masks
+            self.full[length] = (1 << len(bucket)) - 1
+
+    def candidates(self, pattern):
+        """Bitmask of words matching pattern, a list with a letter or None per position"""
+        length = len(pattern)
+        mask = self.full.get(length, 0)
+        masks = self.masks.get(length)
+        for position, letter in enumerate(pattern):
+            if letter is not None and mask:
+                mask &= masks[position].get(letter, 0)
+        return mask
+
+    def iter_words(self, length, mask, limit, start=0):
+        """
+        Yield up to limit words whose bits are set in mask, starting from bit
+        start and wrapping around, so different starts give different fills
+        """
+        bucket = self.words[length]
+        high = (mask >> start) << start
+        for part in (high, mask ^ high):
+            while part and limit:
+                low = part & -part
+                yield bucket[low.bit_length() - 1]
+                part ^= low
+                limit -= 1
+
+
+class GridFiller:
+
+    def __init__(self, index, size, grid, seed=None, max_nodes=200_000, time_limit=60.0):
+        self.index = index
+        self.rng = random.Random(seed)
+        self.size = size
+        self.grid = grid
+        self.max_nodes = max_nodes
+        self.deadline = time.monotonic() + time_limit
+
+        _numbers, slots = find_slots(size, grid)
+        self.slots = [slot['cells'] for slot in slots['across'] + slots['down']]
+        self.crossings = {}
+        for slot_id, cells in enumerate(self.slots):
+            for cell in cells:
+                self.crossings.setdefault(cell, []).append(slot_id)
+
+        self.cells = [None] * len(grid)
+        self.open_cells = sum(1 for cell in grid if cell != BLACK)
+        self.filled_slots = set()
+        self.used_words = set()
+        self.nodes = 0
+        self.filled_cells = 0
+        self.best_filled = 0
+
+    def pattern(self, slot_id):
+        return [self.cells[cell] for cell in self.slots[slot_id]]
+
+    def next_slot(self):
+        """Most constrained unfilled slot, or (None, 0) when every slot is filled"""
+        best_id, best_mask, best_count = None, 0, None
+        for slot_id in range(len(self.slots)):
+            if slot_id in self.filled_slots:
+                continue
+            mask = self.index.candidates(self.pattern(slot_id))
+            count = mask.bit_count()
+            if best_count is None or count < best_count:
+                best_id, best_mask, best_count = slot_id, mask, count
+                if count == 0:
+                    break
+        return best_id, best_mask
+
+    def crossings_viable(self, slot_id):
+        for cell in self.slots[slot_id]:
+            for other in self.crossings[cell]:
+                if other != slot_id and other not in self.filled_slots:
+                    if not self.index.candidates(self.pattern(other)):
+                        return False
+        return True
+
+    def place(self, slot_id, word):
+        changed = []
+        for cell, letter in zip(self.slots[slot_id], word):
+            if self.cells[cell] is None:
+                self.cells[cell] = letter
+                changed.append(cell)
+        self.filled_cells += len(changed)
+        self.filled_slots.add(slot_id)
+        self.used_words.add(word)
+        return changed
+
+    def remove(self, slot_id, word, changed):
+        for cell in changed:
+            self.cells[cell] = None
+        self.filled_cells -= len(changed)
+        self.filled_slots.discard(slot_id)
+        self.used_words.discard(word)
+
+    def search(self):
+        self.nodes += 1
+        if self.nodes > self.max_nodes or time.monotonic() > self.deadline:
+            return False
+
+        slot_id, mask = self.next_slot()
+        if slot_id is None:
+            return True
+        if not mask:
+            return False
+
+        length = len(self.slots[slot_id])
+        start = self.rng.randrange(len(self.index.words[length]))
+        for word in self.index.iter_words(length, mask, MAX_CANDIDATES, start):
+            if word in self.used_words:
+                continue
+            changed = self.place(slot_id, word)
+            self.best_filled = max(self.best_filled, self.filled_cells)
+            if self.crossings_viable(slot_id) and self.search():
+                return True
+            self.remove(slot_id, word, changed)
+        return False
+
+    def fill(self):
+        """Return the solution string, or None if no fill was found within the limits"""
+        if not self.search():
+            return None
+        return ''.join(
+            BLACK if self.grid[i] == BLACK else (self.cells[i] or 'A') for i in range(len(self.grid))
+        )
+
+
+# Per-process state for fill_many(): the index is built once per worker, not per grid
+_worker_index = None
+
+
+def _init_worker(words, seed):
+    global _worker_index
+    _worker_index = WordIndex(words, seed=seed)
+
+
+def _fill_one(size, grid, seed, max_nodes, time_limit):
+    started = time.monotonic()
+    filler = GridFiller(
+        _worker_index, size, grid, seed=seed, max_nodes=max_nodes, time_limit=time_limit
+    )
+    solution = filler.fill()
+    return {
+        'seed': seed,
+        'solution': solution,
+        'seconds': time.monotonic() - started,
+        'nodes': filler.nodes,
+        'fill_rate': (filler.open_cells if solution else filler.best_filled) / (filler.open_cells or 1),
+    }
+
+
+def fill_many(size, grid, words, count, workers=None, seed=0, max_nodes=200_000, time_limit=60.0):
+    """
+    Fill count copies of one pattern across a process pool.
+    Yields one result dict per grid as it finishes (seed, solution, seconds, nodes, fill_rate).
+    """
+    words = list(words)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(words, seed)) as pool:
+        futures = [
+            pool.submit(_fill_one, size, grid, seed + n, max_nodes, time_limit)
+            for n in range(count)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,86 @@
+import json
+import os
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from games.crossword import grid_from_black_squares
+from games.filler import fill_many
+from studio.lexicon import WORD_FILE, load_words
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill a black-square pattern (puzzle.json format) with words from a word list. "
+        "Grids are filled in parallel across CPU cores and written as puzzle JSON "
+        "files that import_puzzle can load."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('pattern', help="Puzzle JSON with size and blackSquares (or grid)")
+        parser.add_argument('--count', type=int, default=1, help="Number of grids to fill")
+        parser.add_argument('--words', default=str(WORD_FILE), help="Word list, one word per line")
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes")
+        parser.add_argument('--seed', type=int, default=0, help="Seed of the first grid")
+        parser.add_argument('--max-nodes', type=int, default=200_000, help="Search budget per grid")
+        parser.add_argument('--time-limit', type=float, default=60.0, help="Seconds allowed per grid")
+        parser.add_argument('--output-dir', default='.', help="Where to write the filled puzzles")
+
+    def handle(self, *args, **options):
+        pattern_path = Path(options['pattern'])
+        try:
+            pattern = json.loads(pattern_path.read_text())
+        except (OSError, json.JSONDecodeError) as exc:
+            raise CommandError(f"Could not read {pattern_path}: {exc}")
+
+        size = pattern.get('size', 15)
+        grid = pattern.get('grid') or grid_from_black_squares(size, pattern.get('blackSquares', []))
+        if len(grid) != size * size:
+            raise CommandError(f"Pattern must have exactly {size * size} cells")
+
+        words = load_words(options['words'])
+        if not words:
+            raise CommandError(f"No words found in {options['words']}")
+
+        output_dir = Path(options['output_dir'])
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        self.stdout.write(
+            f"Filling {options['count']} grid(s) from {len(words)} words "
+            f"on {options['workers']} worker(s)..."
+        )
+        started = time.monotonic()
+        filled = 0
+        for result in fill_many(
+            size, grid, words, options['count'],
+            workers=options['workers'],
+            seed=options['seed'],
+            max_nodes=options['max_nodes'],
+            time_limit=options['time_limit'],
+        ):
+            line = (
+                f"seed {result['seed']}: fill rate {result['fill_rate']:.0%}, "
+                f"{result['seconds']:.2f}s, {result['nodes']} nodes"
+            )
+            if not result['solution']:
+                self.stdout.write(self.style.WARNING(f"{line} - no fill found"))
+                continue
+
+            filled += 1
+            solution = result['solution']
+            path = output_dir / f"{pattern_path.stem}-{result['seed']}.json"
+            path.write_text(json.dumps({
+                'title': f"{pattern.get('title', pattern_path.stem)} #{result['seed']}",
+                'size': size,
+                'grid': grid,
+                'solution': [solution[row:row + size] for row in range(0, size * size, size)],
+                'clues': {'across': [], 'down': []},
+            }, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"{line} -> {path}"))
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f"Filled {filled}/{options['count']} grids in {elapsed:.2f}s "
+            f"({elapsed / max(options['count'], 1):.2f}s per grid)"
+        )
@@ -0,0 +1,62 @@
+import json
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.text import slugify
+
+from games.crossword import grid_from_black_squares
+from games.models import Puzzle
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a crossword from JSON in the puzzle.json format "
+        "(title, size, blackSquares, clues and an optional solution)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Path to the puzzle JSON file")
+        parser.add_argument('--slug', help="Slug to store the puzzle under (default: from the title)")
+        parser.add_argument('--unpublished', action='store_true', help="Import without publishing")
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, json.JSONDecodeError) as exc:
+            raise CommandError(f"Could not read {path}: {exc}")
+
+        size = data.get('size', 15)
+        title = data.get('title') or path.stem
+        slug = options['slug'] or slugify(title)
+
+        if 'grid' in data:
+            grid = data['grid']
+        else:
+            black_squares = data.get('blackSquares', [])
+            cells = size * size
+            for index in black_squares:
+                if not isinstance(index, int) or not 0 <= index < cells:
+                    raise CommandError(f"Invalid puzzle: black square {index!r} is not a cell index 0-{cells - 1}")
+            grid = grid_from_black_squares(size, black_squares)
+
+        # Solutions may be one string or a list of row strings
+        solution = data.get('solution', '')
+        if isinstance(solution, list):
+            solution = ''.join(solution)
+
+        puzzle = Puzzle.objects.filter(slug=slug).first() or Puzzle(slug=slug)
+        puzzle.title = title
+        puzzle.size = size
+        puzzle.grid = grid
+        puzzle.solution = solution
+        puzzle.clues = data.get('clues', {})
+        puzzle.is_published = not options['unpublished']
+        try:
+            puzzle.full_clean()
+        except ValidationError as exc:
+            raise CommandError(f"Invalid puzzle: {exc}")
+        puzzle.save()
+
+        self.stdout.write(self.style.SUCCESS(f"Imported '{puzzle.title}' as {puzzle.slug}"))
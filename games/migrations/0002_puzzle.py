@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Puzzle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(max_length=80, unique=True)),
+                ('title', models.CharField(max_length=200)),
+                ('size', models.PositiveSmallIntegerField(default=15)),
+                ('grid', models.TextField()),
+                ('solution', models.TextField(blank=True, help_text='Leave blank if answers are not known')),
+                ('clues', models.JSONField(blank=True, default=dict)),
+                ('is_published', models.BooleanField(default=True)),
+                ('publish_date', models.DateField(blank=True, null=True)),
+                ('compiled', models.TextField(default='', editable=False)),
+                ('etag', models.CharField(default='', editable=False, max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Crossword Puzzle',
+                'verbose_name_plural': 'Crossword Puzzles',
+                'ordering': ['-publish_date', '-created_at'],
+            },
+        ),
+    ]
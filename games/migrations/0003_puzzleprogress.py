@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:13
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0002_puzzle'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PuzzleProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cells', models.CharField(max_length=625)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('puzzle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='games.puzzle')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='puzzle_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Puzzle Progress',
+                'verbose_name_plural': 'Puzzle Progress',
+                'constraints': [models.UniqueConstraint(fields=('user', 'puzzle'), name='unique_puzzle_progress')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+import hashlib
+import json
+
+from django.db import migrations
+
+from games.crossword import compile_puzzle
+
+
+def recompile(apps, schema_editor):
+    # Drop the answer hashes earlier versions put in the public JSON
+    Puzzle = apps.get_model('games', 'Puzzle')
+    for puzzle in Puzzle.objects.all():
+        data = compile_puzzle(puzzle.slug, puzzle.title, puzzle.size, puzzle.grid, puzzle.solution, puzzle.clues)
+        puzzle.compiled = json.dumps(data, separators=(',', ':'))
+        puzzle.etag = hashlib.sha256(puzzle.compiled.encode()).hexdigest()[:32]
+        puzzle.save(update_fields=['compiled', 'etag'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0003_puzzleprogress'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompile, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,15 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
 from wagtail.models import Page
 from wagtail.admin.panels import FieldPanel
 
+from .crossword import BLACK, compile_puzzle
+
 class GameRoomPage(Page):
     # This is your "Bulletin Board" text
     intro_text = models.TextField(
@@ -16,4 +24,86 @@ class GameRoomPage(Page):
         FieldPanel('intro_text'),
     ]
 
-    parent_page_types = ['home.HomePage']
\ No newline at end of file
+    parent_page_types = ['home.HomePage']
+
+
+class Puzzle(models.Model):
+    """
+    A crossword puzzle. The grid and clues are authored (or imported from JSON);
+    the compiled representation served to the browser is rebuilt on every save
+    """
+    slug = models.SlugField(max_length=80, unique=True)
+    title = models.CharField(max_length=200)
+    size = models.PositiveSmallIntegerField(default=15)
+
+    # Row-major cells, '#' = black square, '.' = open (solution: letters instead of '.')
+    grid = models.TextField()
+    solution = models.TextField(blank=True, help_text="Leave blank if answers are not known")
+    clues = models.JSONField(default=dict, blank=True)
+
+    is_published = models.BooleanField(default=True)
+    publish_date = models.DateField(null=True, blank=True)
+
+    # Precomputed at save time (see games.crossword.compile_puzzle)
+    compiled = models.TextField(editable=False, default='')
+    etag = models.CharField(max_length=64, editable=False, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-publish_date', '-created_at']
+        verbose_name = 'Crossword Puzzle'
+        verbose_name_plural = 'Crossword Puzzles'
+
+    def __str__(self):
+        return self.title
+
+    def clean(self):
+        cells = self.size * self.size
+        if len(self.grid) != cells:
+            raise ValidationError({'grid': f"Grid must have exactly {cells} cells"})
+        if self.solution:
+            if len(self.solution) != cells:
+                raise ValidationError({'solution': f"Solution must have exactly {cells} cells"})
+            for grid_cell, answer in zip(self.grid, self.solution):
+                if (grid_cell == BLACK) != (answer == BLACK):
+                    raise ValidationError({'solution': "Solution black squares must match the grid"})
+
+    def compile(self):
+        """Rebuild the compiled JSON and its ETag from the authored fields"""
+        self.solution = self.solution.upper()
+        data = compile_puzzle(self.slug, self.title, self.size, self.grid, self.solution, self.clues)
+        self.compiled = json.dumps(data, separators=(',', ':'))
+        self.etag = hashlib.sha256(self.compiled.encode()).hexdigest()[:32]
+
+    def save(self, *args, **kwargs):
+        self.compile()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'solution', 'compiled', 'etag'}
+        super().save(*args, **kwargs)
+
+
+class PuzzleProgress(models.Model):
+    """
+    A player's partially filled grid, one row per user/puzzle. Cells are stored
+    as a single fixed-length string (same layout as Puzzle.grid, '-' = empty)
+    so a batch of edits is applied in place with one UPDATE; see games.progress
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='puzzle_progress')
+    puzzle = models.ForeignKey(Puzzle, on_delete=models.CASCADE, related_name='progress')
+    cells = models.CharField(max_length=625)
+    updated_at = models.DateTimeField(default=timezone.now)
+    # Set by the first check that finds the grid solved (see games.progress.record_solved)
+    solved_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'puzzle'], name='unique_puzzle_progress'),
+        ]
+        verbose_name = 'Puzzle Progress'
+        verbose_name_plural = 'Puzzle Progress'
+
+    def __str__(self):
+        return f"{self.user} - {self.puzzle}"
@@ -0,0 +1,160 @@
+"""
+Delta-based crossword progress.
+
+The browser sends only the cells that changed since its last save. Each batch
+is applied to the stored cell string with a single UPDATE built from SUBSTR
+slices of the current value around the changed positions, so write volume
+tracks the number of edits rather than the grid size.
+"""
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+from django.utils import timezone
+
+from members.models import PlayerProfile
+from members.stats import GAMES_STARTED
+
+from .crossword import BLACK, EMPTY, OPEN
+from .models import PuzzleProgress
+
+MAX_DELTAS = 625
+
+
+class InvalidDelta(ValueError):
+    pass
+
+
+def blank_cells(grid):
+    return grid.replace(OPEN, EMPTY)
+
+
+def clean_deltas(grid, deltas):
+    """
+    Validate {cell index: letter} from the client and return a sorted list of
+    (index, char) pairs; an empty letter (or null) clears the cell.
+    """
+    if not isinstance(deltas, dict) or len(deltas) > MAX_DELTAS:
+        raise InvalidDelta("Expected an object of at most %d cells" % MAX_DELTAS)
+
+    cleaned = {}
+    for key, letter in deltas.items():
+        try:
+            index = int(key)
+        except (TypeError, ValueError):
+            raise InvalidDelta(f"Bad cell index {key!r}")
+        if not 0 <= index < len(grid) or grid[index] == BLACK:
+            raise InvalidDelta(f"Cell {index} is not an open square")
+        if letter is None:
+            letter = ''
+        if not isinstance(letter, str):
+            raise InvalidDelta(f"Bad letter for cell {index}")
+        letter = letter.strip().upper()
+        if letter and not (len(letter) == 1 and letter.isalpha() and letter.isascii()):
+            raise InvalidDelta(f"Bad letter for cell {index}")
+        cleaned[index] = letter or EMPTY
+    return sorted(cleaned.items())
+
+
+def delta_expression(length, deltas):
+    """
+    Build SUBSTR(cells, ...) || 'A' || SUBSTR(cells, ...) ... for sorted deltas.
+    Runs of adjacent edits collapse into one literal.
+    """
+    parts = []
+    position = 0
+    pending = ''
+    for index, char in deltas:
+        if index != position:
+            if pending:
+                parts.append(Value(pending))
+                pending = ''
+            parts.append(Substr(F('cells'), position + 1, index - position))
+        pending += char
+        position = index + 1
+    if pending:
+        parts.append(Value(pending))
+    if position < length:
+        parts.append(Substr(F('cells'), position + 1, length - position))
+
+    if len(parts) == 1:
+        return parts[0]
+    return Concat(*parts, output_field=models.CharField())
+
+
+def apply_deltas(user, puzzle, deltas):
+    """Apply cleaned deltas to the user's progress row, creating it on first save"""
+    if not deltas:
+        return
+    now = timezone.now()
+    rows = PuzzleProgress.objects.filter(user=user, puzzle=puzzle)
+    expression = delta_expression(len(puzzle.grid), deltas)
+    if rows.update(cells=expression, updated_at=now):
+        return
+
+    cells = list(blank_cells(puzzle.grid))
+    for index, char in deltas:
+        cells[index] = char
+    try:
+        with transaction.atomic():
+            PuzzleProgress.objects.create(user=user, puzzle=puzzle, cells=''.join(cells), updated_at=now)
+    except IntegrityError:
+        # Another request created the row first; apply on top of it
+        rows.update(cells=expression, updated_at=now)
+    else:
+        GAMES_STARTED.inc('crossword')
+
+
+async def aapply_deltas(user, puzzle, deltas):
+    """Async apply_deltas: the common case (row exists) is a single aupdate()"""
+    if not deltas:
+        return
+    rows = PuzzleProgress.objects.filter(user=user, puzzle=puzzle)
+    expression = delta_expression(len(puzzle.grid), deltas)
+    if await rows.aupdate(cells=expression, updated_at=timezone.now()):
+        return
+    # First save creates the row inside a savepoint, which needs a sync thread
+    await sync_to_async(apply_deltas)(user, puzzle, deltas)
+
+
+def record_solved(user, puzzle):
+    """
+    Mark the player's progress on puzzle solved. The first time, log a won
+    crossword (a GameResult, counted in games_completed_total); returns
+    whether it was the first time
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        rows = PuzzleProgress.objects.filter(user=user, puzzle=puzzle, solved_at__isnull=True)
+        if not rows.update(solved_at=now, updated_at=now):
+            try:
+                with transaction.atomic():
+                    PuzzleProgress.objects.create(
+                        user=user, puzzle=puzzle, cells=puzzle.solution, updated_at=now, solved_at=now
+                    )
+            except IntegrityError:
+                return False  # solved before
+            GAMES_STARTED.inc('crossword')
+        profile = PlayerProfile.objects.select_for_update().filter(user=user).first()
+        if profile is not None:
+            profile.record_game_played('crossword', won=True)
+    return True
+
+
+def get_cells(user, puzzle):
+    cells = (
+        PuzzleProgress.objects.filter(user=user, puzzle=puzzle)
+        .values_list('cells', flat=True)
+        .first()
+    )
+    return cells or blank_cells(puzzle.grid)
+
+
+async def aget_cells(user, puzzle):
+    cells = await (
+        PuzzleProgress.objects.filter(user=user, puzzle=puzzle)
+        .values_list('cells', flat=True)
+        .afirst()
+    )
+    return cells or blank_cells(puzzle.grid)
@@ -1,59 +1,92 @@
-/* C:\addendum\games\static\games\js\crossword.js 
+/* C:\addendum\games\static\games\js\crossword.js
    DATE: January 30, 2026
    TIME: 5:30 PM
-   SYNC: Fixed clue injection to preserve faceted HTML headers. 
+   SYNC: Fixed clue injection to preserve faceted HTML headers.
          Added dynamic grid column scaling based on JSON data.
+   SYNC: Loads the compiled puzzle from the games API (numbering comes
+         precomputed from the server) and checks answers server-side.
+   SYNC: Autosaves progress by posting only the changed cells, debounced.
 */
 
+const SAVE_DELAY_MS = 1500;
+
 async function initGame() {
+    const container = document.getElementById('grid-container');
+    const puzzleUrl = (container && container.dataset.puzzleUrl) || '/static/games/js/puzzle.json';
     try {
-        const response = await fetch('/static/games/js/puzzle.json');
+        const response = await fetch(puzzleUrl);
         const data = await response.json();
         renderGrid(data);
         renderClues(data);
-    } catch (e) { 
-        console.error("Layout Error: Could not load puzzle.json", e); 
+        initCheckButton(data);
+        initProgressSync();
+    } catch (e) {
+        console.error("Layout Error: Could not load puzzle", e);
+    }
+}
+
+function getBlackSquares(data) {
+    // Compiled puzzles carry a '#'/'.' grid string; the legacy JSON a list of indexes
+    if (data.grid) {
+        const black = new Set();
+        for (let i = 0; i < data.grid.length; i++) {
+            if (data.grid[i] === '#') black.add(i);
+        }
+        return black;
+    }
+    return new Set(data.blackSquares);
+}
+
+function computeNumbers(size, black) {
+    // Fallback for puzzles that don't ship precomputed numbering
+    const numbers = new Map();
+    let currentNumber = 1;
+    for (let i = 0; i < size * size; i++) {
+        if (black.has(i)) continue;
+        const r = Math.floor(i / size);
+        const c = i % size;
+        const isAcrossStart = (c === 0 || black.has(i - 1)) &&
+                              (c < size - 1 && !black.has(i + 1));
+        const isDownStart = (r === 0 || black.has(i - size)) &&
+                            (r < size - 1 && !black.has(i + size));
+        if (isAcrossStart || isDownStart) {
+            numbers.set(i, currentNumber++);
+        }
     }
+    return numbers;
 }
 
 function renderGrid(data) {
     const container = document.getElementById('grid-container');
     if (!container) return;
-    
+
     // Dynamic Grid Setup: Adjust columns based on the puzzle size in JSON
     const size = data.size || 15; // Default to 15 if not specified
     container.style.gridTemplateColumns = `repeat(${size}, 1fr)`;
-    container.innerHTML = ''; 
+    container.innerHTML = '';
 
-    let currentNumber = 1;
+    const black = getBlackSquares(data);
+    const numbers = data.numbers ? new Map(data.numbers) : computeNumbers(size, black);
     const totalCells = size * size;
 
     for (let i = 0; i < totalCells; i++) {
         const cell = document.createElement('div');
-        
-        if (data.blackSquares.includes(i)) {
+
+        if (black.has(i)) {
             cell.className = 'cell black-square';
         } else {
             cell.className = 'cell';
-            const r = Math.floor(i / size);
-            const c = i % size;
 
-            // Logic to determine if a cell needs a number
-            const isAcrossStart = (c === 0 || data.blackSquares.includes(i - 1)) && 
-                                  (c < size - 1 && !data.blackSquares.includes(i + 1));
-            const isDownStart = (r === 0 || data.blackSquares.includes(i - size)) && 
-                                (r < size - 1 && !data.blackSquares.includes(i + size));
-
-            if (isAcrossStart || isDownStart) {
+            if (numbers.has(i)) {
                 const num = document.createElement('span');
                 num.className = 'cell-number';
-                num.textContent = currentNumber;
+                num.textContent = numbers.get(i);
                 cell.appendChild(num);
-                currentNumber++;
             }
 
             const input = document.createElement('input');
             input.maxLength = 1;
+            input.dataset.index = i;
             cell.appendChild(input);
         }
         container.appendChild(cell);
@@ -84,4 +117,114 @@ function renderClues(data) {
     }
 }
 
-initGame();
\ No newline at end of file
+function collectCells(data) {
+    // One character per cell: '#' black, '-' empty, otherwise the letter typed
+    const size = data.size || 15;
+    const cells = new Array(size * size).fill('#');
+    document.querySelectorAll('#grid-container input').forEach(input => {
+        const value = input.value.trim().toUpperCase();
+        cells[Number(input.dataset.index)] = value || '-';
+    });
+    return cells.join('');
+}
+
+function initCheckButton(data) {
+    const container = document.getElementById('grid-container');
+    const button = document.getElementById('check-answers');
+    const checkUrl = container && container.dataset.checkUrl;
+    if (!button || !checkUrl || !data.hasSolution) return;
+
+    button.hidden = false;
+    button.addEventListener('click', async () => {
+        try {
+            const response = await fetch(checkUrl, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ cells: collectCells(data) })
+            });
+            const result = await response.json();
+            const wrong = new Set(result.wrong || []);
+
+            document.querySelectorAll('#grid-container input').forEach(input => {
+                input.parentElement.classList.toggle('cell-wrong', wrong.has(Number(input.dataset.index)));
+            });
+
+            if (result.correct) {
+                button.textContent = 'Solved!';
+            }
+        } catch (e) {
+            console.error("Check Error: Could not check answers", e);
+        }
+    });
+}
+
+function getCookie(name) {
+    const match = document.cookie.match(new RegExp('(?:^|; )' + name + '=([^;]*)'));
+    return match ? decodeURIComponent(match[1]) : null;
+}
+
+async function initProgressSync() {
+    const container = document.getElementById('grid-container');
+    const progressUrl = container && container.dataset.progressUrl;
+    if (!progressUrl) return;
+
+    const inputs = new Map();
+    container.querySelectorAll('input').forEach(input => {
+        inputs.set(Number(input.dataset.index), input);
+    });
+
+    // Restore saved cells
+    try {
+        const response = await fetch(progressUrl);
+        if (!response.ok) return;
+        const saved = (await response.json()).cells || '';
+        inputs.forEach((input, index) => {
+            const letter = saved[index];
+            if (letter && letter !== '-' && letter !== '#') input.value = letter;
+        });
+    } catch (e) {
+        console.error("Progress Error: Could not load saved progress", e);
+        return;
+    }
+
+    // Only cells edited since the last save are sent, batched after a pause in typing
+    let pending = {};
+    let timer = null;
+
+    async function flush(keepalive = false) {
+        clearTimeout(timer);
+        const cells = pending;
+        if (Object.keys(cells).length === 0) return;
+        pending = {};
+        try {
+            const response = await fetch(progressUrl, {
+                method: 'POST',
+                keepalive: keepalive,
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': getCookie('csrftoken'),
+                },
+                body: JSON.stringify({ cells: cells })
+            });
+            if (!response.ok && response.status >= 500) {
+                pending = { ...cells, ...pending };  // retry with the next batch
+            }
+        } catch (e) {
+            pending = { ...cells, ...pending };
+        }
+    }
+
+    container.addEventListener('input', (event) => {
+        const input = event.target;
+        if (!input.dataset || input.dataset.index === undefined) return;
+        pending[input.dataset.index] = input.value.trim().toUpperCase();
+        clearTimeout(timer);
+        timer = setTimeout(flush, SAVE_DELAY_MS);
+    });
+
+    document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'hidden') flush(true);
+    });
+}
+
+initGame();
@@ -1,3 +1,175 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
 from django.test import TestCase
+from django.urls import reverse
+
+from members.models import GameResult
+from members.stats import GAMES_COMPLETED
+
+from .crossword import find_slots, grid_from_black_squares
+from .filler import GridFiller, WordIndex
+from .models import Puzzle, PuzzleProgress
+
+PUZZLE_JSON = Path(__file__).parent / 'static' / 'games' / 'js' / 'puzzle.json'
+
+
+class CrosswordCompileTests(TestCase):
+
+    def test_numbering_matches_word_starts(self):
+        # 3x3 with a black centre: four 3-letter words around the edge
+        grid = grid_from_black_squares(3, [4])
+        numbers, slots = find_slots(3, grid)
+        self.assertEqual(numbers, [[0, 1], [2, 2], [6, 3]])
+        self.assertEqual([s['cells'] for s in slots['across']], [[0, 1, 2], [6, 7, 8]])
+        self.assertEqual([s['cells'] for s in slots['down']], [[0, 3, 6], [2, 5, 8]])
+
+
+class PuzzleApiTests(TestCase):
+
+    def setUp(self):
+        self.puzzle = Puzzle.objects.create(
+            slug='tiny', title='Tiny', size=3,
+            grid='....#....', solution='CATO#ATAB',
+            clues={'across': [{'number': 1, 'clue': 'Feline'}], 'down': []},
+        )
+
+    def test_compiled_on_save(self):
+        data = json.loads(self.puzzle.compiled)
+        self.assertEqual(data['numbers'][0], [0, 1])
+        self.assertTrue(data['hasSolution'])
+        self.assertNotIn('CAT', self.puzzle.compiled)
+        # Nothing derived from the answers either: the JSON is public
+        self.assertNotIn('hash', data['slots']['across'][0])
+        self.assertEqual(len(self.puzzle.etag), 32)
+
+    def test_detail_uses_etag(self):
+        url = reverse('games:puzzle_detail', args=['tiny'])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['slug'], 'tiny')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_check_reports_wrong_cells(self):
+        url = reverse('games:puzzle_check', args=['tiny'])
+        response = self.client.post(url, json.dumps({'cells': 'CAX-#----'}), content_type='application/json')
+        self.assertEqual(response.json(), {'correct': False, 'complete': False, 'filled': 3, 'wrong': [2]})
+
+        response = self.client.post(url, json.dumps({'cells': self.puzzle.solution}), content_type='application/json')
+        self.assertTrue(response.json()['correct'])
+
+    def test_first_correct_check_records_a_won_game(self):
+        user = User.objects.create_user('solver', password='pw')
+        self.client.force_login(user)
+        url = reverse('games:puzzle_check', args=['tiny'])
+        completed = GAMES_COMPLETED.values.get(('crossword', 'won'), 0)
+        for _check in range(2):
+            response = self.client.post(url, json.dumps({'cells': self.puzzle.solution}),
+                                        content_type='application/json')
+            self.assertTrue(response.json()['correct'])
+        self.assertIsNotNone(PuzzleProgress.objects.get(user=user).solved_at)
+        self.assertEqual(GameResult.objects.filter(user=user, game='crossword', won=True).count(), 1)
+        self.assertEqual(GAMES_COMPLETED.values[('crossword', 'won')], completed + 1)
+
+    def test_check_rejects_wrong_length(self):
+        url = reverse('games:puzzle_check', args=['tiny'])
+        response = self.client.post(url, json.dumps({'cells': 'CAT'}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_check_rejects_non_object_bodies(self):
+        url = reverse('games:puzzle_check', args=['tiny'])
+        for body in ('[]', '"x"', '1'):
+            response = self.client.post(url, body, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+
+
+class ImportPuzzleCommandTests(TestCase):
+
+    def test_imports_static_puzzle(self):
+        call_command('import_puzzle', str(PUZZLE_JSON), slug='master-grid', stdout=StringIO())
+        puzzle = Puzzle.objects.get(slug='master-grid')
+        self.assertEqual(puzzle.grid.count('#'), len(json.loads(PUZZLE_JSON.read_text())['blackSquares']))
+        self.assertFalse(json.loads(puzzle.compiled)['hasSolution'])
+
+    def test_rejects_black_squares_outside_the_grid(self):
+        for index in (9, -1):
+            with self.subTest(index=index), tempfile.NamedTemporaryFile('w', suffix='.json') as handle:
+                json.dump({'title': 'Tiny', 'size': 3, 'blackSquares': [4, index]}, handle)
+                handle.flush()
+                with self.assertRaises(CommandError):
+                    call_command('import_puzzle', handle.name, stdout=StringIO())
+        self.assertFalse(Puzzle.objects.exists())
+
+
+class GridFillerTests(TestCase):
+
+    def test_fills_every_slot_with_distinct_words(self):
+        grid = grid_from_black_squares(3, [4])
+        index = WordIndex(['CAT', 'COT', 'TAB', 'BAT', 'TUB', 'CUB', 'BOX'], seed=1)
+        solution = GridFiller(index, 3, grid, seed=1).fill()
+        self.assertIsNotNone(solution)
+
+        _numbers, slots = find_slots(3, grid)
+        words = [''.join(solution[c] for c in slot['cells']) for slot in slots['across'] + slots['down']]
+        self.assertEqual(len(set(words)), 4)
+        self.assertTrue(set(words) <= {'CAT', 'COT', 'TAB', 'BAT', 'TUB', 'CUB', 'BOX'})
+
+    def test_reports_failure_when_no_fill_exists(self):
+        grid = grid_from_black_squares(3, [4])
+        index = WordIndex(['CAT', 'DOG'])
+        self.assertIsNone(GridFiller(index, 3, grid).fill())
+
+
+class PuzzleProgressTests(TestCase):
+
+    def setUp(self):
+        self.puzzle = Puzzle.objects.create(slug='tiny', title='Tiny', size=3, grid='....#....')
+        self.user = User.objects.create_user('arthur', password='pw')
+        self.url = reverse('games:puzzle_progress', args=['tiny'])
+
+    def post(self, cells):
+        return self.client.post(self.url, json.dumps({'cells': cells}), content_type='application/json')
+
+    def test_requires_login(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_deltas_are_applied_in_one_update(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.url).json(), {'cells': '----#----'})
+
+        self.post({'0': 'c', '1': 'a', '8': 'b'})
+        self.assertEqual(PuzzleProgress.objects.get().cells, 'CA--#---B')
+
+        # Existing row: session, puzzle lookup + one UPDATE (the user comes from the cache;
+        # the session would too with a shared cache, see members.sessions)
+        with self.assertNumQueries(3):
+            self.post({'1': 'o', '2': 't', '0': ''})
+        self.assertEqual(PuzzleProgress.objects.get().cells, '-OT-#---B')
+        self.assertEqual(self.client.get(self.url).json(), {'cells': '-OT-#---B'})
+
+    def test_rejects_black_squares(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.post({'4': 'A'}).status_code, 400)
+        self.assertEqual(self.post({'0': 'AB'}).status_code, 400)
+        self.assertFalse(PuzzleProgress.objects.exists())
+
+    def test_rejects_non_string_letters(self):
+        self.client.force_login(self.user)
+        for letter in (5, True, ['A'], {'a': 'A'}):
+            self.assertEqual(self.post({'3': letter}).status_code, 400)
+        self.assertFalse(PuzzleProgress.objects.exists())
+
+        self.assertEqual(self.post({'0': 'A', '1': None, '2': ''}).status_code, 200)
+        self.assertEqual(PuzzleProgress.objects.get().cells, 'A---#----')
 
-# Create your tests here.
+    def test_rejects_non_object_bodies(self):
+        self.client.force_login(self.user)
+        for body in ('[]', '"x"', '1'):
+            response = self.client.post(self.url, body, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
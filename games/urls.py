@@ -0,0 +1,12 @@
+from django.urls import path
+from . import views
+
+app_name = 'games'
+
+urlpatterns = [
+    path('crossword/', views.crossword_view, name='crossword'),
+    path('crossword/<slug:slug>/', views.crossword_view, name='crossword_puzzle'),
+    path('api/puzzles/<slug:slug>/', views.puzzle_detail, name='puzzle_detail'),
+    path('api/puzzles/<slug:slug>/check/', views.puzzle_check, name='puzzle_check'),
+    path('api/puzzles/<slug:slug>/progress/', views.puzzle_progress, name='puzzle_progress'),
+]
@@ -1,4 +1,126 @@
-from django.shortcuts import render
+import json
 
-def crossword_view(request):
-    return render(request, 'games/crossword_game.html')
\ No newline at end of file
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
+from django.views.decorators.http import require_GET, require_http_methods
+
+from mysite.ratelimit import rate_limit
+
+from . import progress
+from .crossword import check_cells
+from .models import Puzzle
+
+
+@ensure_csrf_cookie
+def crossword_view(request, slug=None):
+    puzzles = Puzzle.objects.filter(is_published=True).only('slug', 'title')
+    if slug:
+        puzzle = get_object_or_404(puzzles, slug=slug)
+    else:
+        puzzle = puzzles.first()
+    return render(request, 'games/crossword_game.html', {'puzzle': puzzle})
+
+
+# The JSON endpoints below are async views: under ASGI a client waiting on
+# them holds a suspended coroutine rather than a whole worker thread.
+
+async def _aget_published(slug, *fields):
+    try:
+        return await Puzzle.objects.filter(is_published=True).only(*fields).aget(slug=slug)
+    except Puzzle.DoesNotExist:
+        raise Http404('No such puzzle')
+
+
+@require_GET
+async def puzzle_detail(request, slug):
+    """
+    Compiled puzzle (grid, numbering, slots, clues)
+    GET /games/api/puzzles/<slug>/
+    Served straight from the precomputed JSON with an ETag, so repeat
+    visits are answered with 304 Not Modified.
+    """
+    puzzle = await _aget_published(slug, 'compiled', 'etag')
+    etag = f'"{puzzle.etag}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(puzzle.compiled, content_type='application/json')
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=300)
+    return response
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@rate_limit('game-api')
+async def puzzle_check(request, slug):
+    """
+    Check submitted cells against the stored solution
+    POST /games/api/puzzles/<slug>/check/
+    Body: {"cells": "AB#-..."}  (one character per cell, '-' for empty)
+    Returns: {"correct": bool, "complete": bool, "filled": n, "wrong": [cell indexes]}
+    A signed-in player's first correct check records the puzzle as solved
+    (and the game as won); anonymous checks aren't recorded.
+    """
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'error': 'Expected a JSON object'}, status=400)
+
+    cells = data.get('cells', '')
+    puzzle = await _aget_published(slug, 'size', 'grid', 'solution')
+    if not puzzle.solution:
+        return JsonResponse({'error': 'This puzzle has no stored solution'}, status=409)
+    if not isinstance(cells, str) or len(cells) != len(puzzle.grid):
+        return JsonResponse({'error': f'Expected {len(puzzle.grid)} cells'}, status=400)
+
+    wrong, filled = check_cells(puzzle.grid, puzzle.solution, cells)
+    open_cells = len(puzzle.grid) - puzzle.grid.count('#')
+    correct = not wrong and filled == open_cells
+    if correct:
+        user = await request.auser()
+        if user.is_authenticated:
+            await sync_to_async(progress.record_solved)(user, puzzle)
+    return JsonResponse({
+        'correct': correct,
+        'complete': filled == open_cells,
+        'filled': filled,
+        'wrong': wrong,
+    })
+
+
+@require_http_methods(["GET", "POST"])
+@rate_limit('game-api')
+async def puzzle_progress(request, slug):
+    """
+    Saved crossword progress for the signed-in player
+    GET  /games/api/puzzles/<slug>/progress/  -> {"cells": "AB#-..."}
+    POST /games/api/puzzles/<slug>/progress/  Body: {"cells": {"12": "A", "13": ""}}
+    Only changed cells are posted; they are applied with a single UPDATE.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'Sign in to save progress'}, status=401)
+
+    puzzle = await _aget_published(slug, 'id', 'grid')
+
+    if request.method == 'GET':
+        return JsonResponse({'cells': await progress.aget_cells(user, puzzle)})
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'error': 'Expected a JSON object'}, status=400)
+    try:
+        deltas = progress.clean_deltas(puzzle.grid, data.get('cells'))
+    except progress.InvalidDelta as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    await progress.aapply_deltas(user, puzzle, deltas)
+    return JsonResponse({'saved': len(deltas)})
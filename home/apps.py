@@ -4,3 +4,35 @@ from django.apps import AppConfig
 class HomeConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "home"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from wagtail.contrib.redirects.models import Redirect
+        from wagtail.documents import get_document_model
+        from wagtail.images import get_image_model
+        from wagtail.models import Page
+        from wagtail.signals import page_slug_changed, post_page_move
+
+        from . import richtext
+        from .redirects import invalidate_on_commit
+
+        # Page moves and slug changes bulk-create redirects without post_save
+        for signal, sender in [
+            (post_save, Redirect),
+            (post_delete, Redirect),
+            (page_slug_changed, None),
+            (post_page_move, None),
+        ]:
+            signal.connect(invalidate_on_commit, sender=sender, dispatch_uid='home.redirects')
+
+        # Re-render the stored HomePage rich text that links to what changed
+        for signal, sender, receiver in [
+            (page_slug_changed, None, richtext.page_url_changed),
+            (post_page_move, None, richtext.page_url_changed),
+            (post_delete, Page, richtext.object_changed),
+            (post_save, get_image_model(), richtext.object_changed),
+            (post_delete, get_image_model(), richtext.object_changed),
+            (post_save, get_document_model(), richtext.object_changed),
+            (post_delete, get_document_model(), richtext.object_changed),
+        ]:
+            signal.connect(receiver, sender=sender, dispatch_uid='home.richtext')
@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from mysite.profiling import TOKEN_PARAM, make_token
+
+
+class Command(BaseCommand):
+    help = (
+        "Mint a signed token that profiles requests carrying it "
+        "(?_profile=<token> or an X-Profile-Token header). Staff users only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User._default_manager.get_by_natural_key(options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user {options['username']!r}")
+        if not user.is_staff or not user.is_active:
+            raise CommandError(f"{user} is not an active staff user")
+
+        token = make_token(user)
+        self.stdout.write(token)
+        self.stderr.write(
+            f"Append ?{TOKEN_PARAM}={token} to a URL (add &_profile_mode=sample for a "
+            f"flame-graph stack dump); download from the X-Profile-Url response header."
+        )
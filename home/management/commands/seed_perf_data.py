@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from home import seeding
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed bulk data for performance testing: members with player profiles, "
+        "live pages under the home page, and the game room."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--pages', type=int, default=1_000)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        users = seeding.seed_users(options['users'])
+        self.stdout.write(f"Created {users} users ({time.perf_counter() - start:.1f}s)")
+
+        start = time.perf_counter()
+        pages = seeding.seed_pages(options['pages'])
+        seeding.seed_game_room()
+        self.stdout.write(f"Created {pages} pages ({time.perf_counter() - start:.1f}s)")
+        self.stdout.write(self.style.SUCCESS("Done"))
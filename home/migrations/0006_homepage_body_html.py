@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:13
+
+from django.db import migrations, models
+
+
+def render_bodies(apps, schema_editor):
+    from home.richtext import render_body
+
+    HomePage = apps.get_model("home.HomePage")
+    for page in HomePage.objects.only("pk", "body"):
+        HomePage.objects.filter(pk=page.pk).update(body_html=render_body(page.body))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0005_homepage_health_tile_header_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='homepage',
+            name='body_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(render_bodies, migrations.RunPython.noop),
+    ]
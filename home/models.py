@@ -3,6 +3,8 @@ from wagtail.models import Page
 from wagtail.fields import RichTextField
 from wagtail.admin.panels import FieldPanel, MultiFieldPanel
 
+from .richtext import render_body
+
 class HomePage(Page):
     template = "home_page.html"
 
@@ -13,6 +15,8 @@ class HomePage(Page):
         default="The Senior Addendum"
     )
     body = RichTextField(blank=True, verbose_name="Manifesto Content")
+    # body as rendered by |richtext, kept up to date by home/richtext.py
+    body_html = models.TextField(blank=True, editable=False)
 
     # --- NEW TILE FIELDS (THE THREE ISLANDS) ---
     
@@ -68,4 +72,17 @@ class HomePage(Page):
             FieldPanel('health_tile_image'),
             FieldPanel('health_tile_text'),
         ], heading="Health & Vitality Island Settings"),
-    ]
\ No newline at end of file
+    ]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'body' in update_fields:
+            self.body_html = render_body(self.body)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'body_html'}
+        return super().save(*args, **kwargs)
+
+    def serve_preview(self, request, mode_name):
+        # Previews are never saved: render the body being edited
+        self.body_html = render_body(self.body)
+        return super().serve_preview(request, mode_name)
@@ -0,0 +1,143 @@
+"""
+Redirect lookups for 404s without a database query per miss.
+
+CachedRedirectMiddleware replaces Wagtail's RedirectMiddleware, which runs
+one or more Redirect queries on every 404 - so every bot probing for
+/wp-login.php costs the database. Here each process keeps the whole
+redirect table in a dict keyed by normalised old_path, holding the matching
+redirects per site (None for "all sites"). A path that isn't in the dict is
+a known miss, answered from memory; the site is only resolved, and the
+Redirect only loaded, when a path actually has a redirect.
+
+Saving or deleting a Redirect, and the page moves and slug changes that
+make Wagtail bulk-create redirects, bump a version number in the cache. Each
+process compares it on its next 404 and reloads the table (one query) when
+it changed, so the cost of a miss is a single cache get.
+
+That version only reaches every worker through a shared cache (Redis). With
+the per-process local-memory cache, a change made in one worker is never
+seen by the others, so there each process also reloads its table when it is
+older than REDIRECTS_LOCAL_TTL seconds. Multi-worker deployments should use
+a shared cache for redirects to apply at once.
+"""
+
+import threading
+import time
+import uuid
+from urllib.parse import urlparse
+
+from django import http
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.db import transaction
+from django.utils.encoding import uri_to_iri
+from wagtail.contrib.redirects.middleware import RedirectMiddleware
+from wagtail.contrib.redirects.models import Redirect
+from wagtail.models import Site
+
+from mysite.cache import is_process_local
+
+VERSION_KEY = 'home:redirects-version'
+LOCAL_TTL = 10
+
+
+class RedirectTable:
+    """The redirect table as {old_path: {site_id: redirect}}, reloaded when stale"""
+
+    def __init__(self):
+        self.version = None
+        self.paths = {}
+        self.loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def expired(self):
+        if not is_process_local(caches[DEFAULT_CACHE_ALIAS]):
+            return False
+        ttl = getattr(settings, 'REDIRECTS_LOCAL_TTL', LOCAL_TTL)
+        return time.monotonic() - self.loaded_at >= ttl
+
+    def current(self):
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            # First process up, or the key was evicted: start a new version
+            version = uuid.uuid4().hex
+            if not cache.add(VERSION_KEY, version, None):
+                version = cache.get(VERSION_KEY, version)
+        if version != self.version or self.expired():
+            with self._lock:
+                if version != self.version or self.expired():
+                    self.paths = self.load()
+                    self.version = version
+                    self.loaded_at = time.monotonic()
+        return self.paths
+
+    def load(self):
+        paths = {}
+        rows = Redirect.objects.values_list(
+            'pk', 'old_path', 'site_id', 'is_permanent', 'redirect_page_id', 'redirect_link'
+        )
+        for pk, old_path, site_id, is_permanent, page_id, link in rows.iterator():
+            paths.setdefault(old_path, {})[site_id] = (pk, is_permanent, page_id, link)
+        return paths
+
+
+table = RedirectTable()
+
+
+def invalidate():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def invalidate_on_commit(**kwargs):
+    # After commit: Wagtail may still be creating redirects in this transaction
+    transaction.on_commit(invalidate)
+
+
+def get_redirect(request, path, paths):
+    """The (is_permanent, link) redirect for path, or None"""
+    if '\0' in path:
+        return None
+    by_site = paths.get(path)
+    if by_site is None:
+        by_site = paths.get(uri_to_iri(path))
+        if by_site is None:
+            return None
+
+    entry = by_site.get(None)
+    if len(by_site) > 1 or entry is None:
+        site = Site.find_for_request(request)
+        if site is not None:
+            entry = by_site.get(site.pk, entry)
+        elif entry is None:
+            entry = next(iter(by_site.values()))  # as Redirect.get_for_site(None)
+    if entry is None:
+        return None
+
+    pk, is_permanent, page_id, link = entry
+    if page_id is not None:
+        redirect = Redirect.objects.select_related('redirect_page').filter(pk=pk).first()
+        link = redirect.link if redirect else None
+    return (is_permanent, link) if link else None
+
+
+class CachedRedirectMiddleware(RedirectMiddleware):
+
+    def process_response(self, request, response):
+        if response.status_code != 404:
+            return response
+
+        paths = table.current()
+        path = Redirect.normalise_path(request.get_full_path())
+        redirect = get_redirect(request, path, paths)
+        if redirect is None:
+            path_without_query = urlparse(path).path
+            if path == path_without_query:
+                return response
+            redirect = get_redirect(request, path_without_query, paths)
+            if redirect is None:
+                return response
+
+        is_permanent, link = redirect
+        if is_permanent:
+            return http.HttpResponsePermanentRedirect(link)
+        return http.HttpResponseRedirect(link)
@@ -0,0 +1,74 @@
+"""
+Pre-rendered rich text for HomePage.
+
+{{ page.body|richtext }} rewrites the stored rich text on every request:
+each page link, document link and embedded image in it is looked up (and
+images get a rendition query) before the HTML is emitted. HomePage instead
+renders its body once, when it is saved or published, into body_html, and
+the template outputs that as it is. Previews render from the unsaved form,
+so serve_preview renders it afresh.
+
+The stored HTML holds the URLs of the pages, images and documents it links
+to, so it is re-rendered when one of them changes: a page moved, renamed
+(slug) or deleted, an image or document saved or deleted. The HomePages to
+re-render are found by reading the references out of their stored bodies
+there and then (there are only ever a handful of HomePages); Wagtail's
+ReferenceIndex isn't used because it is filled by a task that runs after
+commit, so it can lag behind the change. Re-rendering runs after commit,
+when the new URLs are in the database.
+"""
+
+from django.db import transaction
+from wagtail.models import Page
+from wagtail.rich_text import extract_references_from_rich_text
+from wagtail.templatetags.wagtailcore_tags import richtext
+
+
+def render_body(value):
+    """The HTML {{ value|richtext }} would output"""
+    return str(richtext(value))
+
+
+def _key(model, pk):
+    # Rich text links name pages by Page id, whatever their specific type
+    if issubclass(model, Page):
+        model = Page
+    return model._meta.label_lower, str(pk)
+
+
+def referencing_page_ids(objects):
+    """ids of the HomePages whose rich text refers to any of objects"""
+    from .models import HomePage
+
+    targets = {_key(type(obj), obj.pk) for obj in objects}
+    if not targets:
+        return set()
+    return {
+        pk for pk, body in HomePage.objects.values_list('pk', 'body')
+        if any(_key(model, object_id) in targets
+               for model, object_id, *_ in extract_references_from_rich_text(body or ''))
+    }
+
+
+def rerender(page_ids):
+    from .models import HomePage
+
+    for pk, body in HomePage.objects.filter(pk__in=page_ids).values_list('pk', 'body'):
+        HomePage.objects.filter(pk=pk).update(body_html=render_body(body))
+
+
+def rerender_referencing(objects):
+    page_ids = referencing_page_ids(objects)
+    if page_ids:
+        transaction.on_commit(lambda: rerender(page_ids))
+
+
+def page_url_changed(sender, instance, **kwargs):
+    # The URLs of every page below it changed too
+    rerender_referencing(Page.objects.descendant_of(instance, inclusive=True).only('pk'))
+
+
+def object_changed(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    rerender_referencing([instance])
@@ -0,0 +1,117 @@
+"""
+Bulk test data for performance work: members with profiles, and a tree of
+live pages under the home page. Used by the seed_perf_data command and the
+page performance suite (mysite/test_performance.py).
+"""
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from wagtail.models import Page, Site
+from wagtail.search.backends import get_search_backends
+
+from games.models import GameRoomPage, Puzzle
+from home.models import HomePage
+from members.models import PlayerProfile, SubscriptionPlan
+
+BATCH_SIZE = 1000
+
+PLANS = [
+    ('free', 'Free', 0),
+    ('member', 'Addendum Member', 5),
+    ('premium', 'Addendum Premium', 10),
+]
+
+TOPICS = ['Garden', 'Travel', 'Recipes', 'Memories', 'Health', 'Puzzles', 'Music', 'History']
+
+
+def seed_plans():
+    plans = []
+    for order, (tier, name, price) in enumerate(PLANS):
+        plan, _created = SubscriptionPlan.objects.get_or_create(
+            tier=tier, defaults={'name': name, 'price_monthly': price, 'display_order': order}
+        )
+        plans.append(plan)
+    return plans
+
+
+@transaction.atomic
+def seed_users(count, prefix='member'):
+    """
+    count users, each with a PlayerProfile, created with bulk_create (the
+    post_save profile signal doesn't fire, so profiles are bulk-created too).
+    """
+    plans = seed_plans()
+    password = make_password(None)  # unusable; hashing 10k real passwords takes minutes
+    start = User.objects.filter(username__startswith=prefix).count()
+
+    created = 0
+    while created < count:
+        batch = range(start + created, start + min(created + BATCH_SIZE, count))
+        users = User.objects.bulk_create([
+            User(username=f'{prefix}{i:06d}', email=f'{prefix}{i:06d}@example.com',
+                 first_name='Test', last_name=f'Member {i}', password=password)
+            for i in batch
+        ])
+        if users and users[0].pk is None:  # backends without RETURNING
+            users = list(User.objects.filter(username__in=[u.username for u in users]))
+        PlayerProfile.objects.bulk_create([
+            PlayerProfile(
+                user=user,
+                subscription_tier=plans[i % len(plans)].tier,
+                subscription_plan=plans[i % len(plans)],
+                is_member=i % len(plans) != 0,
+                experience_points=(i * 37) % 2500,
+                level=((i * 37) % 2500) // 100 + 1,
+                total_games_played=i % 90,
+            )
+            for i, user in enumerate(users, start=batch.start)
+        ])
+        created += len(users)
+    return created
+
+
+def get_or_create_home(hostname='localhost'):
+    home = HomePage.objects.first()
+    if home is None:
+        root = Page.get_first_root_node()
+        home = root.add_child(instance=HomePage(title='Home', slug='home'))
+    if not Site.objects.exists():
+        Site.objects.create(hostname=hostname, root_page=home, is_default_site=True)
+    return home
+
+
+@transaction.atomic
+def seed_pages(count, parent=None):
+    """
+    count live pages under a "Stories" section of the home page. They are
+    added to the search index here and now: Wagtail's own indexing waits
+    for the transaction to commit, which a TestCase never does
+    """
+    home = get_or_create_home()
+    parent = parent or home
+    section = parent.get_children().filter(slug='stories').first()
+    if section is None:
+        section = parent.add_child(instance=Page(title='Stories', slug='stories'))
+    existing = section.get_children().count()
+    pages = []
+    for i in range(existing, existing + count):
+        topic = TOPICS[i % len(TOPICS)]
+        pages.append(section.add_child(instance=Page(
+            title=f'{topic} story {i}',
+            slug=f'story-{i}',
+            search_description=f'An addendum story about {topic.lower()}, number {i}.',
+        )))
+    for backend in get_search_backends():
+        backend.add_bulk(Page, pages)
+    return count
+
+
+def seed_game_room():
+    home = get_or_create_home()
+    room = GameRoomPage.objects.first()
+    if room is None:
+        room = home.add_child(instance=GameRoomPage(title='Game Room', slug='game-room'))
+    if not Puzzle.objects.exists():
+        Puzzle.objects.create(slug='tiny', title='Tiny', size=3, grid='....#....', solution='CATO#EAGE')
+    return room
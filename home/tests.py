@@ -1,6 +1,18 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
 from home.models import HomePage
 
-from wagtail.models import Page, Site
+from wagtail.contrib.redirects.models import Redirect
+from wagtail.images import get_image_model
+from wagtail.images.tests.utils import get_test_image_file
+from wagtail.models import Page, ReferenceIndex, Site
 from wagtail.test.utils import WagtailPageTestCase
 
 
@@ -40,3 +52,120 @@ class HomeTests(WagtailPageTestCase):
     def test_homepage_template_used(self):
         response = self.client.get(self.homepage.url)
         self.assertTemplateUsed(response, "home/home_page.html")
+
+
+class CachedRedirectTests(TestCase):
+    """
+    Tests for home.redirects.CachedRedirectMiddleware.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.site = Site.objects.get(is_default_site=True)
+
+    def add_redirect(self, old_path, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Redirect.objects.create(old_path=old_path, **kwargs)
+
+    def redirect_queries(self, path):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        return response, [q for q in queries.captured_queries if 'wagtailredirects' in q['sql']]
+
+    def test_miss_does_not_query_redirects(self):
+        self.add_redirect('/old', redirect_link='https://example.com/')
+        self.client.get('/wp-login.php')  # loads the table
+        response, queries = self.redirect_queries('/wp-admin/setup.php?step=1')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(queries, [])
+
+    def test_link_redirect(self):
+        self.add_redirect('/old', redirect_link='https://example.com/new', is_permanent=False)
+        response, queries = self.redirect_queries('/old/?utm_source=x')
+        self.assertRedirects(response, 'https://example.com/new', status_code=302, fetch_redirect_response=False)
+        self.assertEqual(len(queries), 1)  # the table load
+
+    def test_page_redirect(self):
+        home = self.site.root_page
+        self.add_redirect('/old-home', redirect_page=home)
+        response = self.client.get('/old-home/')
+        self.assertRedirects(response, home.url, status_code=301, fetch_redirect_response=False)
+
+    def test_save_and_delete_reload_the_table(self):
+        self.assertEqual(self.client.get('/old/').status_code, 404)
+        redirect = self.add_redirect('/old', redirect_link='https://example.com/')
+        self.assertEqual(self.client.get('/old/').status_code, 301)
+        with self.captureOnCommitCallbacks(execute=True):
+            redirect.delete()
+        self.assertEqual(self.client.get('/old/').status_code, 404)
+
+    def test_local_memory_table_expires(self):
+        # A change made in another worker: no invalidation reaches this one
+        self.assertEqual(self.client.get('/elsewhere/').status_code, 404)
+        Redirect.objects.bulk_create([Redirect(old_path='/elsewhere', redirect_link='https://example.com/')])
+        with override_settings(REDIRECTS_LOCAL_TTL=60):
+            self.assertEqual(self.client.get('/elsewhere/').status_code, 404)
+        with override_settings(REDIRECTS_LOCAL_TTL=0):
+            self.assertEqual(self.client.get('/elsewhere/').status_code, 301)
+
+    def test_site_specific_redirect_preferred(self):
+        other = Site.objects.create(hostname='other.example', root_page=self.site.root_page)
+        self.add_redirect('/old', redirect_link='https://example.com/any')
+        self.add_redirect('/old', site=self.site, redirect_link='https://example.com/default')
+        self.add_redirect('/only-other', site=other, redirect_link='https://example.com/other')
+
+        response = self.client.get('/old/')
+        self.assertEqual(response['Location'], 'https://example.com/default')
+        response = self.client.get('/old/', headers={'host': 'other.example'})
+        self.assertEqual(response['Location'], 'https://example.com/any')
+        self.assertEqual(self.client.get('/only-other/').status_code, 404)
+
+
+class HomePageBodyTests(TestCase):
+    """
+    Tests for the pre-rendered HomePage.body_html (home/richtext.py).
+    """
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        overrides = override_settings(MEDIA_ROOT=media_root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        root = Page.get_first_root_node()
+        self.homepage = root.add_child(instance=HomePage(title="Front", slug="front"))
+        Site.objects.create(hostname="testserver", root_page=self.homepage, is_default_site=True)
+        self.target = self.homepage.add_child(instance=Page(title="Rules", slug="rules"))
+        self.image = get_image_model().objects.create(title="Board", file=get_test_image_file())
+        self.homepage.body = (
+            f'<p><a linktype="page" id="{self.target.pk}">the rules</a></p>'
+            f'<embed embedtype="image" id="{self.image.pk}" format="fullwidth" alt="Board"/>'
+        )
+        self.homepage.save_revision().publish()
+        # Filled by a task after commit in production: don't rely on it
+        ReferenceIndex.objects.all().delete()
+
+    def body_html(self):
+        return HomePage.objects.values_list("body_html", flat=True).get(pk=self.homepage.pk)
+
+    def test_body_is_rendered_on_save_not_per_request(self):
+        self.assertRegex(self.body_html(), r'<a href="[^"]*/rules/">the rules</a>')
+        self.assertIn('alt="Board"', self.body_html())
+
+        with mock.patch("wagtail.templatetags.wagtailcore_tags.expand_db_html") as expand:
+            response = self.client.get("/")
+        expand.assert_not_called()
+        self.assertContains(response, self.body_html())
+
+    def test_linked_page_slug_change_rerenders(self):
+        self.target.slug = "house-rules"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.target.save_revision().publish()
+        self.assertRegex(self.body_html(), r'<a href="[^"]*/house-rules/">the rules</a>')
+
+    def test_deleted_image_rerenders(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.image.delete()
+        self.assertNotIn('alt="Board"', self.body_html())
+        self.assertIn("the rules", self.body_html())
@@ -1,13 +1,23 @@
 from django.contrib import admin
-from .models import SubscriptionPlan, PlayerProfile, PromoCode
+from .auth import invalidate_users
+from .exports import ExportMixin
+from .models import (
+    SubscriptionPlan, PlayerProfile, PromoCode, PoemTokenLedger, PoemTokenRefill, GameResult, DailyGameStats,
+)
 
 
 @admin.register(SubscriptionPlan)
-class SubscriptionPlanAdmin(admin.ModelAdmin):
+class SubscriptionPlanAdmin(ExportMixin, admin.ModelAdmin):
     list_display = ['name', 'tier', 'price_monthly', 'price_yearly', 'is_active', 'display_order']
     list_filter = ['tier', 'is_active']
     search_fields = ['name', 'description']
     ordering = ['display_order']
+    actions = ['export_csv', 'export_jsonl']
+    export_fields = [
+        'id', 'tier', 'name', 'price_monthly', 'price_yearly', 'can_play_ai_opponents', 'can_play_claude_ai',
+        'games_per_day_limit', 'show_ads', 'monthly_poem_tokens', 'is_active', 'display_order',
+        'created_at', 'updated_at',
+    ]
     
     fieldsets = (
         ('Basic Info', {
@@ -29,7 +39,7 @@ class SubscriptionPlanAdmin(admin.ModelAdmin):
 
 
 @admin.register(PlayerProfile)
-class PlayerProfileAdmin(admin.ModelAdmin):
+class PlayerProfileAdmin(ExportMixin, admin.ModelAdmin):
     list_display = ['user', 'subscription_tier', 'is_member', 'level', 'experience_points', 'total_games_played']
     list_filter = ['subscription_tier', 'is_member', 'level']
     search_fields = ['user__username', 'user__email', 'user__first_name', 'user__last_name']
@@ -77,7 +87,15 @@ class PlayerProfileAdmin(admin.ModelAdmin):
         }),
     )
     
-    actions = ['upgrade_to_member', 'upgrade_to_premium', 'reset_daily_games']
+    actions = ['upgrade_to_member', 'upgrade_to_premium', 'reset_daily_games', 'export_csv', 'export_jsonl']
+    # user__ and subscription_plan__ columns come from the same JOINed query
+    export_fields = [
+        'id', 'user_id', 'user__username', 'user__email', 'user__first_name', 'user__last_name',
+        'user__date_joined', 'user__last_login', 'subscription_tier', 'is_member',
+        'subscription_plan__tier', 'subscription_plan__name', 'subscription_started', 'subscription_expires',
+        'experience_points', 'level', 'poem_tokens_remaining', 'games_played_today', 'last_game_reset',
+        'total_games_played', 'total_games_won', 'created_at', 'updated_at',
+    ]
     
     def upgrade_to_member(self, request, queryset):
         member_plan = SubscriptionPlan.objects.get(tier='member')
@@ -86,6 +104,7 @@ class PlayerProfileAdmin(admin.ModelAdmin):
             is_member=True,
             subscription_plan=member_plan
         )
+        invalidate_users(queryset.values_list('user_id', flat=True))
         self.message_user(request, f"{queryset.count()} users upgraded to Member")
     upgrade_to_member.short_description = "Upgrade selected to Member tier"
     
@@ -96,21 +115,28 @@ class PlayerProfileAdmin(admin.ModelAdmin):
             is_member=True,
             subscription_plan=premium_plan
         )
+        invalidate_users(queryset.values_list('user_id', flat=True))
         self.message_user(request, f"{queryset.count()} users upgraded to Premium")
     upgrade_to_premium.short_description = "Upgrade selected to Premium tier"
     
     def reset_daily_games(self, request, queryset):
         queryset.update(games_played_today=0)
+        invalidate_users(queryset.values_list('user_id', flat=True))
         self.message_user(request, f"Reset daily games for {queryset.count()} users")
     reset_daily_games.short_description = "Reset daily game counter"
 
 
 @admin.register(PromoCode)
-class PromoCodeAdmin(admin.ModelAdmin):
+class PromoCodeAdmin(ExportMixin, admin.ModelAdmin):
     list_display = ['code', 'description', 'discount_percent', 'times_used', 'max_uses', 'is_active', 'valid_until']
     list_filter = ['is_active', 'grants_tier']
     search_fields = ['code', 'description']
     readonly_fields = ['times_used', 'created_at', 'updated_at']
+    actions = ['export_csv', 'export_jsonl']
+    export_fields = [
+        'id', 'code', 'description', 'discount_percent', 'discount_amount', 'grants_free_days', 'grants_tier',
+        'max_uses', 'times_used', 'valid_from', 'valid_until', 'is_active', 'created_at', 'updated_at',
+    ]
     
     fieldsets = (
         ('Code Info', {
@@ -131,3 +157,57 @@ class PromoCodeAdmin(admin.ModelAdmin):
             )
         }),
     )
+
+
+@admin.register(PoemTokenLedger)
+class PoemTokenLedgerAdmin(admin.ModelAdmin):
+    """Read-only: entries are written by members.tokens, never edited"""
+    list_display = ['user', 'amount', 'reason', 'reference', 'unlimited', 'created_at']
+    list_filter = ['reason', 'unlimited']
+    search_fields = ['user__username', 'reference']
+    list_select_related = ['user']
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(PoemTokenRefill)
+class PoemTokenRefillAdmin(admin.ModelAdmin):
+    list_display = ['period', 'profiles_updated', 'started_at', 'finished_at']
+    readonly_fields = ['period', 'profiles_updated', 'started_at', 'finished_at']
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(GameResult)
+class GameResultAdmin(admin.ModelAdmin):
+    list_display = ['user', 'game', 'won', 'score', 'played_at']
+    list_filter = ['game', 'won']
+    search_fields = ['user__username']
+    list_select_related = ['user']
+    raw_id_fields = ['user']
+    date_hierarchy = 'played_at'
+
+
+@admin.register(DailyGameStats)
+class DailyGameStatsAdmin(admin.ModelAdmin):
+    """Rebuilt by rollup_game_stats; edits would be overwritten"""
+    list_display = ['user', 'date', 'game', 'games_played', 'games_won', 'total_score', 'best_score']
+    list_filter = ['game']
+    search_fields = ['user__username']
+    list_select_related = ['user']
+    date_hierarchy = 'date'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class MembersConfig(AppConfig):
     name = 'members'
+
+    def ready(self):
+        from . import auth  # noqa: F401 - connects the cached-user invalidation signals
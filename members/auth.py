@@ -0,0 +1,190 @@
+"""
+Cached loading of the signed-in user.
+
+CachedAuthenticationMiddleware replaces Django's AuthenticationMiddleware.
+request.user (and request.auser()) come from one cache lookup that returns
+the User with its player_profile and subscription_plan already attached, so
+a member's request needs no queries for them. With a shared cache the
+session itself is read from the cache too (members.sessions).
+
+A cached user is only used when its session auth hash still matches the
+session; anything else (password changed, secret key rotated, no cache
+entry) goes through Django's own get_user() and is cached afterwards.
+
+The user's permissions are loaded before caching too (Wagtail's user bar
+checks them on every page), so they're cached with it.
+
+Entries are dropped (once the transaction commits, so a concurrent request
+can't cache the old row again) when the User or PlayerProfile is saved or
+deleted, or the user's groups or permissions change. Saving a
+SubscriptionPlan or changing a group's permissions bumps a generation number
+stored next to the entries, which retires every cached user at once. Code
+that changes profiles with queryset.update() must call invalidate_users()
+itself.
+
+Invalidation only reaches every worker if USER_CACHE is shared (Redis). With
+a per-process local-memory cache, a password change or deactivation handled
+by one worker can't reach the others, so entries there are kept for
+USER_CACHE_LOCAL_TIMEOUT (a few seconds) instead of USER_CACHE_TIMEOUT.
+"""
+
+import uuid
+from functools import partial
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import Group, User
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from mysite.cache import is_process_local
+
+from .models import PlayerProfile, SubscriptionPlan
+
+GENERATION_KEY = 'members:user-generation'
+LOCAL_CACHE_TIMEOUT = 5
+
+
+def get_cache():
+    return caches[getattr(settings, 'USER_CACHE', 'default')]
+
+
+def get_timeout():
+    timeout = getattr(settings, 'USER_CACHE_TIMEOUT', 300)
+    if is_process_local(get_cache()):
+        # Other workers never see our invalidations: expire quickly instead
+        return min(timeout, getattr(settings, 'USER_CACHE_LOCAL_TIMEOUT', LOCAL_CACHE_TIMEOUT))
+    return timeout
+
+
+def user_key(user_id):
+    return f'members:user:{user_id}'
+
+
+def invalidate_user(user_id):
+    get_cache().delete(user_key(user_id))
+
+
+def invalidate_users(user_ids):
+    get_cache().delete_many([user_key(user_id) for user_id in user_ids])
+
+
+def invalidate_all():
+    get_cache().set(GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def _session_user(user_id, backend_path):
+    """Cache keys to fetch for this session, or None if it has no user"""
+    if user_id is None or backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return None
+    return [user_key(user_id), GENERATION_KEY]
+
+
+def _valid_user(found, keys, session_hash):
+    entry = found.get(keys[0])
+    if entry is None or not session_hash:
+        return None
+    generation, user = entry
+    if generation != found.get(GENERATION_KEY):
+        return None
+    if not constant_time_compare(session_hash, user.get_session_auth_hash()):
+        return None
+    return user
+
+
+def _prepare(user, profile):
+    """Attach what later code in the request would otherwise query for"""
+    # Caches the reverse one-to-one, including "no profile", on the instance
+    User.player_profile.related.set_cached_value(user, profile)
+    # The auth backends memoize permissions on the instance
+    user.get_all_permissions()
+    return user
+
+
+def _profiles(user):
+    return PlayerProfile.objects.select_related('subscription_plan').filter(user=user)
+
+
+def get_user(request):
+    if hasattr(request, '_cached_user'):
+        return request._cached_user
+
+    session = request.session
+    keys = _session_user(session.get(SESSION_KEY), session.get(BACKEND_SESSION_KEY))
+    user = found = None
+    if keys:
+        found = get_cache().get_many(keys)
+        user = _valid_user(found, keys, session.get(HASH_SESSION_KEY))
+    if user is None:
+        user = auth.get_user(request)
+        if keys and user.is_authenticated:
+            _prepare(user, _profiles(user).first())
+            get_cache().set(keys[0], (found.get(GENERATION_KEY), user), get_timeout())
+
+    request._cached_user = user
+    return user
+
+
+async def auser(request):
+    if hasattr(request, '_acached_user'):
+        return request._acached_user
+
+    session = request.session
+    keys = _session_user(await session.aget(SESSION_KEY), await session.aget(BACKEND_SESSION_KEY))
+    user = found = None
+    if keys:
+        found = await get_cache().aget_many(keys)
+        user = _valid_user(found, keys, await session.aget(HASH_SESSION_KEY))
+    if user is None:
+        user = await auth.aget_user(request)
+        if keys and user.is_authenticated:
+            await sync_to_async(_prepare)(user, await _profiles(user).afirst())
+            await get_cache().aset(keys[0], (found.get(GENERATION_KEY), user), get_timeout())
+
+    request._acached_user = user
+    return user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
+        request.auser = partial(auser, request)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidate_user, instance.pk))
+
+
+@receiver(post_save, sender=PlayerProfile)
+@receiver(post_delete, sender=PlayerProfile)
+def profile_changed(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidate_user, instance.user_id))
+
+
+@receiver(post_save, sender=SubscriptionPlan)
+@receiver(post_delete, sender=SubscriptionPlan)
+def plan_changed(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_all)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def permissions_changed(sender, instance, action, **kwargs):
+    if action.startswith('post_'):
+        if isinstance(instance, User):
+            transaction.on_commit(partial(invalidate_user, instance.pk))
+        else:
+            transaction.on_commit(invalidate_all)
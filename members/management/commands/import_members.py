@@ -0,0 +1,44 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from members import onboarding
+from members.models import SubscriptionPlan
+
+
+class Command(BaseCommand):
+    help = (
+        "Create members from a CSV file with username, email, first_name and last_name "
+        "columns, in batches of bulk inserts. Existing or invalid usernames are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file')
+        parser.add_argument('--plan', default='free', help="Tier of the subscription plan to assign")
+        parser.add_argument('--batch-size', type=int, default=onboarding.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            plan = SubscriptionPlan.objects.get(tier=options['plan'])
+        except SubscriptionPlan.DoesNotExist:
+            raise CommandError(f"No subscription plan with tier {options['plan']!r}")
+
+        start = time.perf_counter()
+        try:
+            with open(options['csv_file'], newline='', encoding='utf-8-sig') as handle:
+                reader = csv.DictReader(handle)
+                if 'username' not in (reader.fieldnames or []):
+                    raise CommandError("The CSV needs a username column")
+                created, skipped = onboarding.create_members(reader, plan, options['batch_size'])
+        except OSError as exc:
+            raise CommandError(f"Could not read {options['csv_file']}: {exc}")
+
+        for username, reason in skipped[:20]:
+            self.stdout.write(f"Skipped {username or '(blank)'}: {reason}")
+        if len(skipped) > 20:
+            self.stdout.write(f"... and {len(skipped) - 20} more skipped")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {created} members on {plan.name}, skipped {len(skipped)} "
+            f"({time.perf_counter() - start:.1f}s)"
+        ))
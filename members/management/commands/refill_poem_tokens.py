@@ -0,0 +1,32 @@
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from members import tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Reset every member's poem token balance to their plan's monthly allowance. "
+        "Runs once per period (YYYY-MM, default this month); schedule it monthly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period', help='YYYY-MM, default the current month')
+        parser.add_argument('--chunk-size', type=int, default=tokens.REFILL_CHUNK_SIZE)
+        parser.add_argument('--force', action='store_true', help='refill again even if this period already ran')
+
+    def handle(self, *args, **options):
+        period = options['period']
+        if period and not re.fullmatch(r'\d{4}-(0[1-9]|1[0-2])', period):
+            raise CommandError('--period must look like YYYY-MM')
+
+        start = time.perf_counter()
+        try:
+            run = tokens.refill(period, chunk_size=options['chunk_size'], force=options['force'])
+        except tokens.AlreadyRefilled as e:
+            raise CommandError(f"{e} (use --force to run it again)")
+        self.stdout.write(self.style.SUCCESS(
+            f"Refilled {run.profiles_updated} profiles for {run.period} ({time.perf_counter() - start:.1f}s)"
+        ))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from members import stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold GameResults logged since the last run (whatever day they were played) "
+        "and the last few days into DailyGameStats, and refresh the affected players' "
+        "totals. Recomputes whole days, so it is safe to run repeatedly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=stats.ROLLUP_DAYS,
+                            help='recent days to rebuild as well, counting back from today')
+        parser.add_argument('--batch-size', type=int, default=stats.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        rows, profiles = stats.rollup(days=options['days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled up {rows} daily rows, refreshed {profiles} profiles ({time.perf_counter() - start:.1f}s)"
+        ))
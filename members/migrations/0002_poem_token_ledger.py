@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:13
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PoemTokenRefill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(help_text='YYYY-MM', max_length=7, unique=True)),
+                ('profiles_updated', models.IntegerField(default=0)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Poem Token Refill',
+                'verbose_name_plural': 'Poem Token Refills',
+                'ordering': ['-period'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PoemTokenLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField(help_text='Negative for spends, positive for grants/refunds')),
+                ('reason', models.CharField(choices=[('poem', 'Poem'), ('grant', 'Grant'), ('refund', 'Refund')], max_length=20)),
+                ('reference', models.CharField(blank=True, help_text='e.g. the poem this paid for', max_length=100)),
+                ('unlimited', models.BooleanField(default=False, help_text='Spent on an unlimited plan; no balance change')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='poem_token_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Poem Token Entry',
+                'verbose_name_plural': 'Poem Token Ledger',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
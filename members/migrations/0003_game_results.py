@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:13
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def keep_legacy_totals(apps, schema_editor):
+    # Totals so far can't be rebuilt from GameResult: keep them as the base
+    # the rollups add to
+    PlayerProfile = apps.get_model('members', 'PlayerProfile')
+    PlayerProfile.objects.update(
+        legacy_games_played=F('total_games_played'),
+        legacy_games_won=F('total_games_won'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0002_poem_token_ledger'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playerprofile',
+            name='legacy_games_played',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='playerprofile',
+            name='legacy_games_won',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(keep_legacy_totals, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='DailyGameStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('game', models.CharField(choices=[('crossword', 'Crossword'), ('scrabble', 'Scrabble')], max_length=20)),
+                ('games_played', models.IntegerField(default=0)),
+                ('games_won', models.IntegerField(default=0)),
+                ('total_score', models.IntegerField(default=0)),
+                ('best_score', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_game_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Daily Game Stats',
+                'verbose_name_plural': 'Daily Game Stats',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'date', 'game'), name='unique_daily_game_stats')],
+            },
+        ),
+        migrations.CreateModel(
+            name='GameResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game', models.CharField(choices=[('crossword', 'Crossword'), ('scrabble', 'Scrabble')], max_length=20)),
+                ('won', models.BooleanField(default=False)),
+                ('score', models.IntegerField(default=0)),
+                ('played_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='game_results', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Game Result',
+                'verbose_name_plural': 'Game Results',
+                'ordering': ['-played_at'],
+                'indexes': [models.Index(fields=['user', 'played_at'], name='members_gam_user_id_3b9c5a_idx'), models.Index(fields=['played_at'], name='members_gam_played__4ccdd3_idx')],
+            },
+        ),
+    ]
@@ -89,6 +89,10 @@ class PlayerProfile(models.Model):
     # Game Statistics (can expand per game)
     total_games_played = models.IntegerField(default=0)
     total_games_won = models.IntegerField(default=0)
+    # Totals from before games were logged to GameResult (members 0003);
+    # the rollups add the DailyGameStats sums to these
+    legacy_games_played = models.IntegerField(default=0, editable=False)
+    legacy_games_won = models.IntegerField(default=0, editable=False)
     
     # Admin Notes
     admin_notes = models.TextField(blank=True, help_text="Internal notes for support/billing")
@@ -103,6 +107,33 @@ class PlayerProfile(models.Model):
     
     def __str__(self):
         return f"{self.user.username} - {self.get_subscription_tier_display()}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._saved_values = self._current_values()
+
+    def _current_values(self):
+        return {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname not in self.get_deferred_fields()
+        }
+
+    def changed_fields(self):
+        """Fields changed since the profile was loaded or saved; None if it never was"""
+        saved = getattr(self, '_saved_values', None)
+        if saved is None:
+            return None
+        return [
+            name for name, value in self._current_values().items()
+            if name != self._meta.pk.attname and (name not in saved or saved[name] != value)
+        ]
     
     def add_experience(self, points):
         """Add XP and check for level up"""
@@ -134,12 +165,17 @@ class PlayerProfile(models.Model):
         
         return self.games_played_today < limit
     
-    def record_game_played(self, won=False):
-        """Increment game counters"""
+    def record_game_played(self, game, won=False, score=0):
+        """
+        Log a GameResult and count it against today's limit.
+        total_games_played/won are refreshed from the daily rollups
+        (members.stats.rollup), not incremented here
+        """
+        from .stats import count_completed
+
+        result = GameResult.objects.create(user_id=self.user_id, game=game, won=won, score=score)
+        count_completed([result])
         self.games_played_today += 1
-        self.total_games_played += 1
-        if won:
-            self.total_games_won += 1
         self.save()
 
 
@@ -202,6 +238,124 @@ class PromoCode(models.Model):
         return True
 
 
+class PoemTokenLedger(models.Model):
+    """
+    Append-only record of poem token movements (spends, grants, refunds).
+    The balance itself lives on PlayerProfile.poem_tokens_remaining and is
+    only ever changed with conditional UPDATEs - see members/tokens.py
+    """
+    REASON_CHOICES = [
+        ('poem', 'Poem'),
+        ('grant', 'Grant'),
+        ('refund', 'Refund'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='poem_token_entries')
+    amount = models.IntegerField(help_text="Negative for spends, positive for grants/refunds")
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    reference = models.CharField(max_length=100, blank=True, help_text="e.g. the poem this paid for")
+    unlimited = models.BooleanField(default=False, help_text="Spent on an unlimited plan; no balance change")
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Poem Token Entry'
+        verbose_name_plural = 'Poem Token Ledger'
+
+    def __str__(self):
+        return f"{self.user_id}: {self.amount:+d} ({self.reason})"
+
+
+class PoemTokenRefill(models.Model):
+    """
+    One monthly refill run. Balances are reset to each plan's
+    monthly_poem_tokens in bulk; this row makes the run idempotent per period
+    """
+    period = models.CharField(max_length=7, unique=True, help_text="YYYY-MM")
+    profiles_updated = models.IntegerField(default=0)
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-period']
+        verbose_name = 'Poem Token Refill'
+        verbose_name_plural = 'Poem Token Refills'
+
+    def __str__(self):
+        return f"{self.period} ({self.profiles_updated} profiles)"
+
+
+GAME_CHOICES = [
+    ('crossword', 'Crossword'),
+    ('scrabble', 'Scrabble'),
+]
+
+
+class GameResult(models.Model):
+    """
+    Append-only log of finished games. Never read directly for stats pages:
+    members.stats.rollup folds it into DailyGameStats
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='game_results')
+    game = models.CharField(max_length=20, choices=GAME_CHOICES)
+    won = models.BooleanField(default=False)
+    score = models.IntegerField(default=0)
+    played_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-played_at']
+        indexes = [
+            models.Index(fields=['user', 'played_at']),
+            models.Index(fields=['played_at']),  # rollups scan by time
+        ]
+        verbose_name = 'Game Result'
+        verbose_name_plural = 'Game Results'
+
+    def __str__(self):
+        return f"{self.user_id} {self.game} {'won' if self.won else 'played'} ({self.played_at:%Y-%m-%d})"
+
+
+class DailyGameStats(models.Model):
+    """
+    GameResult totals per user, day and game. Rebuilt by the
+    rollup_game_stats command for the days new results were played on;
+    stats pages read only this table
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_game_stats')
+    date = models.DateField()
+    game = models.CharField(max_length=20, choices=GAME_CHOICES)
+    games_played = models.IntegerField(default=0)
+    games_won = models.IntegerField(default=0)
+    total_score = models.IntegerField(default=0)
+    best_score = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date', 'game'], name='unique_daily_game_stats'),
+        ]
+        verbose_name = 'Daily Game Stats'
+        verbose_name_plural = 'Daily Game Stats'
+
+    def __str__(self):
+        return f"{self.user_id} {self.game} {self.date}: {self.games_won}/{self.games_played}"
+
+
+class GameStatsRollup(models.Model):
+    """
+    How far members.stats.rollup has read the GameResult log: a single row
+    holding the highest GameResult id folded into DailyGameStats
+    """
+    last_result_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Game Stats Rollup'
+
+    def __str__(self):
+        return f"Rolled up to GameResult {self.last_result_id}"
+
+
 # Signal to auto-create PlayerProfile when User is created
 @receiver(post_save, sender=User)
 def create_player_profile(sender, instance, created, **kwargs):
@@ -209,5 +363,14 @@ def create_player_profile(sender, instance, created, **kwargs):
         PlayerProfile.objects.create(user=instance)
 
 @receiver(post_save, sender=User)
-def save_player_profile(sender, instance, **kwargs):
-    instance.player_profile.save()
\ No newline at end of file
+def save_player_profile(sender, instance, created, **kwargs):
+    # Only a profile already loaded on this user can hold unsaved edits;
+    # write just the changed fields, and nothing at all if none changed
+    profile = User.player_profile.related.get_cached_value(instance, default=None)
+    if created or profile is None:
+        return
+    changed = profile.changed_fields()
+    if changed is None:
+        profile.save()
+    elif changed:
+        profile.save(update_fields={*changed, 'updated_at'})
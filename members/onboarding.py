@@ -0,0 +1,89 @@
+"""
+Bulk member import (partner lists and the like).
+
+create_members() takes an iterable of dicts (username, email, first_name,
+last_name) and creates the users and their PlayerProfiles with one
+bulk_create each per batch, on the given plan. bulk_create doesn't send
+post_save, so the per-user profile signal never fires: a batch costs a
+handful of queries however many users it holds. bulk_create doesn't
+validate either, so each row is checked against the username validator and
+the fields' max_length first. Rows that fail, and usernames that already
+exist (or repeat within the input), are skipped. Imported users get an
+unusable password and set one through password reset.
+"""
+
+from itertools import batched
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .models import PlayerProfile
+
+BATCH_SIZE = 1000
+FIELDS = ('username', 'email', 'first_name', 'last_name')
+
+
+def profile_for(user, plan):
+    return PlayerProfile(
+        user=user,
+        subscription_plan=plan,
+        subscription_tier=plan.tier if plan else 'free',
+        is_member=bool(plan and plan.price_monthly > 0),
+        poem_tokens_remaining=plan.monthly_poem_tokens if plan else 0,
+    )
+
+
+def invalid_reason(user):
+    """Why user can't be inserted as it is, or None"""
+    for name in FIELDS:
+        max_length = User._meta.get_field(name).max_length
+        if len(getattr(user, name)) > max_length:
+            return f'{name} longer than {max_length} characters'
+    try:
+        User.username_validator(user.username)
+    except ValidationError:
+        return 'invalid username'
+    return None
+
+
+def create_members(rows, plan=None, batch_size=BATCH_SIZE):
+    """Returns (created count, [(username, reason skipped), ...])"""
+    total = 0
+    skipped = []
+    password = make_password(None)
+    seen = set()
+    for batch in batched(rows, batch_size):
+        users = {}
+        for row in batch:
+            username = User.normalize_username((row.get('username') or '').strip())
+            if not username:
+                skipped.append((username, 'no username'))
+            elif username in seen:
+                skipped.append((username, 'duplicate in input'))
+            else:
+                seen.add(username)
+                user = User(
+                    username=username,
+                    email=User.objects.normalize_email((row.get('email') or '').strip()),
+                    first_name=(row.get('first_name') or '').strip(),
+                    last_name=(row.get('last_name') or '').strip(),
+                    password=password,
+                )
+                reason = invalid_reason(user)
+                if reason:
+                    skipped.append((username, reason))
+                else:
+                    users[username] = user
+
+        with transaction.atomic():
+            for username in User.objects.filter(username__in=list(users)).values_list('username', flat=True):
+                del users[username]
+                skipped.append((username, 'already exists'))
+            created = User.objects.bulk_create(users.values())
+            if created and created[0].pk is None:  # backends without RETURNING
+                created = list(User.objects.filter(username__in=list(users)))
+            PlayerProfile.objects.bulk_create([profile_for(user, plan) for user in created])
+        total += len(created)
+    return total, skipped
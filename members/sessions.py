@@ -0,0 +1,24 @@
+"""
+Session engine: Django's cached_db, unless the session cache is per process.
+
+cached_db keeps each loaded session in the cache for as long as the session
+lives. With a local-memory cache every worker has its own copy, so a logout
+(session flush) handled by one worker only drops that worker's copy and the
+others keep accepting the session. There the cache is skipped and every
+request reads the session from the database, like the db engine.
+"""
+
+from django.contrib.sessions.backends import cached_db
+from django.core.cache.backends.dummy import DummyCache
+
+from mysite.cache import is_process_local
+
+_NO_CACHE = DummyCache('sessions', {})
+
+
+class SessionStore(cached_db.SessionStore):
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        if is_process_local(self._cache):
+            self._cache = _NO_CACHE
@@ -0,0 +1,151 @@
+"""
+Game statistics.
+
+Finished games are appended to GameResult (log_results() for many at once).
+rollup() folds the log into DailyGameStats - one row per user, day and game -
+recomputing whole days from the log, so running it again is harmless, and
+then refreshes the PlayerProfile totals of the users it touched from their
+daily rows. Stats pages read DailyGameStats only, so they cost one query
+however long a player's history grows.
+
+The days recomputed are those played on by results logged since the last
+rollup (GameResult ids above the GameStatsRollup mark), whatever their
+played_at - a backfill of old games or a rollup missed for a week is still
+folded in - plus the last ROLLUP_DAYS days, which picks up results whose
+transaction committed after a rollup had already read past their ids.
+
+Run "manage.py rollup_game_stats" periodically (e.g. hourly); results show
+up in stats after the next rollup.
+"""
+
+import datetime
+from itertools import batched
+
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from mysite import metrics
+
+from .auth import invalidate_users
+from .models import DailyGameStats, GameResult, GameStatsRollup, PlayerProfile
+
+ROLLUP_DAYS = 2
+BATCH_SIZE = 1000
+
+GAMES_STARTED = metrics.Counter('games_started_total', 'Games started', ['game'])
+GAMES_COMPLETED = metrics.Counter('games_completed_total', 'Games finished, by result', ['game', 'result'])
+
+
+def count_completed(results):
+    for result in results:
+        GAMES_COMPLETED.inc(result.game, 'won' if result.won else 'lost')
+
+
+def log_results(results, batch_size=BATCH_SIZE):
+    """Insert GameResult instances (unsaved) in batches; returns the count"""
+    count = 0
+    for batch in batched(results, batch_size):
+        GameResult.objects.bulk_create(batch)
+        count_completed(batch)
+        count += len(batch)
+    return count
+
+
+def day_range(date):
+    start, end = date, date + datetime.timedelta(days=1)
+    return tuple(timezone.make_aware(datetime.datetime.combine(day, datetime.time.min)) for day in (start, end))
+
+
+def daily_totals(date):
+    """GameResult played on date, aggregated by user and game"""
+    start, end = day_range(date)
+    return (
+        GameResult.objects.filter(played_at__gte=start, played_at__lt=end)
+        .annotate(date=TruncDate('played_at'))
+        .values('user_id', 'date', 'game')
+        .annotate(
+            games_played=Count('id'),
+            games_won=Count('id', filter=Q(won=True)),
+            total_score=Sum('score'),
+            best_score=Max('score'),
+        )
+        .order_by()
+    )
+
+
+def new_result_dates(after_id, up_to_id):
+    """Days played on by the GameResults with ids in (after_id, up_to_id]"""
+    return set(
+        GameResult.objects.filter(id__gt=after_id, id__lte=up_to_id)
+        .annotate(date=TruncDate('played_at'))
+        .values_list('date', flat=True)
+        .order_by()
+        .distinct()
+    )
+
+
+def rollup(days=ROLLUP_DAYS, today=None, batch_size=BATCH_SIZE):
+    """
+    Rebuild DailyGameStats for the days results logged since the last rollup
+    were played on, and the last `days` days (including today); then
+    refresh the affected profiles' totals. Returns (rows, profiles) updated
+    """
+    today = today or timezone.localdate()
+    mark, _created = GameStatsRollup.objects.get_or_create(pk=1)
+    last_id = GameResult.objects.aggregate(last=Max('id'))['last'] or 0
+
+    dates = {today - datetime.timedelta(days=n) for n in range(days)}
+    if last_id > mark.last_result_id:
+        dates |= new_result_dates(mark.last_result_id, last_id)
+
+    users = set()
+    rows = 0
+    for date in sorted(dates):
+        for batch in batched(daily_totals(date).iterator(), batch_size):
+            DailyGameStats.objects.bulk_create(
+                [DailyGameStats(**row) for row in batch],
+                update_conflicts=True,
+                unique_fields=['user', 'date', 'game'],
+                update_fields=['games_played', 'games_won', 'total_score', 'best_score'],
+            )
+            users.update(row['user_id'] for row in batch)
+            rows += len(batch)
+
+    profiles = 0
+    for batch in batched(sorted(users), batch_size):
+        profiles += refresh_profile_totals(batch)
+    GameStatsRollup.objects.filter(pk=mark.pk, last_result_id__lt=last_id).update(last_result_id=last_id)
+    return rows, profiles
+
+
+def refresh_profile_totals(user_ids):
+    """Set total_games_played/won to the legacy totals plus DailyGameStats, in one UPDATE"""
+    totals = DailyGameStats.objects.filter(user=OuterRef('user')).values('user')
+    updated = PlayerProfile.objects.filter(user_id__in=user_ids).update(
+        total_games_played=F('legacy_games_played') + Coalesce(
+            Subquery(totals.annotate(n=Sum('games_played')).values('n')), 0,
+        ),
+        total_games_won=F('legacy_games_won') + Coalesce(
+            Subquery(totals.annotate(n=Sum('games_won')).values('n')), 0,
+        ),
+    )
+    invalidate_users(user_ids)
+    return updated
+
+
+def player_stats(user, since=None):
+    """Per-game totals for user from the daily rollups, in one query"""
+    stats = DailyGameStats.objects.filter(user=user)
+    if since:
+        stats = stats.filter(date__gte=since)
+    return list(
+        stats.values('game')
+        .annotate(
+            played=Sum('games_played'),
+            won=Sum('games_won'),
+            total_score=Sum('total_score'),
+            best_score=Max('best_score'),
+        )
+        .order_by('game')
+    )
@@ -1,3 +1,466 @@
-from django.test import TestCase
+import csv
+import datetime
+import importlib
+import io
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from mysite.cache import LocMemCache
+
+from . import auth, stats, tokens
+from .auth import CachedAuthenticationMiddleware
+from .models import (
+    DailyGameStats, GameResult, PlayerProfile, PoemTokenLedger, PoemTokenRefill,
+    SubscriptionPlan,
+)
+from .sessions import SessionStore
+
+
+class PoemTokenTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.member_plan = SubscriptionPlan.objects.create(tier='member', name='Member', monthly_poem_tokens=10)
+        cls.premium_plan = SubscriptionPlan.objects.create(tier='premium', name='Premium', monthly_poem_tokens=0)
+        cls.user = User.objects.create_user('poet', password='pw')
+
+    def set_profile(self, user, plan=None, balance=0):
+        PlayerProfile.objects.filter(user=user).update(subscription_plan=plan, poem_tokens_remaining=balance)
+
+    def balance(self, user):
+        return PlayerProfile.objects.get(user=user).poem_tokens_remaining
+
+    def test_spend_decrements_and_records(self):
+        self.set_profile(self.user, self.member_plan, 3)
+        entry = tokens.spend(self.user, 2, reference='poem:1')
+        self.assertEqual(self.balance(self.user), 1)
+        self.assertEqual((entry.amount, entry.reason, entry.reference), (-2, 'poem', 'poem:1'))
+        self.assertFalse(entry.unlimited)
+
+    def test_spend_never_goes_negative(self):
+        self.set_profile(self.user, self.member_plan, 1)
+        with self.assertRaises(tokens.InsufficientTokens):
+            tokens.spend(self.user, 2)
+        self.assertEqual(self.balance(self.user), 1)
+        self.assertFalse(PoemTokenLedger.objects.exists())
+
+    def test_spend_uses_conditional_update(self):
+        self.set_profile(self.user, self.member_plan, 1)
+        with CaptureQueriesContext(connection) as queries:
+            tokens.spend(self.user)
+        update = next(q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE'))
+        self.assertIn('"poem_tokens_remaining" >=', update)
+        self.assertFalse(any(q['sql'].startswith('SELECT') for q in queries.captured_queries))
+
+    def test_unlimited_plan_spends_without_balance(self):
+        self.set_profile(self.user, self.premium_plan, 0)
+        entry = tokens.spend(self.user)
+        self.assertTrue(entry.unlimited)
+        self.assertEqual(self.balance(self.user), 0)
+
+    def test_unlimited_plan_keeps_its_balance(self):
+        # e.g. tokens granted, or left over from before an upgrade
+        self.set_profile(self.user, self.premium_plan, 4)
+        entry = tokens.spend(self.user)
+        self.assertTrue(entry.unlimited)
+        self.assertEqual(self.balance(self.user), 4)
+
+    def test_no_plan_is_balance_based(self):
+        self.set_profile(self.user, None, 0)
+        with self.assertRaises(tokens.InsufficientTokens):
+            tokens.spend(self.user)
+
+    def test_grant(self):
+        self.set_profile(self.user, self.member_plan, 0)
+        tokens.grant(self.user, 5, reason='refund', reference='poem:9')
+        self.assertEqual(self.balance(self.user), 5)
+        self.assertEqual(PoemTokenLedger.objects.get().amount, 5)
+
+    def test_refill_resets_from_plan_in_chunks(self):
+        others = [User.objects.create_user(f'poet{i}') for i in range(5)]
+        for other in others:
+            self.set_profile(other, self.member_plan, 1)
+        self.set_profile(self.user, self.premium_plan, 0)
+
+        run = tokens.refill('2026-01', chunk_size=2)
+        self.assertEqual(run.profiles_updated, 5)
+        self.assertIsNotNone(run.finished_at)
+        for other in others:
+            self.assertEqual(self.balance(other), 10)
+        self.assertEqual(self.balance(self.user), 0)  # unlimited plans are left alone
+
+    def test_refill_once_per_period(self):
+        self.set_profile(self.user, self.member_plan, 0)
+        tokens.refill('2026-02')
+        tokens.spend(self.user, 4)
+        with self.assertRaises(tokens.AlreadyRefilled):
+            tokens.refill('2026-02')
+        self.assertEqual(self.balance(self.user), 6)
+
+        tokens.refill('2026-02', force=True)
+        self.assertEqual(self.balance(self.user), 10)
+        self.assertEqual(PoemTokenRefill.objects.count(), 1)
+
+    def test_refill_command(self):
+        self.set_profile(self.user, self.member_plan, 0)
+        out = StringIO()
+        call_command('refill_poem_tokens', period='2026-03', stdout=out)
+        self.assertIn('Refilled 1 profiles for 2026-03', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('refill_poem_tokens', period='2026-03', stdout=out)
+        with self.assertRaises(CommandError):
+            call_command('refill_poem_tokens', period='March', stdout=out)
+
+
+class CachedUserTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.plan = SubscriptionPlan.objects.create(tier='member', name='Member', monthly_poem_tokens=10)
+        cls.user = User.objects.create_user('member', password='pw')
+        PlayerProfile.objects.filter(user=cls.user).update(subscription_plan=cls.plan, poem_tokens_remaining=3)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.url = reverse('studio:studio_sandbox')
+
+    def request_user(self):
+        return self.client.get(self.url).wsgi_request.user
+
+    @patch('members.sessions.is_process_local', return_value=False)
+    def test_member_request_costs_no_extra_queries(self, is_process_local):
+        # With a shared cache; a local-memory one reads sessions from the database
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            user = self.request_user()
+            self.assertEqual(user.player_profile.subscription_plan.tier, 'member')
+            self.assertFalse(user.has_perm('wagtailadmin.access_admin'))
+        tables = ' '.join(q['sql'] for q in queries.captured_queries)
+        for table in ('django_session', 'auth_user', 'members_playerprofile', 'auth_permission'):
+            self.assertNotIn(table, tables)
+
+    def test_profile_save_invalidates(self):
+        self.request_user()
+        profile = PlayerProfile.objects.get(user=self.user)
+        profile.poem_tokens_remaining = 7
+        with self.captureOnCommitCallbacks() as callbacks:
+            profile.save()
+        # Not before commit: a concurrent request could cache the old row again
+        self.assertIsNotNone(cache.get(f'members:user:{self.user.pk}'))
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.request_user().player_profile.poem_tokens_remaining, 7)
+
+    def test_plan_save_invalidates(self):
+        self.request_user()
+        self.plan.name = 'Addendum Member'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.plan.save()
+        self.assertEqual(self.request_user().player_profile.subscription_plan.name, 'Addendum Member')
+
+    def test_permission_change_invalidates(self):
+        self.request_user()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.user_permissions.add(Permission.objects.get(codename='access_admin'))
+        self.assertTrue(self.request_user().has_perm('wagtailadmin.access_admin'))
+
+    def test_token_spend_invalidates(self):
+        self.request_user()
+        with self.captureOnCommitCallbacks(execute=True):
+            tokens.spend(self.user)
+        self.assertEqual(self.request_user().player_profile.poem_tokens_remaining, 2)
+
+    def test_password_change_ends_cached_session(self):
+        self.request_user()
+        # Bypass save() so the stale entry stays cached: the session hash still has to match
+        User.objects.filter(pk=self.user.pk).update(password='changed')
+        cached = cache.get(f'members:user:{self.user.pk}')[1]
+        cached.password = 'changed'
+        cache.set(f'members:user:{self.user.pk}', (None, cached))
+        self.assertFalse(self.request_user().is_authenticated)
+
+    def test_local_memory_cache_entries_expire_quickly(self):
+        # Other workers can't see an invalidation in a per-process cache
+        with override_settings(USER_CACHE_TIMEOUT=900, USER_CACHE_LOCAL_TIMEOUT=5):
+            self.assertEqual(auth.get_timeout(), 5)
+            with patch('members.auth.is_process_local', return_value=False):
+                self.assertEqual(auth.get_timeout(), 900)
+
+    async def test_auser(self):
+        request = RequestFactory().get('/')
+        request.session = await self.client.asession()
+        CachedAuthenticationMiddleware(lambda request: None).process_request(request)
+        user = await request.auser()
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.player_profile.subscription_plan.tier, 'member')
+        self.assertIs(await request.auser(), user)
+
+
+class SessionStoreTests(TestCase):
+
+    def store(self, cache, session_key=None):
+        with patch('django.contrib.sessions.backends.cached_db.caches',
+                   {settings.SESSION_CACHE_ALIAS: cache}):
+            return SessionStore(session_key)
+
+    def test_logout_reaches_other_processes(self):
+        # Each worker process has its own local-memory cache
+        first, second = LocMemCache('sessions-1', {}), LocMemCache('sessions-2', {})
+        session = self.store(first)
+        session['player'] = 1
+        session.save()
+        session_key = session.session_key
+        self.assertEqual(self.store(second, session_key)['player'], 1)
+
+        session.flush()
+        self.assertEqual(self.store(second, session_key).load(), {})
+
+
+class GameStatsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('player', password='pw')
+        cls.other = User.objects.create_user('other', password='pw')
+        now = timezone.now()
+        cls.today = timezone.localdate()
+        stats.log_results([
+            GameResult(user=cls.user, game='scrabble', won=True, score=310, played_at=now),
+            GameResult(user=cls.user, game='scrabble', won=False, score=250, played_at=now),
+            GameResult(user=cls.user, game='crossword', won=True, played_at=now - datetime.timedelta(days=1)),
+            GameResult(user=cls.user, game='crossword', won=True, played_at=now - datetime.timedelta(days=10)),
+            GameResult(user=cls.other, game='scrabble', won=True, score=100, played_at=now),
+        ], batch_size=2)
+
+    def test_rollup_builds_daily_rows(self):
+        rows, profiles = stats.rollup(days=2)
+        # Every result logged since the last rollup, the one from ten days ago too
+        self.assertEqual((rows, profiles), (4, 2))
+        scrabble = DailyGameStats.objects.get(user=self.user, game='scrabble')
+        self.assertEqual(
+            (scrabble.date, scrabble.games_played, scrabble.games_won, scrabble.total_score, scrabble.best_score),
+            (self.today, 2, 1, 560, 310),
+        )
+
+        # Nothing new: only the recent days are recomputed
+        self.assertEqual(stats.rollup(days=1), (2, 2))
+
+    def test_backfilled_results_are_rolled_up(self):
+        stats.rollup(days=2)
+        stats.log_results([
+            GameResult(user=self.other, game='crossword', won=True,
+                       played_at=timezone.now() - datetime.timedelta(days=40)),
+        ])
+        stats.rollup(days=2)
+        self.assertEqual(
+            DailyGameStats.objects.get(user=self.other, game='crossword').date,
+            self.today - datetime.timedelta(days=40),
+        )
+        profile = PlayerProfile.objects.get(user=self.other)
+        self.assertEqual((profile.total_games_played, profile.total_games_won), (2, 2))
+
+    def test_rollup_is_repeatable_and_updates_totals(self):
+        stats.rollup(days=30)
+        GameResult.objects.create(user=self.user, game='scrabble', won=True, score=5)
+        stats.rollup(days=30)
+        self.assertEqual(DailyGameStats.objects.get(user=self.user, game='scrabble').games_played, 3)
+        profile = PlayerProfile.objects.get(user=self.user)
+        self.assertEqual((profile.total_games_played, profile.total_games_won), (5, 4))
+
+    def test_legacy_totals_are_kept(self):
+        veteran = User.objects.create_user('veteran', password='pw')
+        PlayerProfile.objects.filter(user=veteran).update(total_games_played=120, total_games_won=70)
+        migration = importlib.import_module('members.migrations.0003_game_results')
+        migration.keep_legacy_totals(apps, None)
+
+        GameResult.objects.create(user=veteran, game='scrabble', won=True, score=40)
+        stats.rollup(days=1)
+        profile = PlayerProfile.objects.get(user=veteran)
+        self.assertEqual((profile.total_games_played, profile.total_games_won), (121, 71))
+
+    def test_record_game_played_logs_result(self):
+        profile = PlayerProfile.objects.get(user=self.other)
+        profile.record_game_played('crossword', won=True)
+        self.assertEqual(profile.games_played_today, 1)
+        self.assertEqual(GameResult.objects.filter(user=self.other).count(), 2)
+
+    def test_stats_view_reads_rollups_only(self):
+        stats.rollup(days=30)
+        self.client.force_login(self.user)
+        url = reverse('members:player_stats')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(url).json()
+        # The session (read from the database with a local-memory cache) and the rollups
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('members_gameresult', ' '.join(q['sql'] for q in queries.captured_queries))
+        self.assertEqual(data['total_games_played'], 4)
+        self.assertEqual(data['games'], [
+            {'game': 'crossword', 'played': 2, 'won': 2, 'total_score': 0, 'best_score': 0},
+            {'game': 'scrabble', 'played': 2, 'won': 1, 'total_score': 560, 'best_score': 310},
+        ])
+        recent = self.client.get(url, {'days': 1}).json()['games']
+        self.assertEqual([row['game'] for row in recent], ['scrabble'])
+        for days in ('1000000', '10000000000'):
+            self.assertEqual(len(self.client.get(url, {'days': days}).json()['games']), 2)
+
+    def test_stats_view_requires_sign_in(self):
+        self.assertEqual(self.client.get(reverse('members:player_stats')).status_code, 401)
+
+    def test_rollup_command(self):
+        out = StringIO()
+        call_command('rollup_game_stats', days=30, stdout=out)
+        self.assertIn('Rolled up 4 daily rows, refreshed 2 profiles', out.getvalue())
+
+
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        plan = SubscriptionPlan.objects.create(tier='member', name='Member, Annual')
+        for i in range(5):
+            user = User.objects.create_user(f'player{i}', f'player{i}@example.com')
+            PlayerProfile.objects.filter(user=user).update(subscription_plan=plan, level=i + 1)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:members_playerprofile_changelist')
+
+    def export(self, action, client=None):
+        profiles = PlayerProfile.objects.exclude(user=self.admin).values_list('pk', flat=True)
+        return (client or self.client).post(self.url, {'action': action, '_selected_action': list(profiles)})
+
+    def test_csv_streams_selected_rows(self):
+        with patch('members.exports.EXPORT_CHUNK_SIZE', 2):
+            response = self.export('export_csv')
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="player-profiles-', response['Content-Disposition'])
+        lines = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(lines[0][:3], ['id', 'user_id', 'user__username'])
+        self.assertEqual(len(lines), 6)
+        header = lines[0]
+        self.assertEqual(lines[1][header.index('subscription_plan__name')], 'Member, Annual')
+        self.assertEqual(lines[5][header.index('user__email')], 'player4@example.com')
+
+    def test_csv_neutralises_formulas(self):
+        user = User.objects.get(username='player0')
+        user.first_name = '=HYPERLINK("http://example.com")'
+        user.save()
+        User.objects.filter(username='player1').update(username='@SUM(A1)')
+        response = self.export('export_csv')
+        lines = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        header = lines[0]
+        self.assertEqual(lines[1][header.index('user__first_name')], '\'=HYPERLINK("http://example.com")')
+        self.assertEqual(lines[2][header.index('user__username')], "'@SUM(A1)")
+        self.assertEqual(lines[3][header.index('user__username')], 'player2')
+
+        # JSON lines are data, not spreadsheet cells
+        response = self.export('export_jsonl')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(rows[1]['user__username'], '@SUM(A1)')
+
+    def test_jsonl(self):
+        response = self.export('export_jsonl')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['level'] for row in rows], [1, 2, 3, 4, 5])
+        self.assertEqual(rows[0]['subscription_plan__tier'], 'member')
+
+    async def test_asgi_export_streams_asynchronously(self):
+        await self.async_client.aforce_login(self.admin)
+        profiles = [pk async for pk in PlayerProfile.objects.exclude(user=self.admin).values_list('pk', flat=True)]
+        response = await self.async_client.post(self.url, {'action': 'export_jsonl', '_selected_action': profiles})
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(content.splitlines()), 5)
+
+
+class ImportMembersTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.plan = SubscriptionPlan.objects.create(tier='member', name='Member', price_monthly=4, monthly_poem_tokens=5)
+        User.objects.create_user('existing')
+
+    def write_csv(self, rows):
+        handle = tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False)
+        self.addCleanup(os.unlink, handle.name)
+        with handle:
+            writer = csv.writer(handle)
+            writer.writerow(['username', 'email', 'first_name', 'last_name'])
+            writer.writerows(rows)
+        return handle.name
+
+    def test_import_in_batches(self):
+        rows = [[f'partner{i}', f'P{i}@Example.COM', 'Pat', f'Number {i}'] for i in range(50)]
+        rows += [['existing', 'x@example.com', '', ''], ['partner3', '', '', ''], ['', 'blank@example.com', '', '']]
+        path = self.write_csv(rows)
+        out = StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('import_members', path, plan='member', batch_size=20, stdout=out)
+
+        self.assertIn('Created 50 members on Member, skipped 3', out.getvalue())
+        self.assertLess(len(queries), 25)  # a few per batch of 20, not several per user
+        profile = PlayerProfile.objects.select_related('user').get(user__username='partner7')
+        self.assertEqual(profile.user.email, 'P7@example.com')
+        self.assertEqual((profile.subscription_plan, profile.subscription_tier), (self.plan, 'member'))
+        self.assertTrue(profile.is_member)
+        self.assertEqual(profile.poem_tokens_remaining, 5)
+        self.assertFalse(profile.user.has_usable_password())
+
+    def test_invalid_rows_are_skipped(self):
+        path = self.write_csv([
+            ['good one', '', '', ''], ['bang!', '', '', ''], ['x' * 151, '', '', ''],
+            ['longname', '', 'y' * 151, ''], ['fine.user', '', '', ''],
+        ])
+        out = StringIO()
+        call_command('import_members', path, plan='member', batch_size=2, stdout=out)
+        self.assertIn('Created 1 members', out.getvalue())
+        self.assertTrue(User.objects.filter(username='fine.user').exists())
+        self.assertEqual(User.objects.filter(username__in=['good one', 'bang!', 'longname']).count(), 0)
+        self.assertIn('first_name longer than 150 characters', out.getvalue())
+
+    def test_unknown_plan(self):
+        with self.assertRaises(CommandError):
+            call_command('import_members', self.write_csv([]), plan='gold', stdout=StringIO())
+
+
+class SavePlayerProfileSignalTests(TestCase):
+
+    def setUp(self):
+        User.objects.create_user('player')
+        self.user = User.objects.get(username='player')
+
+    def test_user_save_skips_unloaded_or_unchanged_profile(self):
+        with self.assertNumQueries(1):
+            self.user.save()
+        self.user.player_profile  # noqa: B018 - load it
+        with self.assertNumQueries(1):
+            self.user.save()
+
+    def test_user_save_writes_changed_profile_fields(self):
+        profile = self.user.player_profile
+        PlayerProfile.objects.filter(pk=profile.pk).update(total_games_played=9)  # e.g. a rollup
+        profile.level = 4
+        with CaptureQueriesContext(connection) as queries:
+            self.user.save()
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('total_games_played', queries.captured_queries[1]['sql'])
+        profile.refresh_from_db()
+        self.assertEqual((profile.level, profile.total_games_played), (4, 9))
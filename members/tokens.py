@@ -0,0 +1,110 @@
+"""
+Poem token balances.
+
+spend() takes tokens with one conditional UPDATE
+(... SET poem_tokens_remaining = poem_tokens_remaining - n
+ WHERE user_id = ? AND poem_tokens_remaining >= n), so two concurrent spends
+can never take the balance below zero, and appends a PoemTokenLedger row in
+the same transaction. Plans with monthly_poem_tokens = 0 are unlimited: the
+UPDATE leaves their balance alone (a grant or a leftover balance from
+before an upgrade is kept), and the ledger row is marked unlimited.
+
+refill() resets every balance to its plan's monthly_poem_tokens with UPDATEs
+over primary-key ranges, taking the allowance from the plan row in a
+correlated subquery, so no profile is ever loaded into Python.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max, Min, OuterRef, Subquery
+from django.utils import timezone
+
+from .auth import invalidate_all, invalidate_user
+from .models import PlayerProfile, PoemTokenLedger, PoemTokenRefill, SubscriptionPlan
+
+REFILL_CHUNK_SIZE = 5000
+
+
+class InsufficientTokens(Exception):
+    pass
+
+
+class AlreadyRefilled(Exception):
+    pass
+
+
+def spend(user, amount=1, reason='poem', reference=''):
+    """Take amount tokens from user's balance; raises InsufficientTokens"""
+    if amount < 1:
+        raise ValueError('amount must be positive')
+    with transaction.atomic():
+        updated = PlayerProfile.objects.filter(
+            user=user, poem_tokens_remaining__gte=amount
+        ).exclude(
+            subscription_plan__monthly_poem_tokens=0
+        ).update(poem_tokens_remaining=F('poem_tokens_remaining') - amount)
+
+        unlimited = False
+        if not updated:
+            unlimited = PlayerProfile.objects.filter(
+                user=user, subscription_plan__monthly_poem_tokens=0
+            ).exists()
+            if not unlimited:
+                raise InsufficientTokens(f'Not enough poem tokens for {amount}')
+
+        # Balance changed without a save(); drop the cached request.user once committed
+        transaction.on_commit(lambda: invalidate_user(user.pk))
+        return PoemTokenLedger.objects.create(
+            user=user, amount=-amount, reason=reason, reference=reference, unlimited=unlimited
+        )
+
+
+def grant(user, amount, reason='grant', reference=''):
+    """Add tokens (a support grant or a refund for a failed poem)"""
+    if amount < 1:
+        raise ValueError('amount must be positive')
+    with transaction.atomic():
+        PlayerProfile.objects.filter(user=user).update(
+            poem_tokens_remaining=F('poem_tokens_remaining') + amount
+        )
+        transaction.on_commit(lambda: invalidate_user(user.pk))
+        return PoemTokenLedger.objects.create(user=user, amount=amount, reason=reason, reference=reference)
+
+
+def current_period(now=None):
+    return (now or timezone.now()).strftime('%Y-%m')
+
+
+def refill(period=None, chunk_size=REFILL_CHUNK_SIZE, force=False):
+    """
+    Reset balances for period (default: this month) to each plan's allowance.
+    Runs once per period unless force. Returns the PoemTokenRefill row.
+    """
+    period = period or current_period()
+    try:
+        with transaction.atomic():
+            run = PoemTokenRefill.objects.create(period=period)
+    except IntegrityError:
+        if not force:
+            raise AlreadyRefilled(f'Poem tokens were already refilled for {period}')
+        run = PoemTokenRefill.objects.get(period=period)
+        run.started_at, run.finished_at, run.profiles_updated = timezone.now(), None, 0
+        run.save()
+
+    allowance = SubscriptionPlan.objects.filter(pk=OuterRef('subscription_plan_id')).values('monthly_poem_tokens')[:1]
+    profiles = PlayerProfile.objects.filter(subscription_plan__monthly_poem_tokens__gt=0)
+    bounds = profiles.aggregate(low=Min('pk'), high=Max('pk'))
+
+    updated = 0
+    if bounds['low'] is not None:
+        for start in range(bounds['low'], bounds['high'] + 1, chunk_size):
+            # One short transaction per chunk keeps row locks brief
+            with transaction.atomic():
+                updated += profiles.filter(pk__gte=start, pk__lt=start + chunk_size).update(
+                    poem_tokens_remaining=Subquery(allowance)
+                )
+
+    invalidate_all()
+    run.profiles_updated = updated
+    run.finished_at = timezone.now()
+    run.save(update_fields=['profiles_updated', 'finished_at'])
+    return run
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'members'
+
+urlpatterns = [
+    path('api/stats/', views.player_stats, name='player_stats'),
+]
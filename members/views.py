@@ -1,5 +1,35 @@
-from django.shortcuts import render  # Sync: Added missing import
+import datetime
 
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
 
+from . import stats
 
+MAX_STATS_DAYS = 3650
 
+
+@require_GET
+def player_stats(request):
+    """
+    The signed-in player's game stats, from the daily rollups
+    GET /members/api/stats/?days=30
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Sign in to see your stats'}, status=401)
+
+    since = None
+    days = request.GET.get('days')
+    if days:
+        try:
+            days = min(max(int(days), 1), MAX_STATS_DAYS)
+        except ValueError:
+            return JsonResponse({'error': 'days must be a number'}, status=400)
+        since = timezone.localdate() - datetime.timedelta(days=days - 1)
+
+    profile = request.user.player_profile
+    return JsonResponse({
+        'total_games_played': profile.total_games_played,
+        'total_games_won': profile.total_games_won,
+        'games': stats.player_stats(request.user, since),
+    })
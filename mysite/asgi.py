@@ -0,0 +1,20 @@
+"""
+ASGI config for mysite project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+This is the production entry point (see the Dockerfile). The studio room
+streams and the studio/games JSON APIs are async views; Wagtail pages and
+the rest of the site stay sync and Django runs them in a thread pool.
+benchmarks/asgi_vs_wsgi.py compares it with the WSGI app in mysite/wsgi.py.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mysite.settings.dev")
+
+application = get_asgi_application()
@@ -0,0 +1,52 @@
+"""
+Cache backends that count hits and misses for the Server-Timing header
+(mysite.timing) and the cache_lookups_total metric (mysite.metrics).
+Identical to Django's own backends otherwise.
+"""
+
+from django.core.cache.backends import locmem, redis
+
+from . import metrics
+from .timing import record_cache_lookup as record_request_lookup
+
+CACHE_LOOKUPS = metrics.Counter('cache_lookups_total', 'Cache gets by result', ['result'])
+
+_MISSING = object()
+
+
+def is_process_local(cache):
+    """True for caches each worker process has its own copy of"""
+    return isinstance(cache, locmem.LocMemCache)
+
+
+def record_cache_lookup(hits, misses=0):
+    record_request_lookup(hits, misses)
+    if hits:
+        CACHE_LOOKUPS.inc('hit', amount=hits)
+    if misses:
+        CACHE_LOOKUPS.inc('miss', amount=misses)
+
+
+class CacheStatsMixin:
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        if value is _MISSING:
+            record_cache_lookup(0, 1)
+            return default
+        record_cache_lookup(1)
+        return value
+
+
+class LocMemCache(CacheStatsMixin, locmem.LocMemCache):
+    pass
+
+
+class RedisCache(CacheStatsMixin, redis.RedisCache):
+
+    # Redis fetches many keys in one round trip instead of calling get()
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version)
+        record_cache_lookup(len(found), len(keys) - len(found))
+        return found
@@ -0,0 +1,392 @@
+"""
+Counters, gauges and histograms for the site, served in the Prometheus text
+format at /metrics/.
+
+Modules declare their metrics at import time and update them inline:
+
+    WORD_CHECKS = metrics.Counter('studio_word_checks_total', 'Words checked', ['result'])
+    WORD_CHECKS.inc('valid')
+
+An update is a lock and a dict update in the current process, nothing more.
+MetricsMiddleware also times every request, by URL name, and starts a
+background thread in each process that writes the process's values to
+METRICS_DIR/<pid>-<id>.json every METRICS_FLUSH_INTERVAL seconds and at
+exit, off the request path. The endpoint sums the files
+of every process, so each gunicorn worker is counted. When a worker has
+exited (recycled by max_requests, say), the next scrape folds its counters
+and histograms into totals.json and deletes its file, so the directory holds
+one file per live process plus the totals. Gauges (lexicon size and the
+like) are the same in every process and are combined with max over the live
+processes only. Liveness is checked by pid, so METRICS_DIR must be local to
+the host. It should be emptied when the site is deployed, along with the
+counters.
+
+/metrics/ answers requests from METRICS_ALLOWED_IPS, or carrying
+"Authorization: Bearer <METRICS_TOKEN>", and 404s anything else.
+"""
+
+import atexit
+import bisect
+import fcntl
+import json
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from .ratelimit import client_ip
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+logger = logging.getLogger('mysite.metrics')
+
+_registry = {}
+_lock = threading.Lock()
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        if name in _registry:
+            raise ValueError(f'Metric {name} is already registered')
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.values = {}   # {(label value, ...): value}
+        _registry[name] = self
+
+    def snapshot(self):
+        with _lock:
+            return [[list(labels), value] for labels, value in self.values.items()]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with _lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, *labels):
+        with _lock:
+            self.values[labels] = value
+
+
+class Histogram(Metric):
+    """Values are [count per bucket..., count above the last bucket, sum]"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            counts = self.values.get(labels)
+            if counts is None:
+                counts = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def snapshot(self):
+        with _lock:
+            return [[list(labels), list(counts)] for labels, counts in self.values.items()]
+
+
+# ---------------------------------------------------------------------------
+# Process files
+# ---------------------------------------------------------------------------
+
+def get_metrics_dir():
+    return Path(getattr(settings, 'METRICS_DIR', settings.BASE_DIR / 'metrics'))
+
+
+_process = (None, None)   # (pid, file name); workers forked after import get their own
+_flusher_pid = None       # the process whose flush thread is running
+_flusher_lock = threading.Lock()
+
+
+def _process_file():
+    global _process
+    pid = os.getpid()
+    if _process[0] != pid:
+        _process = (pid, f'{pid}-{uuid.uuid4().hex[:8]}.json')
+    return _process[1]
+
+
+def snapshot():
+    """{name: {...}} for every registered metric with values"""
+    data = {}
+    for metric in list(_registry.values()):
+        values = metric.snapshot()
+        if values:
+            data[metric.name] = {
+                'kind': metric.kind,
+                'help': metric.documentation,
+                'labels': list(metric.labels),
+                'buckets': list(getattr(metric, 'buckets', ())),
+                'values': values,
+            }
+    return data
+
+
+def _read(path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None  # removed or being replaced meanwhile
+
+
+def _write(path, data):
+    temp = path.with_suffix(f'.{threading.get_ident()}.tmp')
+    temp.write_text(json.dumps(data))
+    os.replace(temp, path)
+
+
+def flush():
+    """Write this process's values, replacing its previous file"""
+    data = snapshot()
+    if not data:
+        return
+    directory = get_metrics_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    _write(directory / _process_file(), data)
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(getattr(settings, 'METRICS_FLUSH_INTERVAL', 5))
+        try:
+            flush()
+        except Exception:
+            logger.warning('Could not write metrics to %s', get_metrics_dir(), exc_info=True)
+
+
+def start_flusher():
+    """Start this process's flush thread, once; a forked worker starts its own"""
+    global _flusher_pid
+    pid = os.getpid()
+    if _flusher_pid == pid:
+        return
+    with _flusher_lock:
+        if _flusher_pid == pid:
+            return
+        _flusher_pid = pid
+        atexit.register(flush)
+    threading.Thread(target=_flush_periodically, name='metrics-flush', daemon=True).start()
+
+
+TOTALS_FILE = 'totals.json'   # {'metrics': {name: {...}}, 'absorbed': [file name, ...]}
+
+
+def _merge(merged, data, gauges=True):
+    """Add one file's {name: {...}} to merged, whose values are {labels tuple: value}"""
+    for name, metric in data.items():
+        if metric['kind'] == 'gauge' and not gauges:
+            continue
+        target = merged.setdefault(name, {**metric, 'values': {}})
+        values = target['values']
+        for labels, value in metric['values']:
+            labels = tuple(labels)
+            current = values.get(labels)
+            if current is None:
+                values[labels] = value
+            elif metric['kind'] == 'gauge':
+                values[labels] = max(current, value)
+            elif metric['kind'] == 'histogram':
+                values[labels] = [a + b for a, b in zip(current, value)]
+            else:
+                values[labels] = current + value
+    return merged
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # exists, owned by someone else
+    return True
+
+
+def _process_files(directory):
+    """{path: pid} of every process file"""
+    files = {}
+    for path in directory.glob('*-*.json'):
+        try:
+            files[path] = int(path.name.split('-', 1)[0])
+        except ValueError:
+            continue
+    return files
+
+
+def compact(directory=None):
+    """
+    Fold the counters and histograms of exited processes into the totals
+    file and delete their files. The totals list the files they absorbed, so
+    a file that survived a crash before its deletion isn't counted twice.
+    """
+    directory = Path(directory or get_metrics_dir())
+    if not directory.is_dir():
+        return
+    dead = [path for path, pid in _process_files(directory).items() if not _pid_alive(pid)]
+    if not dead:
+        return
+    with open(directory / '.lock', 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)  # one scrape compacts at a time
+        totals_path = directory / TOTALS_FILE
+        totals = _read(totals_path) or {'metrics': {}, 'absorbed': []}
+        absorbed = set(totals['absorbed'])
+        merged = _merge({}, totals['metrics'])
+        dead = [path for path in sorted(dead) if path.exists()]
+        for path in dead:
+            if path.name not in absorbed:
+                data = _read(path)
+                if data is not None:
+                    _merge(merged, data, gauges=False)
+                absorbed.add(path.name)
+        present = {path.name for path in directory.glob('*-*.json')}
+        _write(totals_path, {
+            'metrics': {
+                name: {**metric, 'values': [[list(labels), value] for labels, value in metric['values'].items()]}
+                for name, metric in merged.items()
+            },
+            'absorbed': sorted(absorbed & present),
+        })
+        for path in dead:
+            path.unlink(missing_ok=True)
+
+
+def collect():
+    """
+    The totals plus every live process file: counters and histograms summed,
+    gauges max
+    """
+    directory = get_metrics_dir()
+    compact(directory)
+    totals = _read(directory / TOTALS_FILE) or {'metrics': {}, 'absorbed': []}
+    merged = _merge({}, totals['metrics'])
+    absorbed = set(totals['absorbed'])
+    for path in sorted(_process_files(directory)):
+        if path.name not in absorbed:
+            data = _read(path)
+            if data is not None:
+                _merge(merged, data)
+    return merged
+
+
+# ---------------------------------------------------------------------------
+# Text format
+# ---------------------------------------------------------------------------
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+def render(merged):
+    lines = []
+    for name in sorted(merged):
+        metric = merged[name]
+        kind, names = metric['kind'], metric['labels']
+        lines.append(f'# HELP {name} {_escape(metric["help"])}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(metric['values'].items()):
+            if kind != 'histogram':
+                lines.append(f'{name}{_labels(names, labels)} {_number(value)}')
+                continue
+            cumulative = 0
+            bounds = [_number(float(b)) for b in metric['buckets']] + ['+Inf']
+            for bound, count in zip(bounds, value[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels(names, labels, ("le", bound))} {cumulative}')
+            lines.append(f'{name}_sum{_labels(names, labels)} {_number(value[-1])}')
+            lines.append(f'{name}_count{_labels(names, labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+def _allowed(request):
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        if header.startswith('Bearer ') and constant_time_compare(header[7:], token):
+            return True
+    return client_ip(request) in getattr(settings, 'METRICS_ALLOWED_IPS', ())
+
+
+def metrics_view(request):
+    if not _allowed(request):
+        raise Http404
+    flush()
+    return HttpResponse(render(collect()), content_type=CONTENT_TYPE)
+
+
+# ---------------------------------------------------------------------------
+# Request latency
+# ---------------------------------------------------------------------------
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time to produce a response, by URL name', ['view'],
+)
+RESPONSES = Counter('http_responses_total', 'Responses by URL name and status class', ['view', 'status'])
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        return self.finish(request, response, start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        return self.finish(request, response, start)
+
+    def finish(self, request, response, start):
+        match = getattr(request, 'resolver_match', None)
+        # Wagtail pages all resolve to wagtail_serve; unmatched URLs share a label
+        view = match.view_name if match and match.view_name else 'unmatched'
+        REQUEST_LATENCY.observe(time.perf_counter() - start, view)
+        RESPONSES.inc(view, f'{response.status_code // 100}xx')
+        start_flusher()
+        return response
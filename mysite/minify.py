@@ -0,0 +1,103 @@
+"""
+Conservative JavaScript/CSS minification for the static bundles.
+
+These only remove comments and redundant whitespace. Line breaks between
+JavaScript statements are kept so automatic semicolon insertion behaves
+exactly as in the source files.
+"""
+
+import re
+
+# Characters after which a '/' starts a regular expression literal, not a division
+_REGEX_PREFIX = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'yield', 'await')
+
+
+def _regex_allowed(segments, code):
+    text = ''.join(code).rstrip()
+    if not text and segments:
+        # Right after a string or regex literal: that is an operand, so '/' divides
+        return False
+    if not text:
+        return True
+    if text[-1] in _REGEX_PREFIX:
+        return True
+    return any(text.endswith(word) and not (text[:-len(word)][-1:].isalnum()) for word in _REGEX_KEYWORDS)
+
+
+def minify_js(source):
+    # Split the source into code and literal (string/regex) segments; only code is squeezed
+    segments = []
+    code = []
+    i = 0
+    n = len(source)
+
+    def literal(text):
+        segments.append((''.join(code), False))
+        code.clear()
+        segments.append((text, True))
+
+    while i < n:
+        char = source[i]
+        nxt = source[i + 1] if i + 1 < n else ''
+
+        if char in '"\'`':
+            j = i + 1
+            while j < n and source[j] != char:
+                j += 2 if source[j] == '\\' else 1
+            literal(source[i:j + 1])
+            i = j + 1
+        elif char == '/' and nxt == '/':
+            while i < n and source[i] != '\n':
+                i += 1
+        elif char == '/' and nxt == '*':
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            code.append(' ')
+        elif char == '/' and _regex_allowed(segments, code):
+            j = i + 1
+            in_class = False
+            while j < n and source[j] != '\n':
+                if source[j] == '\\':
+                    j += 2
+                    continue
+                if source[j] == '[':
+                    in_class = True
+                elif source[j] == ']':
+                    in_class = False
+                elif source[j] == '/' and not in_class:
+                    break
+                j += 1
+            j += 1
+            while j < n and source[j].isalpha():  # flags
+                j += 1
+            literal(source[i:j])
+            i = j
+        else:
+            code.append(char)
+            i += 1
+    segments.append((''.join(code), False))
+
+    out = []
+    for text, is_literal in segments:
+        if not is_literal:
+            text = re.sub(r'[ \t]+', ' ', text)
+            text = re.sub(r' ?\n[\s]*', '\n', text)
+        out.append(text)
+    return ''.join(out).strip() + '\n'
+
+
+def minify_css(source):
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    source = source.replace(';}', '}')
+    return source.strip() + '\n'
+
+
+def minify(name, source):
+    if name.endswith('.js'):
+        return minify_js(source)
+    if name.endswith('.css'):
+        return minify_css(source)
+    return source
@@ -0,0 +1,215 @@
+"""
+On-demand profiling of individual requests in production.
+
+A request is profiled when it carries a signed staff token, either as
+?_profile=<token> or in an X-Profile-Token header. Mint tokens with
+"manage.py profile_token <username>". Two profilers are available:
+
+- cprofile (default): a pstats file for snakeviz, pstats or tuna
+- sample (?_profile_mode=sample): a stack sampler that writes collapsed
+  stacks ("frame;frame;frame count" lines), ready for flamegraph.pl or
+  speedscope. It also sees the threads that run sync code under ASGI.
+
+settings.PROFILER_SAMPLE_VIEWS = {"search": 100} profiles 1 in 100 requests
+to that view (by URL name) with the sampler, with no token needed.
+
+Profiles are written to settings.PROFILER_DIR. The response names the file
+in X-Profile-Id, and staff download it from /profiles/<id>/.
+"""
+
+import cProfile
+import itertools
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.http import FileResponse, Http404
+from django.urls import Resolver404, resolve, reverse
+from django.utils.text import slugify
+
+TOKEN_SALT = 'mysite.profiling'
+TOKEN_PARAM = '_profile'
+MODE_PARAM = '_profile_mode'
+MODES = ('cprofile', 'sample')
+EXTENSIONS = {'cprofile': '.prof', 'sample': '.collapsed'}
+
+
+def get_profile_dir():
+    return Path(getattr(settings, 'PROFILER_DIR', settings.BASE_DIR / 'profiles'))
+
+
+def make_token(user):
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(user.get_username())
+
+
+def _staff_users(token):
+    max_age = getattr(settings, 'PROFILER_TOKEN_MAX_AGE', 60 * 60)
+    try:
+        username = signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=max_age)
+    except signing.BadSignature:
+        return None
+    User = get_user_model()
+    return User._default_manager.filter(**{User.USERNAME_FIELD: username}, is_staff=True, is_active=True)
+
+
+def check_token(token):
+    """True if the token is a valid, unexpired token for an active staff user"""
+    users = _staff_users(token)
+    return users is not None and users.exists()
+
+
+async def acheck_token(token):
+    users = _staff_users(token)
+    return users is not None and await users.aexists()
+
+
+class StackSampler:
+    """
+    Samples thread stacks every interval seconds from a background thread.
+    thread_ids limits sampling to those threads; None samples every thread.
+    """
+
+    def __init__(self, interval=0.001, thread_ids=None):
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def dump(self, path):
+        with open(path, 'w') as handle:
+            for stack, count in self.stacks.most_common():
+                handle.write(f'{stack} {count}\n')
+
+
+class ProfilerMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_views = getattr(settings, 'PROFILER_SAMPLE_VIEWS', {})
+        self.counters = {name: itertools.count(1) for name in self.sample_views}
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = self.get_token(request)
+        if token:
+            mode = self.token_mode(request) if check_token(token) else None
+        else:
+            mode = 'sample' if self.sampled(request) else None
+        if mode is None:
+            return self.get_response(request)
+
+        profile_id, path = self.new_profile(request, mode)
+        if mode == 'cprofile':
+            profiler = cProfile.Profile()
+            response = profiler.runcall(self.get_response, request)
+            profiler.dump_stats(path)
+        else:
+            sampler = StackSampler(thread_ids={threading.get_ident()})
+            sampler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                sampler.stop()
+            sampler.dump(path)
+        return self.annotate(response, profile_id)
+
+    async def __acall__(self, request):
+        token = self.get_token(request)
+        if token:
+            profile = await acheck_token(token)
+        else:
+            profile = self.sampled(request)
+        if not profile:
+            return await self.get_response(request)
+
+        # Under ASGI the view may run in a worker thread, so this always uses
+        # the sampler across every thread; concurrent requests on this process
+        # show up in the dump too
+        profile_id, path = self.new_profile(request, 'sample')
+        sampler = StackSampler()
+        sampler.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            sampler.stop()
+        sampler.dump(path)
+        return self.annotate(response, profile_id)
+
+    def get_token(self, request):
+        return request.GET.get(TOKEN_PARAM) or request.headers.get('X-Profile-Token')
+
+    def token_mode(self, request):
+        mode = request.GET.get(MODE_PARAM, 'cprofile')
+        return mode if mode in MODES else 'cprofile'
+
+    def sampled(self, request):
+        """Count requests to the views in PROFILER_SAMPLE_VIEWS; True for every Nth"""
+        if not self.sample_views:
+            return False
+        try:
+            view_name = resolve(request.path_info).view_name
+        except Resolver404:
+            return False
+        every = self.sample_views.get(view_name)
+        return bool(every) and next(self.counters[view_name]) % every == 0
+
+    def annotate(self, response, profile_id):
+        response['X-Profile-Id'] = profile_id
+        response['X-Profile-Url'] = reverse('download_profile', args=[profile_id])
+        return response
+
+    def new_profile(self, request, mode):
+        profile_dir = get_profile_dir()
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        slug = slugify(request.path.replace('/', '-'))[:60] or 'root'
+        profile_id = f'{time.strftime("%Y%m%d-%H%M%S")}-{slug}-{uuid.uuid4().hex[:8]}{EXTENSIONS[mode]}'
+        return profile_id, profile_dir / profile_id
+
+
+@staff_member_required
+def download_profile(request, profile_id):
+    """
+    Download a stored profile
+    GET /profiles/<profile_id>/
+    """
+    if os.path.basename(profile_id) != profile_id or not profile_id.endswith(tuple(EXTENSIONS.values())):
+        raise Http404
+    path = get_profile_dir() / profile_id
+    if not path.is_file():
+        raise Http404
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=profile_id)
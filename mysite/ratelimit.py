@@ -0,0 +1,215 @@
+"""
+Token-bucket rate limiting for the public JSON APIs.
+
+    @rate_limit('word-api')
+    def validate_word(request): ...
+
+Each client (the signed-in user, else the client IP) gets a bucket per scope
+holding up to `burst` tokens, refilled at `rate` tokens per second; a request
+takes one token or is answered 429 with Retry-After. Scopes are configured in
+settings.RATELIMITS, so new game APIs share a limit by naming its scope.
+
+Buckets live in the RATELIMIT_CACHE cache. Taking a token must be atomic,
+or concurrent requests would all take the same token:
+
+- Redis (shared by every worker): a Lua script refills and takes in one
+  round trip on the server.
+- The local-memory cache: a lock around the read and write. That cache is
+  per process, so with it each worker enforces its own limit (N workers
+  allow N times the rate); use Redis for one limit across workers.
+
+If the cache fails the limiter falls back to per-process buckets rather
+than failing requests. Async views take their token in a worker thread, so
+a Redis round trip never blocks the event loop.
+"""
+
+import functools
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.http import JsonResponse
+
+logger = logging.getLogger('mysite.ratelimit')
+
+MEMORY_MAX_BUCKETS = 10_000
+
+# Same arithmetic as _take(), run atomically by Redis. Numbers go back as
+# strings: Lua numbers returned to Redis are truncated to integers.
+REDIS_TAKE_SCRIPT = """
+local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(now - updated, 0) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return tostring(wait)
+"""
+
+
+def _take(bucket, rate, burst, now):
+    """(bucket after taking one token at now, seconds to wait or 0)"""
+    tokens, updated = bucket if bucket else (burst, now)
+    tokens = min(burst, tokens + max(now - updated, 0) * rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / rate
+
+
+def _expiry(rate, burst):
+    # An idle bucket refills completely after burst / rate seconds; it can expire then
+    return math.ceil(burst / rate) + 1
+
+
+class MemoryStore:
+    """Per-process buckets, least recently used evicted first"""
+
+    def __init__(self, max_buckets=MEMORY_MAX_BUCKETS):
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, now):
+        with self._lock:
+            self._buckets[key], wait = _take(self._buckets.get(key), rate, burst, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class CacheStore:
+    """Buckets in a Django cache, falling back to a MemoryStore on cache errors"""
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+        self.fallback = MemoryStore()
+        self.failing = False
+        self._lock = threading.Lock()
+        self._script = None
+
+    def take(self, key, rate, burst, now):
+        try:
+            if isinstance(self.cache, RedisCache):
+                wait = self._take_redis(key, rate, burst, now)
+            else:
+                # Atomic for the local-memory cache, whose buckets are all in this process
+                with self._lock:
+                    bucket, wait = _take(self.cache.get(key), rate, burst, now)
+                    self.cache.set(key, bucket, _expiry(rate, burst))
+        except Exception:
+            self._failed()
+            return self.fallback.take(key, rate, burst, now)
+        self.failing = False
+        return wait
+
+    def _take_redis(self, key, rate, burst, now):
+        key = self.cache.make_and_validate_key(key)
+        if self._script is None:
+            self._script = self.cache._cache.get_client(key, write=True).register_script(REDIS_TAKE_SCRIPT)
+        client = self.cache._cache.get_client(key, write=True)
+        return float(self._script(keys=[key], args=[rate, burst, now, _expiry(rate, burst)], client=client))
+
+    def _failed(self):
+        if not self.failing:
+            logger.warning('Rate limit cache unavailable; using per-process buckets', exc_info=True)
+        self.failing = True
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        alias = getattr(settings, 'RATELIMIT_CACHE', 'default')
+        _store = CacheStore(alias) if alias else MemoryStore()
+    return _store
+
+
+def take_token(key, rate, burst, now=None):
+    """
+    Take one token from the bucket for key. Returns 0 if allowed, otherwise
+    the seconds until a token will be available.
+    """
+    now = time.time() if now is None else now
+    return get_store().take(key, rate, burst, now)
+
+
+def get_scope_limits(scope):
+    limits = getattr(settings, 'RATELIMITS', {}).get(scope)
+    if limits is None:
+        raise KeyError(f'No RATELIMITS entry for scope {scope!r}')
+    return float(limits['rate']), float(limits['burst'])
+
+
+def client_ip(request):
+    header = getattr(settings, 'RATELIMIT_IP_HEADER', None)
+    if header:
+        # e.g. HTTP_X_FORWARDED_FOR: each proxy appends the address it was reached
+        # from, so the client is RATELIMIT_TRUSTED_PROXIES hops from the right.
+        # Hops left of that were sent by the client and can be anything.
+        hops = [hop.strip() for hop in request.META.get(header, '').split(',') if hop.strip()]
+        if hops:
+            trusted = max(getattr(settings, 'RATELIMIT_TRUSTED_PROXIES', 1), 1)
+            return hops[-min(trusted, len(hops))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _has_session(request):
+    # Anonymous scripts carry no session cookie; skip the user lookup for them
+    return settings.SESSION_COOKIE_NAME in request.COOKIES
+
+
+def _identity(request, user):
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    return f'ip:{client_ip(request)}'
+
+
+def too_many_requests(wait):
+    response = JsonResponse({'error': 'Too many requests, slow down'}, status=429)
+    response['Retry-After'] = str(max(math.ceil(wait), 1))
+    return response
+
+
+def rate_limit(scope):
+    """Limit a view (sync or async) with the RATELIMITS[scope] bucket"""
+
+    def check(request, user):
+        if not getattr(settings, 'RATELIMIT_ENABLED', True):
+            return None
+        rate, burst = get_scope_limits(scope)
+        wait = take_token(f'rl:{scope}:{_identity(request, user)}', rate, burst)
+        return too_many_requests(wait) if wait else None
+
+    # Off the event loop: a Redis round trip would block it
+    acheck = sync_to_async(check, thread_sensitive=False)
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                user = await request.auser() if _has_session(request) else None
+                return await acheck(request, user) or await view(request, *args, **kwargs)
+        else:
+            @functools.wraps(view)
+            def wrapper(request, *args, **kwargs):
+                user = request.user if _has_session(request) else None
+                return check(request, user) or view(request, *args, **kwargs)
+        return wrapper
+
+    return decorator
@@ -35,14 +35,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "mysite.timing.ServerTimingMiddleware",
+    "mysite.metrics.MetricsMiddleware",
+    "mysite.profiling.ProfilerMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "mysite.static_serve.StaticFilesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "members.auth.CachedAuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "wagtail.contrib.redirects.middleware.RedirectMiddleware",
+    "home.redirects.CachedRedirectMiddleware",
 ]
 
 ROOT_URLCONF = "mysite.urls"
@@ -61,11 +65,17 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
             ],
+            "libraries": {
+                "static_bundles": "mysite.templatetags.static_bundles",
+            },
         },
     },
 ]
 
 WSGI_APPLICATION = "mysite.wsgi.application"
+ASGI_APPLICATION = "mysite.asgi.application"
+
+TEST_RUNNER = "mysite.testrunner.TestRunner"
 
 # Database
 DATABASES = {
@@ -75,6 +85,39 @@ DATABASES = {
     }
 }
 
+# The existing migrations use 64-bit ids; Django 5.2 would default to AutoField
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Cache backends from mysite.cache count hits/misses for the Server-Timing
+# header; swap in mysite.cache.RedisCache for a shared cache.
+CACHES = {
+    "default": {
+        "BACKEND": "mysite.cache.LocMemCache",
+    }
+}
+
+# Sessions are read from the cache and written through to the database, so
+# a signed-in request normally costs no session query. members.sessions only
+# does that with a shared cache (Redis): with a local-memory cache a logout
+# couldn't reach the other workers' copies, so sessions are read from the
+# database. The signed-in user, with their player profile and plan, is cached
+# by members.auth.CachedAuthenticationMiddleware in USER_CACHE. Only a shared
+# cache (Redis) lets a change made by one worker evict the user everywhere;
+# with a local-memory cache entries live for USER_CACHE_LOCAL_TIMEOUT seconds.
+SESSION_ENGINE = "members.sessions"
+USER_CACHE = "default"
+USER_CACHE_TIMEOUT = 60 * 15
+USER_CACHE_LOCAL_TIMEOUT = 5
+
+# home.redirects keeps the redirect table in each process, reloaded when a
+# version in the default cache changes. With a local-memory cache other
+# workers can't see that, so they reload every REDIRECTS_LOCAL_TTL seconds.
+REDIRECTS_LOCAL_TTL = 10
+
+# search.autocomplete shares its prefix index through the default cache; with
+# a local-memory cache each process rebuilds its copy this often instead.
+AUTOCOMPLETE_LOCAL_TTL = 60
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -105,6 +148,35 @@ STATICFILES_FINDERS = [
     "django.contrib.staticfiles.finders.AppDirectoriesFinder",
 ]
 
+# Bundles built by mysite.storage.BundledManifestStaticFilesStorage during
+# collectstatic, in load order. Templates include them with {% bundle %},
+# which falls back to the individual files unless STATIC_BUNDLES_ENABLED.
+STATIC_BUNDLES = {
+    "studio/js/scrabble.bundle.js": [
+        "studio/js/scrabble/scrabble_settings.js",
+        "studio/js/scrabble/scrabble_game_manager.js",
+        "studio/js/scrabble/scrabble_painter.js",
+        "studio/js/scrabble/scrabble_tile_factory.js",
+        "studio/js/scrabble/scrabble_word_filter.js",
+        "studio/js/scrabble/scrabble_stack_manager.js",
+        "studio/js/scrabble/scrabble_engine.js",
+        "studio/js/scrabble/mobile-menu.js",
+        "studio/js/scrabble/scrabble_toast.js",
+        "studio/js/scrabble/scrabble_validator.js",
+    ],
+    "games/js/crossword.bundle.js": [
+        "games/js/crossword.js",
+    ],
+    "games/css/games.bundle.css": [
+        "games/css/lobby.css",
+        "games/css/crossword.css",
+    ],
+}
+STATIC_BUNDLES_ENABLED = False
+
+# Serve STATIC_ROOT from the app itself (mysite.static_serve)
+SERVE_STATIC = False
+
 MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = "/media/"
 
@@ -130,4 +202,58 @@ WAGTAILSEARCH_BACKENDS = {
 
 WAGTAILADMIN_BASE_URL = "http://localhost:8000"
 
-WAGTAILDOCS_EXTENSIONS = ['csv', 'docx', 'key', 'odt', 'pdf', 'pptx', 'rtf', 'txt', 'xlsx', 'zip']
\ No newline at end of file
+WAGTAILDOCS_EXTENSIONS = ['csv', 'docx', 'key', 'odt', 'pdf', 'pptx', 'rtf', 'txt', 'xlsx', 'zip']
+
+# Per-request instrumentation (mysite.timing): send a Server-Timing header and
+# log requests slower than this, with their slowest SQL statements.
+SERVER_TIMING_HEADER = True
+SLOW_REQUEST_THRESHOLD_MS = 500
+
+# On-demand profiling (mysite.profiling): staff tokens from "manage.py
+# profile_token", and optional 1-in-N sampling by URL name, e.g.
+# {"search": 100}. Profiles are written to PROFILER_DIR.
+PROFILER_DIR = BASE_DIR / "profiles"
+PROFILER_TOKEN_MAX_AGE = 60 * 60
+PROFILER_SAMPLE_VIEWS = {}
+
+# Token buckets for the public JSON APIs (mysite.ratelimit): per user or IP,
+# `burst` requests at once, refilled at `rate` per second. Buckets are kept
+# in this cache: with Redis all workers share them; with the local-memory
+# default each worker has its own, so each allows the full rate.
+RATELIMIT_ENABLED = True
+RATELIMIT_CACHE = "default"
+# Behind proxies, e.g. "HTTP_X_FORWARDED_FOR": the client address is the hop
+# RATELIMIT_TRUSTED_PROXIES (the number of proxies that append to the header)
+# from the right; hops further left are supplied by the client. Also used for
+# METRICS_ALLOWED_IPS.
+RATELIMIT_IP_HEADER = None
+RATELIMIT_TRUSTED_PROXIES = 1
+RATELIMITS = {
+    "word-api": {"rate": 5, "burst": 30},
+    "game-api": {"rate": 5, "burst": 30},
+}
+
+# Prometheus metrics (mysite.metrics): each process writes its values to
+# METRICS_DIR every METRICS_FLUSH_INTERVAL seconds, from a background thread,
+# and /metrics/ adds them up.
+# Scrapers must come from METRICS_ALLOWED_IPS or send the METRICS_TOKEN bearer token.
+METRICS_DIR = BASE_DIR / "metrics"  # tests use a temporary directory (mysite.testrunner)
+METRICS_FLUSH_INTERVAL = 5
+METRICS_ALLOWED_IPS = ["127.0.0.1", "::1"]
+METRICS_TOKEN = None
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "mysite.performance": {"handlers": ["console"], "level": "WARNING"},
+        "mysite.ratelimit": {"handlers": ["console"], "level": "WARNING"},
+    },
+}
+
+# Studio real-time rooms: pub/sub used to push moves to everyone in a room.
+# The local broker only reaches listeners in the same process.
+STUDIO_ROOM_BROKER = "studio.rooms.LocalBroker"
@@ -6,7 +6,11 @@ DEBUG = False
 # outdated JavaScript / CSS assets being served from cache
 # (e.g. after a Wagtail upgrade).
 # See https://docs.djangoproject.com/en/6.0/ref/contrib/staticfiles/#manifeststaticfilesstorage
-STORAGES["staticfiles"]["BACKEND"] = "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"
+# This subclass also builds the minified STATIC_BUNDLES and .gz/.br variants
+# of every hashed file, served by mysite.static_serve with far-future headers.
+STORAGES["staticfiles"]["BACKEND"] = "mysite.storage.BundledManifestStaticFilesStorage"
+STATIC_BUNDLES_ENABLED = True
+SERVE_STATIC = True
 
 try:
     from .local import *
@@ -0,0 +1,111 @@
+"""
+Serve collected static files from STATIC_ROOT inside the app.
+
+Enabled with settings.SERVE_STATIC (production). Picks the precompressed
+.br or .gz variant written by BundledManifestStaticFilesStorage when the
+client accepts it, and marks hashed file names as cacheable forever since
+their content can never change under that name.
+"""
+
+import mimetypes
+import os
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE_CONTROL = 'public, max-age=300'
+
+# Preferred order when the client accepts several
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Smaller files are read in one go; larger ones are streamed with FileResponse
+STREAM_THRESHOLD = 512 * 1024
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for item in header.split(','):
+        coding, _sep, params = item.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticFilesMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVE_STATIC', False) or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else '/' + settings.STATIC_URL
+        self.root = str(settings.STATIC_ROOT)
+        self.hashed_names = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.match(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.match(request) or await self.get_response(request)
+
+    def match(self, request):
+        if request.method in ('GET', 'HEAD') and request.path.startswith(self.prefix):
+            return self.serve(request, request.path[len(self.prefix):])
+        return None
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        stat = os.stat(path)
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+            response = HttpResponseNotModified()
+            self.set_cache_headers(response, name)
+            return response
+
+        content_type, _encoding = mimetypes.guess_type(path)
+        variants = [(coding, path + suffix) for coding, suffix in ENCODINGS if os.path.isfile(path + suffix)]
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        content_encoding = None
+        for coding, variant in variants:
+            if coding in accepted:
+                path, content_encoding = variant, coding
+                break
+
+        content_type = content_type or 'application/octet-stream'
+        if os.path.getsize(path) > STREAM_THRESHOLD:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+        else:
+            with open(path, 'rb') as handle:
+                response = HttpResponse(handle.read(), content_type=content_type)
+        if content_encoding:
+            response.headers['Content-Encoding'] = content_encoding
+        if variants:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        response.headers['Last-Modified'] = http_date(stat.st_mtime)
+        self.set_cache_headers(response, name)
+        return response
+
+    def set_cache_headers(self, response, name):
+        if name in self.hashed_names:
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers['Cache-Control'] = DEFAULT_CACHE_CONTROL
@@ -0,0 +1,87 @@
+"""
+Static file storage that bundles, minifies and precompresses on collectstatic.
+
+post_process() runs in three steps:
+
+1. each bundle in settings.STATIC_BUNDLES is concatenated from its source
+   files, minified and saved next to them
+2. ManifestStaticFilesStorage hashes everything (bundles included) and
+   writes staticfiles.json
+3. every hashed text asset gets .gz and, when the brotli package is
+   installed, .br siblings that StaticFilesMiddleware serves directly
+"""
+
+import gzip
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .minify import minify
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.js', '.css', '.json', '.svg', '.txt', '.html', '.map')
+MIN_COMPRESS_SIZE = 256
+
+
+def get_bundles():
+    return getattr(settings, 'STATIC_BUNDLES', {})
+
+
+class BundledManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+
+        for name in self.build_bundles(paths):
+            paths[name] = (self, name)
+
+        yield from super().post_process(paths, dry_run, **options)
+
+        for name in sorted(set(self.hashed_files.values())):
+            for compressed_name in self.compress(name):
+                yield name, compressed_name, True
+
+    def build_bundles(self, paths):
+        built = []
+        for bundle_name, sources in get_bundles().items():
+            parts = []
+            for source in sources:
+                if source not in paths:
+                    raise ValueError(f"Static bundle {bundle_name!r}: {source!r} was not collected")
+                storage, path = paths[source]
+                with storage.open(path) as handle:
+                    parts.append(minify(source, handle.read().decode('utf-8')))
+            # A newline keeps one file's trailing statement from running into the next
+            content = '\n'.join(parts)
+            if self.exists(bundle_name):
+                self.delete(bundle_name)
+            self._save(bundle_name, ContentFile(content.encode('utf-8')))
+            built.append(bundle_name)
+        return built
+
+    def compress(self, name):
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return
+        with self.open(name) as handle:
+            content = handle.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+
+        encoded = [(name + '.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            encoded.append((name + '.br', brotli.compress(content)))
+
+        for compressed_name, data in encoded:
+            # Not worth a second file if it barely saves anything
+            if len(data) >= len(content) * 0.95:
+                continue
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(data))
+            yield compressed_name
@@ -0,0 +1,26 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from mysite.storage import get_bundles
+
+register = template.Library()
+
+
+@register.simple_tag
+def bundle(name):
+    """
+    {% bundle 'studio/js/scrabble.bundle.js' %}
+
+    One tag for the built bundle when STATIC_BUNDLES_ENABLED, otherwise one
+    tag per source file so development edits show up without collectstatic.
+    """
+    if getattr(settings, 'STATIC_BUNDLES_ENABLED', False):
+        files = [name]
+    else:
+        files = get_bundles()[name]
+
+    if name.endswith('.css'):
+        return format_html_join('\n', '<link rel="stylesheet" href="{}">', ((static(f),) for f in files))
+    return format_html_join('\n', '<script src="{}"></script>', ((static(f),) for f in files))
@@ -0,0 +1,110 @@
+"""
+Page-level performance regression tests.
+
+Each test renders a page against bulk seed data (10k members, 1k pages by
+default; PERF_USERS / PERF_PAGES override) and fails if it issues more SQL
+queries than its budget. An N+1 regression grows with the seed data, so it
+blows the budget here long before it reaches production.
+
+Render times are recorded per page; set PERF_REPORT=path.json to save them.
+Budgets are for a warm request (the first request fills per-process caches
+such as Wagtail's site root paths) by an anonymous visitor unless noted.
+"""
+
+import json
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from home import seeding
+
+PERF_USERS = int(os.environ.get('PERF_USERS', 10_000))
+PERF_PAGES = int(os.environ.get('PERF_PAGES', 1_000))
+RENDER_RUNS = 3
+
+
+class PagePerformanceTests(TestCase):
+
+    render_times = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        seeding.seed_users(PERF_USERS)
+        seeding.seed_pages(PERF_PAGES)
+        cls.game_room = seeding.seed_game_room()
+        cls.admin = User.objects.create_superuser('perf-admin', 'admin@example.com', 'pw')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        report = os.environ.get('PERF_REPORT')
+        if report:
+            with open(report, 'w') as handle:
+                json.dump({
+                    'users': PERF_USERS,
+                    'pages': PERF_PAGES,
+                    'render_ms': cls.render_times,
+                }, handle, indent=2, sort_keys=True)
+
+    def setUp(self):
+        cache.clear()
+
+    @contextmanager
+    def assertQueryBudget(self, budget):
+        with CaptureQueriesContext(connection) as queries:
+            yield queries
+        if len(queries) > budget:
+            listing = '\n'.join(f"{i}. {q['sql']}" for i, q in enumerate(queries.captured_queries, start=1))
+            self.fail(f'{len(queries)} queries, budget is {budget}:\n{listing}')
+
+    def check_page(self, name, url, budget, params=None):
+        response = self.client.get(url, params)  # warm per-process caches
+        self.assertEqual(response.status_code, 200)
+
+        times = []
+        for _run in range(RENDER_RUNS):
+            start = time.perf_counter()
+            with self.assertQueryBudget(budget):
+                response = self.client.get(url, params)
+                response.content  # noqa: B018 - make sure lazy rendering happened
+            times.append((time.perf_counter() - start) * 1000)
+            self.assertEqual(response.status_code, 200)
+        self.render_times[name] = round(statistics.median(times), 2)
+        return response
+
+    def test_home_page(self):
+        self.check_page('home', '/', budget=4)
+
+    def test_home_page_member(self):
+        # User, profile and permissions all come from the cache. The session is
+        # one query: with a local-memory cache it is read from the database
+        self.client.force_login(User.objects.get(username=f'member{0:06d}'))
+        self.check_page('home_member', '/', budget=5)
+
+    def test_game_room(self):
+        self.check_page('game_room', self.game_room.url, budget=6)
+
+    def test_crossword(self):
+        self.check_page('crossword', reverse('games:crossword'), budget=2)
+
+    def test_studio(self):
+        self.check_page('studio', reverse('studio:studio_sandbox'), budget=1)
+
+    def test_search(self):
+        response = self.check_page('search', reverse('search'), budget=3, params={'query': 'garden'})
+        self.assertContains(response, 'Garden story')
+
+    def test_player_profile_changelist(self):
+        self.client.force_login(self.admin)
+        response = self.check_page(
+            'admin_player_profiles', reverse('admin:members_playerprofile_changelist'), budget=6
+        )
+        self.assertContains(response, f'member{PERF_USERS - 1:06d}')
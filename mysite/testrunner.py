@@ -0,0 +1,25 @@
+"""
+Test runner that keeps the tests' metrics out of the checkout.
+
+Every request through MetricsMiddleware in a test would otherwise write a
+process file into the default METRICS_DIR, BASE_DIR/metrics. The run gets
+a temporary directory instead, removed when the process exits (after the
+last flush, which also runs at exit).
+"""
+
+import atexit
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        metrics_dir = tempfile.mkdtemp(prefix='metrics-')
+        # Registered before any flush, so it runs after them
+        atexit.register(shutil.rmtree, metrics_dir, ignore_errors=True)
+        settings.METRICS_DIR = metrics_dir
@@ -0,0 +1,379 @@
+import gzip
+import json
+import os
+import pstats
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.files import File
+from django.template import Context, Template
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from wagtail.models import Page, Site
+
+from mysite import metrics, ratelimit
+from mysite.minify import minify_css, minify_js
+from mysite.profiling import make_token
+
+
+class MinifyTests(SimpleTestCase):
+
+    def test_js_strips_comments_and_keeps_literals(self):
+        source = (
+            "// header\n"
+            "const a = 'x  // not a comment';   /* block */\n"
+            "\n"
+            "    const re = /a\\/b  c/g;\n"
+            "const t = `keep   ${a}\n   this`;\n"
+            "const half = 4 / 2 / 1;\n"
+        )
+        self.assertEqual(minify_js(source), (
+            "const a = 'x  // not a comment';\n"
+            "const re = /a\\/b  c/g;\n"
+            "const t = `keep   ${a}\n   this`;\n"
+            "const half = 4 / 2 / 1;\n"
+        ))
+
+    def test_css(self):
+        source = "/* c */\n.a ,  .b {\n  color: red;\n  margin: 0 auto;\n}\n.c > .d { top: 0; }\n"
+        self.assertEqual(minify_css(source), ".a,.b{color: red;margin: 0 auto}.c>.d{top: 0}\n")
+
+
+class StaticBundleTests(SimpleTestCase):
+    """
+    collectstatic post-processing and serving of the built files.
+    """
+
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root)
+
+    def collect(self):
+        storage = staticfiles_storage
+        paths = {}
+        for sources in settings.STATIC_BUNDLES.values():
+            for source in sources:
+                with open(finders.find(source), 'rb') as handle:
+                    storage._save(source, File(handle))
+                paths[source] = (storage, source)
+        list(storage.post_process(paths))
+        return storage
+
+    def storage_settings(self):
+        return {
+            'STATIC_ROOT': self.static_root,
+            'STORAGES': {
+                **settings.STORAGES,
+                'staticfiles': {'BACKEND': 'mysite.storage.BundledManifestStaticFilesStorage'},
+            },
+        }
+
+    def test_bundles_are_hashed_and_precompressed(self):
+        with override_settings(**self.storage_settings()):
+            storage = self.collect()
+            hashed = storage.stored_name('studio/js/scrabble.bundle.js')
+            css = storage.stored_name('games/css/games.bundle.css')
+
+        self.assertNotEqual(hashed, 'studio/js/scrabble.bundle.js')
+        root = Path(self.static_root)
+        content = (root / hashed).read_bytes()
+        self.assertIn(b'function', content)
+        self.assertEqual(gzip.decompress((root / (hashed + '.gz')).read_bytes()), content)
+        self.assertTrue((root / css).exists())
+
+    def test_middleware_serves_compressed_with_far_future_headers(self):
+        with override_settings(**self.storage_settings(), SERVE_STATIC=True):
+            hashed = self.collect().stored_name('games/js/crossword.bundle.js')
+            client = Client()
+            response = client.get('/static/' + hashed, HTTP_ACCEPT_ENCODING='gzip, deflate')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(response['Content-Type'], 'text/javascript')
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertIn('Accept-Encoding', response['Vary'])
+            body = gzip.decompress(response.content)
+            self.assertIn(b'initGame', body)
+
+            response = client.get('/static/' + hashed, HTTP_ACCEPT_ENCODING='identity')
+            self.assertFalse(response.has_header('Content-Encoding'))
+
+            response = client.get('/static/games/js/crossword.bundle.js')
+            self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_bundle_tag(self):
+        template = Template("{% load static_bundles %}{% bundle 'games/css/games.bundle.css' %}")
+        html = template.render(Context())
+        self.assertIn('games/css/lobby.css', html)
+        self.assertIn('games/css/crossword.css', html)
+
+        with override_settings(STATIC_BUNDLES_ENABLED=True):
+            html = template.render(Context())
+        self.assertEqual(html, '<link rel="stylesheet" href="/static/games/css/games.bundle.css">')
+
+
+class ServerTimingTests(TestCase):
+
+    def setUp(self):
+        root = Page.get_first_root_node()
+        Site.objects.create(hostname='testserver', root_page=root, is_default_site=True)
+        self.page = root.add_child(instance=Page(title='Timing', slug='timing'))
+
+    def test_header_reports_queries_templates_and_cache(self):
+        cache.clear()
+        with self.assertNoLogs('mysite.performance'):
+            response = self.client.get(self.page.url)
+
+        header = response['Server-Timing']
+        self.assertRegex(header, r'^total;dur=[\d.]+, app;dur=[\d.]+, db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn('tpl;dur=', header)
+
+        response = self.client.get(reverse('search_autocomplete'), {'q': 'cross'})
+        self.assertRegex(response['Server-Timing'], r'cache;desc="\d+ hits, [1-9]\d* misses"')
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0)
+    def test_slow_requests_are_logged_with_their_sql(self):
+        with self.assertLogs('mysite.performance', 'WARNING') as logs:
+            self.client.get(self.page.url)
+        self.assertIn('Slow request: GET /timing/ 200', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+
+class ProfilerTests(TestCase):
+
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+        self.staff = User.objects.create_user('evelyn', password='pw', is_staff=True)
+        self.url = reverse('search_autocomplete')
+
+    def test_staff_token_profiles_the_request(self):
+        with override_settings(PROFILER_DIR=self.profile_dir):
+            response = self.client.get(self.url, {'q': 'cross', '_profile': make_token(self.staff)})
+            profile_id = response['X-Profile-Id']
+            self.assertTrue(profile_id.endswith('.prof'))
+            pstats.Stats(str(Path(self.profile_dir) / profile_id))
+
+            response = self.client.get(self.url, {'q': 'cross', '_profile': make_token(self.staff),
+                                                  '_profile_mode': 'sample'})
+            self.assertTrue(response['X-Profile-Id'].endswith('.collapsed'))
+
+            self.client.force_login(self.staff)
+            response = self.client.get(reverse('download_profile', args=[profile_id]))
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('attachment', response['Content-Disposition'])
+
+    def test_other_tokens_are_ignored(self):
+        member = User.objects.create_user('arthur', password='pw')
+        with override_settings(PROFILER_DIR=self.profile_dir):
+            response = self.client.get(self.url, {'q': 'cross', '_profile': make_token(member)})
+            self.assertFalse(response.has_header('X-Profile-Id'))
+            response = self.client.get(self.url, {'q': 'cross', '_profile': 'evelyn:forged:sig'})
+            self.assertFalse(response.has_header('X-Profile-Id'))
+
+    def test_sampled_views(self):
+        with override_settings(PROFILER_DIR=self.profile_dir, PROFILER_SAMPLE_VIEWS={'search_autocomplete': 3}):
+            profiled = [self.client.get(self.url).has_header('X-Profile-Id') for _ in range(6)]
+        self.assertEqual(profiled, [False, False, True, False, False, True])
+
+    async def test_async_requests_use_the_sampler(self):
+        with override_settings(PROFILER_DIR=self.profile_dir):
+            response = await self.async_client.post(
+                reverse('studio:validate_word'), '{"word": "QI"}', content_type='application/json',
+                headers={'X-Profile-Token': make_token(self.staff)},
+            )
+        self.assertTrue(response['X-Profile-Id'].endswith('.collapsed'))
+
+
+class RateLimitTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        ratelimit._store = None
+        self.addCleanup(setattr, ratelimit, '_store', None)
+        self.addCleanup(cache.clear)
+
+    def test_bucket_refills_at_rate(self):
+        key = 'rl:test:ip:1.2.3.4'
+        self.assertEqual([ratelimit.take_token(key, 1, 3, now=100) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(ratelimit.take_token(key, 1, 3, now=100), 1.0)
+        self.assertAlmostEqual(ratelimit.take_token(key, 1, 3, now=100.5), 0.5)
+        self.assertEqual(ratelimit.take_token(key, 1, 3, now=101.5), 0)
+
+    def test_concurrent_checks_take_each_token_once(self):
+        key = 'rl:test:ip:9.9.9.9'
+        store = ratelimit.get_store()
+        cache_get = store.cache.get
+        barrier = threading.Barrier(8)
+
+        def slow_get(*args, **kwargs):
+            # Widen the gap between reading a bucket and writing it back
+            value = cache_get(*args, **kwargs)
+            time.sleep(0.01)
+            return value
+
+        def take(_):
+            barrier.wait()
+            return ratelimit.take_token(key, 0.001, 4, now=100)
+
+        with mock.patch.object(store.cache, 'get', side_effect=slow_get), ThreadPoolExecutor(8) as pool:
+            waits = list(pool.map(take, range(8)))
+        self.assertEqual(waits.count(0), 4)
+
+    @override_settings(RATELIMITS={'word-api': {'rate': 0.5, 'burst': 2}})
+    def test_validate_word_returns_429_with_retry_after(self):
+        url = reverse('studio:validate_word')
+        statuses = []
+        for _ in range(3):
+            response = self.client.post(url, '{"word": "QI"}', content_type='application/json')
+            statuses.append(response.status_code)
+        self.assertEqual(statuses, [200, 200, 429])
+        self.assertEqual(response['Retry-After'], '2')
+
+        # Another client has its own bucket
+        response = self.client.post(url, '{"word": "QI"}', content_type='application/json',
+                                    REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(RATELIMIT_IP_HEADER='HTTP_X_FORWARDED_FOR', RATELIMIT_TRUSTED_PROXIES=1,
+                       RATELIMITS={'word-api': {'rate': 0.5, 'burst': 1}})
+    def test_spoofed_forwarded_hops_share_the_clients_bucket(self):
+        url = reverse('studio:validate_word')
+        statuses = [
+            self.client.post(url, '{"word": "QI"}', content_type='application/json',
+                             HTTP_X_FORWARDED_FOR=f'{spoofed}, 203.0.113.7').status_code
+            for spoofed in ('1.1.1.1', '2.2.2.2', '127.0.0.1')
+        ]
+        self.assertEqual(statuses, [200, 429, 429])
+
+        request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='127.0.0.1, 203.0.113.7, 10.0.0.1')
+        self.assertEqual(ratelimit.client_ip(request), '10.0.0.1')
+        with override_settings(RATELIMIT_TRUSTED_PROXIES=2):
+            self.assertEqual(ratelimit.client_ip(request), '203.0.113.7')
+
+    def test_falls_back_to_memory_when_cache_fails(self):
+        store = ratelimit.get_store()
+        with mock.patch.object(store.cache, 'get', side_effect=ConnectionError), \
+                mock.patch.object(store.cache, 'set', side_effect=ConnectionError), \
+                self.assertLogs('mysite.ratelimit', 'WARNING'):
+            waits = [ratelimit.take_token('rl:test:ip:5.6.7.8', 1, 2, now=10) for _ in range(3)]
+        self.assertEqual(waits[:2], [0, 0])
+        self.assertGreater(waits[2], 0)
+
+
+class MetricsTests(TestCase):
+
+    def setUp(self):
+        self.metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.metrics_dir)
+        overrides = override_settings(METRICS_DIR=self.metrics_dir, METRICS_TOKEN='s3cret')
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def scrape(self, **extra):
+        return self.client.get(reverse('metrics'), **extra)
+
+    def test_renders_counters_and_cumulative_histograms(self):
+        merged = {
+            'hits_total': {'kind': 'counter', 'help': 'Hits', 'labels': ['view'], 'buckets': [],
+                           'values': {('a"b',): 3}},
+            'latency_seconds': {'kind': 'histogram', 'help': 'Latency', 'labels': [], 'buckets': [0.1, 1],
+                                'values': {(): [2, 1, 1, 4.5]}},
+        }
+        self.assertEqual(metrics.render(merged), (
+            '# HELP hits_total Hits\n'
+            '# TYPE hits_total counter\n'
+            'hits_total{view="a\\"b"} 3\n'
+            '# HELP latency_seconds Latency\n'
+            '# TYPE latency_seconds histogram\n'
+            'latency_seconds_bucket{le="0.1"} 2\n'
+            'latency_seconds_bucket{le="1.0"} 3\n'
+            'latency_seconds_bucket{le="+Inf"} 4\n'
+            'latency_seconds_sum 4.5\n'
+            'latency_seconds_count 4\n'
+        ))
+
+    def test_adds_up_every_process(self):
+        cache.clear()
+        response = self.client.post(reverse('studio:validate_word'), '{"word": "QI"}',
+                                    content_type='application/json')
+        result = 'valid' if response.json()['valid'] else 'invalid'
+        metrics.flush()
+        mine = metrics.collect()
+        checks = mine['studio_word_checks_total']['values'][(result,)]
+
+        # Another live worker's file: counters add up, gauges take the largest value
+        other = {
+            'studio_word_checks_total': {'kind': 'counter', 'help': '', 'labels': ['result'], 'buckets': [],
+                                         'values': [[[result], 5]]},
+            'studio_lexicon_words': {'kind': 'gauge', 'help': '', 'labels': [], 'buckets': [],
+                                     'values': [[[], 1]]},
+        }
+        (Path(self.metrics_dir) / f'{os.getppid()}-other.json').write_text(json.dumps(other))
+        merged = metrics.collect()
+        self.assertEqual(merged['studio_word_checks_total']['values'][(result,)], checks + 5)
+        self.assertEqual(merged['studio_lexicon_words']['values'][()],
+                         max(mine['studio_lexicon_words']['values'][()], 1))
+
+    def test_exited_processes_are_folded_into_the_totals(self):
+        directory = Path(self.metrics_dir)
+
+        def write(name, things, level):
+            directory.joinpath(name).write_text(json.dumps({
+                'test_things_total': {'kind': 'counter', 'help': '', 'labels': [], 'buckets': [],
+                                      'values': [[[], things]]},
+                'test_level': {'kind': 'gauge', 'help': '', 'labels': [], 'buckets': [],
+                               'values': [[[], level]]},
+            }))
+
+        write(f'{os.getppid()}-live.json', 2, 1)
+        write('999999999-gone.json', 5, 100)  # no such pid
+        for _scrape in range(2):
+            merged = metrics.collect()
+            self.assertEqual(merged['test_things_total']['values'][()], 7)
+            # A gauge of an exited process no longer applies
+            self.assertEqual(merged['test_level']['values'][()], 1)
+        self.assertFalse(directory.joinpath('999999999-gone.json').exists())
+        self.assertTrue(directory.joinpath(metrics.TOTALS_FILE).exists())
+
+        # Left behind by a crash after it was folded in: not counted twice
+        write('999999999-gone.json', 5, 100)
+        totals = json.loads(directory.joinpath(metrics.TOTALS_FILE).read_text())
+        self.assertIn('999999999-gone.json', totals['absorbed'])
+        self.assertEqual(metrics.collect()['test_things_total']['values'][()], 7)
+        self.assertFalse(directory.joinpath('999999999-gone.json').exists())
+
+    def test_endpoint_reports_request_latency_by_view(self):
+        self.client.get(reverse('search_autocomplete'), {'q': 'cross'})
+        response = self.scrape()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertRegex(body, r'http_request_duration_seconds_count\{view="search_autocomplete"\} [1-9]')
+        self.assertRegex(body, r'search_queries_total\{endpoint="autocomplete"\} [1-9]')
+        self.assertIn('cache_lookups_total{result="miss"}', body)
+
+    def test_responses_leave_flushing_to_one_thread_per_process(self):
+        with mock.patch.object(metrics, 'flush') as flush, \
+                mock.patch.object(metrics, '_flusher_pid', None), \
+                mock.patch('mysite.metrics.atexit'), \
+                mock.patch('mysite.metrics.threading.Thread') as thread:
+            self.client.get(reverse('search_autocomplete'), {'q': 'cross'})
+            self.client.get(reverse('search_autocomplete'), {'q': 'cross'})
+        flush.assert_not_called()
+        thread.assert_called_once_with(target=metrics._flush_periodically, name='metrics-flush', daemon=True)
+
+    def test_endpoint_is_limited_to_allowed_ips_or_token(self):
+        self.assertEqual(self.scrape(REMOTE_ADDR='10.0.0.9').status_code, 404)
+        self.assertEqual(self.scrape(REMOTE_ADDR='10.0.0.9', HTTP_AUTHORIZATION='Bearer nope').status_code, 404)
+        self.assertEqual(self.scrape(REMOTE_ADDR='10.0.0.9', HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+        with override_settings(RATELIMIT_IP_HEADER='HTTP_X_FORWARDED_FOR'):
+            self.assertEqual(self.scrape(HTTP_X_FORWARDED_FOR='127.0.0.1, 10.0.0.9').status_code, 404)
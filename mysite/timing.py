@@ -0,0 +1,162 @@
+"""
+Per-request performance instrumentation.
+
+ServerTimingMiddleware records, for every request:
+
+- total time spent inside the middleware
+- SQL query count and time (a database execute wrapper on every connection)
+- template render time (for TemplateResponses, which is what Wagtail pages
+  return: measured from process_template_response to the post-render callback)
+- cache hits and misses (counted by the backends in mysite.cache)
+
+and reports them in a Server-Timing header, which browser dev tools show
+next to the request. Requests slower than SLOW_REQUEST_THRESHOLD_MS are
+logged to "mysite.performance" with their slowest SQL statements.
+
+The per-request state lives in a context variable, so it follows the request
+into sync_to_async threads under ASGI. Each query costs two perf_counter()
+calls and at most one small heap push.
+"""
+
+import heapq
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger('mysite.performance')
+
+TOP_QUERIES = 5
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.slowest = []   # min-heap of (duration, sql), at most TOP_QUERIES
+        self.template_start = None
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add_query(self, sql, duration):
+        self.queries += 1
+        self.sql_time += duration
+        if len(self.slowest) < TOP_QUERIES:
+            heapq.heappush(self.slowest, (duration, sql))
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (duration, sql))
+
+    def top_queries(self):
+        return sorted(self.slowest, reverse=True)
+
+    def header(self, total):
+        app = max(total - self.sql_time - self.template_time, 0.0)
+        parts = [
+            f'total;dur={total * 1000:.1f}',
+            f'app;dur={app * 1000:.1f}',
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries"',
+        ]
+        if self.template_time:
+            parts.append(f'tpl;dur={self.template_time * 1000:.1f}')
+        if self.cache_hits or self.cache_misses:
+            parts.append(f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"')
+        return ', '.join(parts)
+
+
+def record_cache_lookup(hits, misses=0):
+    timings = _current.get()
+    if timings is not None:
+        timings.cache_hits += hits
+        timings.cache_misses += misses
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add_query(sql, time.perf_counter() - start)
+
+
+def _install_wrapper(connection, **kwargs):
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+class ServerTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', 500) / 1000
+        self.send_header = getattr(settings, 'SERVER_TIMING_HEADER', True)
+
+        connection_created.connect(_install_wrapper, dispatch_uid='mysite.timing')
+        for connection in connections.all(initialized_only=True):
+            _install_wrapper(connection)
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings)
+
+    def process_template_response(self, request, response):
+        timings = _current.get()
+        if timings is not None:
+            timings.template_start = time.perf_counter()
+
+            def rendered(response):
+                timings.template_time += time.perf_counter() - timings.template_start
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, timings):
+        total = time.perf_counter() - timings.start
+        if self.send_header:
+            response.headers['Server-Timing'] = timings.header(total)
+        # Event streams stay open by design; their duration says nothing
+        if total >= self.threshold and not response.streaming:
+            self.log_slow_request(request, response, timings, total)
+        return response
+
+    def log_slow_request(self, request, response, timings, total):
+        lines = [
+            f'Slow request: {request.method} {request.path} {response.status_code} '
+            f'{total * 1000:.0f}ms ({timings.queries} queries, {timings.sql_time * 1000:.0f}ms SQL, '
+            f'{timings.template_time * 1000:.0f}ms templates, '
+            f'cache {timings.cache_hits} hits/{timings.cache_misses} misses)'
+        ]
+        for duration, sql in timings.top_queries():
+            lines.append(f'  {duration * 1000:.1f}ms  {sql[:500]}')
+        logger.warning('\n'.join(lines))
@@ -2,31 +2,30 @@ from django.conf import settings
 from django.urls import include, path
 from django.contrib import admin
 from studio import urls as studio_urls
+from games import urls as games_urls
+from members import urls as members_urls
+from search import views as search_views
+from mysite import metrics, profiling
 
 from wagtail.admin import urls as wagtailadmin_urls
 from wagtail import urls as wagtail_urls
 from wagtail.documents import urls as wagtaildocs_urls
 
-# Import the view from your games app
-from games import views as game_views 
-
-# 1. Define the patterns we want to namespace
-# This creates a 'bucket' called 'games' for your crossword and lobby
-game_patterns = ([
-    path('crossword/', game_views.crossword_view, name='crossword'),
-    # If your lobby is a standard view, add it here:
-    # path('lobby/', game_views.lobby_view, name='lobby'), 
-], 'games')
-
 urlpatterns = [
     path("django-admin/", admin.site.urls),
     path("admin/", include(wagtailadmin_urls)),
     path("documents/", include(wagtaildocs_urls)),
 
-    # 2. THE NAMESPACED PATH
     # This makes 'games:crossword' work in your templates
-    path('games/', include(game_patterns)),
+    path('games/', include(games_urls)),
     path('studio/', include(studio_urls)),
+    path('members/', include(members_urls)),
+
+    path("search/", search_views.search, name="search"),
+    path("search/autocomplete/", search_views.autocomplete, name="search_autocomplete"),
+
+    path("profiles/<str:profile_id>/", profiling.download_profile, name="download_profile"),
+    path("metrics/", metrics.metrics_view, name="metrics"),
 
     # Wagtail handles everything else
     path("", include(wagtail_urls)),
@@ -0,0 +1,160 @@
+"""
+Prefix index behind the search-as-you-type endpoint.
+
+The index is built from the titles of live pages without view restrictions
+(plus the fixed game entry points) whenever a page is published,
+unpublished, moved or deleted, or a view restriction changes. It is stored in
+the default cache so every worker shares one copy, and each process keeps the
+last version it loaded in memory. A keystroke therefore costs one small cache
+read and a binary search; it never touches the database or the search backend.
+
+Sharing needs a shared cache (Redis). With the per-process local-memory
+cache, a rebuild in one worker isn't seen by the others, so there each
+process also rebuilds its own copy once it is AUTOCOMPLETE_LOCAL_TTL seconds
+old.
+"""
+
+import bisect
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.urls import NoReverseMatch, reverse
+
+from wagtail.models import Page
+
+from mysite.cache import is_process_local
+
+INDEX_CACHE_KEY = "search:autocomplete:index"
+VERSION_CACHE_KEY = "search:autocomplete:version"
+
+MAX_SUGGESTIONS = 8
+MAX_QUERY_LENGTH = 64
+LOCAL_TTL = 60
+
+# Non-page destinations worth suggesting: (title, url name, kind)
+GAME_SUGGESTIONS = [
+    ("Scrabble", "studio:studio_sandbox", "game"),
+    ("Crossword", "games:crossword", "game"),
+]
+
+_WORD_RE = re.compile(r"\w+")
+
+# Per-process copy of the shared index: {"version": ..., "keys": [...], "entries": [...]}
+_local_index = None
+
+
+def normalise(text):
+    """Lower-case text and collapse everything that isn't a word character."""
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def _index_keys(title):
+    """Yield one key per word start, so "senior" matches "The Senior Addendum"."""
+    words = normalise(title).split()
+    for i in range(len(words)):
+        yield " ".join(words[i:])
+
+
+def _page_entries():
+    # Not view-restricted pages: suggestions would leak their titles
+    for page in Page.objects.live().public().filter(depth__gt=1).iterator():
+        url = page.get_url()
+        if url:
+            yield (page.title, url, "page")
+
+
+def _game_entries():
+    for title, url_name, kind in GAME_SUGGESTIONS:
+        try:
+            yield (title, reverse(url_name), kind)
+        except NoReverseMatch:
+            continue
+
+
+def build_index():
+    """
+    Build the index structure: a sorted list of (key, entry id) pairs and the
+    entries they point at. Shorter titles sort first among equal prefixes.
+    """
+    entries = []
+    seen = set()
+    for title, url, kind in list(_game_entries()) + list(_page_entries()):
+        if (title, url) in seen:
+            continue
+        seen.add((title, url))
+        entries.append({"title": title, "url": url, "kind": kind})
+
+    keys = []
+    for entry_id, entry in enumerate(entries):
+        for key in _index_keys(entry["title"]):
+            keys.append((key, len(entry["title"]), entry_id))
+    keys.sort()
+
+    return {
+        "keys": [key for key, _length, _entry_id in keys],
+        "ids": [entry_id for _key, _length, entry_id in keys],
+        "entries": entries,
+    }
+
+
+def rebuild_index():
+    """Rebuild the shared index and publish a new version to all workers."""
+    global _local_index
+    index = build_index()
+    index["version"] = uuid.uuid4().hex
+    cache.set(INDEX_CACHE_KEY, index, None)
+    cache.set(VERSION_CACHE_KEY, index["version"], None)
+    index["loaded_at"] = time.monotonic()
+    _local_index = index
+    return index
+
+
+def _expired(index):
+    if not is_process_local(caches[DEFAULT_CACHE_ALIAS]):
+        return False
+    ttl = getattr(settings, "AUTOCOMPLETE_LOCAL_TTL", LOCAL_TTL)
+    return time.monotonic() - index["loaded_at"] >= ttl
+
+
+def get_index():
+    """Return the current index, reloading it only when another worker rebuilt it."""
+    global _local_index
+    version = cache.get(VERSION_CACHE_KEY)
+    if _local_index is not None and _local_index["version"] == version:
+        if _expired(_local_index):
+            return rebuild_index()
+        return _local_index
+
+    index = cache.get(INDEX_CACHE_KEY)
+    if index is None or index["version"] != version:
+        return rebuild_index()
+
+    index["loaded_at"] = time.monotonic()
+    _local_index = index
+    return index
+
+
+def suggest(query, limit=MAX_SUGGESTIONS):
+    """Return up to ``limit`` suggestions whose title has a word starting with ``query``."""
+    prefix = normalise(query[:MAX_QUERY_LENGTH])
+    if not prefix:
+        return []
+
+    index = get_index()
+    keys, ids, entries = index["keys"], index["ids"], index["entries"]
+
+    results = []
+    seen = set()
+    position = bisect.bisect_left(keys, prefix)
+    while position < len(keys) and len(results) < limit:
+        if not keys[position].startswith(prefix):
+            break
+        entry_id = ids[position]
+        if entry_id not in seen:
+            seen.add(entry_id)
+            results.append(entries[entry_id])
+        position += 1
+    return results
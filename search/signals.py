@@ -0,0 +1,47 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from wagtail.models import Page, PageViewRestriction
+from wagtail.signals import page_published, page_unpublished, post_page_move
+
+from .autocomplete import rebuild_index
+
+
+def schedule_rebuild():
+    """
+    Rebuild once the transaction commits (never on rollback), and only once
+    however many pages it published or deleted - a subtree delete sends
+    post_delete for every page in it. Each change queues a callback, but only
+    the first to run finds the connection's pending flag set and rebuilds.
+    """
+    connection = transaction.get_connection()
+    connection._autocomplete_rebuild_pending = True
+    transaction.on_commit(partial(_rebuild_if_pending, connection))
+
+
+def _rebuild_if_pending(connection):
+    if connection.__dict__.pop('_autocomplete_rebuild_pending', False):
+        rebuild_index()
+
+
+# Rebuild the autocomplete prefix index whenever the set of live titles changes
+@receiver(page_published)
+@receiver(page_unpublished)
+@receiver(post_page_move)
+def rebuild_autocomplete_index(sender, **kwargs):
+    schedule_rebuild()
+
+
+@receiver(post_delete)
+def rebuild_autocomplete_index_on_delete(sender, instance, **kwargs):
+    if isinstance(instance, (Page, PageViewRestriction)):
+        schedule_rebuild()
+
+
+# View-restricted pages are left out of the index
+@receiver(post_save, sender=PageViewRestriction)
+def rebuild_autocomplete_index_on_restriction(sender, **kwargs):
+    schedule_rebuild()
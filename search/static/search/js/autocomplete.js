@@ -0,0 +1,36 @@
+/* FILE: search/static/search/js/autocomplete.js */
+/* SYNC: Search-as-you-type suggestions from /search/autocomplete/ */
+
+(function () {
+    const input = document.querySelector('[data-autocomplete-url]');
+    if (!input) return;
+
+    const list = document.getElementById(input.getAttribute('list'));
+    const url = input.dataset.autocompleteUrl;
+    let timer = null;
+    let lastQuery = '';
+
+    input.addEventListener('input', () => {
+        clearTimeout(timer);
+        timer = setTimeout(async () => {
+            const query = input.value.trim();
+            if (!query || query === lastQuery) return;
+            lastQuery = query;
+
+            try {
+                const response = await fetch(`${url}?q=${encodeURIComponent(query)}`);
+                const data = await response.json();
+                if (data.query !== input.value.trim()) return;  // stale response
+
+                list.innerHTML = '';
+                data.suggestions.forEach(item => {
+                    const option = document.createElement('option');
+                    option.value = item.title;
+                    list.appendChild(option);
+                });
+            } catch (e) {
+                console.error('Autocomplete error', e);
+            }
+        }, 120);
+    });
+})();
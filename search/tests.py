@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from wagtail.models import Page, PageViewRestriction, Site
+
+from search import autocomplete
+
+
+class AutocompleteTests(TestCase):
+    """
+    Tests for the prefix index behind the autocomplete endpoint.
+    """
+
+    def setUp(self):
+        cache.clear()
+        autocomplete._local_index = None
+        root_page = Page.get_first_root_node()
+        Site.objects.create(hostname="testsite", root_page=root_page, is_default_site=True)
+        self.page = root_page.add_child(instance=Page(title="The Senior Addendum", slug="senior"))
+        autocomplete.rebuild_index()
+
+    def test_suggest_matches_any_word_prefix(self):
+        titles = [s["title"] for s in autocomplete.suggest("sen")]
+        self.assertEqual(titles, ["The Senior Addendum"])
+        titles = [s["title"] for s in autocomplete.suggest("ADD")]
+        self.assertEqual(titles, ["The Senior Addendum"])
+
+    def test_suggest_includes_games(self):
+        suggestions = autocomplete.suggest("cross")
+        self.assertEqual(suggestions[0]["kind"], "game")
+        self.assertEqual(suggestions[0]["url"], reverse("games:crossword"))
+
+    def test_unpublish_rebuilds_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.page.unpublish()
+        self.assertEqual(autocomplete.suggest("senior"), [])
+
+    def test_subtree_delete_rebuilds_once_after_commit(self):
+        for i in range(3):
+            self.page.add_child(instance=Page(title=f"Chapter {i}", slug=f"chapter-{i}"))
+        with mock.patch("search.signals.rebuild_index", wraps=autocomplete.rebuild_index) as rebuild:
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.page.delete()
+            rebuild.assert_not_called()
+            for callback in callbacks:
+                callback()
+        rebuild.assert_called_once()
+        self.assertEqual(autocomplete.suggest("chapter"), [])
+
+    def test_view_restricted_pages_are_not_suggested(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            restriction = PageViewRestriction.objects.create(
+                page=self.page, restriction_type=PageViewRestriction.LOGIN
+            )
+        self.assertEqual(autocomplete.suggest("senior"), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            restriction.delete()
+        self.assertEqual([s["title"] for s in autocomplete.suggest("senior")], ["The Senior Addendum"])
+
+    def test_endpoint_does_not_query_database(self):
+        url = reverse("search_autocomplete")
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"q": "sen"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("max-age=60", response["Cache-Control"])
+        self.assertEqual(response.json()["suggestions"][0]["title"], "The Senior Addendum")
@@ -1,8 +1,15 @@
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.http import JsonResponse
 from django.template.response import TemplateResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_GET
 
 from wagtail.models import Page
 
+from mysite import metrics
+
+from .autocomplete import suggest
+
 # To enable logging of search queries for use with the "Promoted search results" module
 # <https://docs.wagtail.org/en/stable/reference/contrib/searchpromotions.html>
 # uncomment the following line and the lines indicated in the search function
@@ -10,6 +17,8 @@ from wagtail.models import Page
 
 # from wagtail.contrib.search_promotions.models import Query
 
+SEARCHES = metrics.Counter('search_queries_total', 'Search queries by endpoint', ['endpoint'])
+
 
 def search(request):
     search_query = request.GET.get("query", None)
@@ -17,6 +26,7 @@ def search(request):
 
     # Search
     if search_query:
+        SEARCHES.inc('search')
         search_results = Page.objects.live().search(search_query)
 
         # To log this query for use with the "Promoted search results" module:
@@ -44,3 +54,17 @@ def search(request):
             "search_results": search_results,
         },
     )
+
+
+@require_GET
+def autocomplete(request):
+    """
+    Search-as-you-type suggestions served from the in-memory prefix index
+    GET /search/autocomplete/?q=sen
+    Returns: {"query": "sen", "suggestions": [{"title": ..., "url": ..., "kind": ...}]}
+    """
+    query = request.GET.get("q", "").strip()
+    SEARCHES.inc("autocomplete")
+    response = JsonResponse({"query": query, "suggestions": suggest(query)})
+    patch_cache_control(response, public=True, max_age=60)
+    return response
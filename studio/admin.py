@@ -1,3 +1,23 @@
 from django.contrib import admin
+from .models import ScrabbleGame, ScrabbleMove, ScrabblePlayer
 
-# Register your models here.
+
+class ScrabblePlayerInline(admin.TabularInline):
+    model = ScrabblePlayer
+    extra = 0
+
+
+@admin.register(ScrabbleGame)
+class ScrabbleGameAdmin(admin.ModelAdmin):
+    list_display = ['id', 'status', 'move_count', 'current_seat', 'updated_at']
+    list_filter = ['status']
+    readonly_fields = ['board', 'bag', 'racks', 'scores', 'move_count', 'created_at', 'updated_at']
+    inlines = [ScrabblePlayerInline]
+
+
+@admin.register(ScrabbleMove)
+class ScrabbleMoveAdmin(admin.ModelAdmin):
+    list_display = ['game', 'seq', 'seat', 'kind', 'word', 'score', 'created_at']
+    list_filter = ['kind']
+    list_select_related = ['game']
+    readonly_fields = ['game', 'seq', 'seat', 'kind', 'placements', 'word', 'score', 'board_snapshot', 'created_at']
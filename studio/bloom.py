@@ -0,0 +1,114 @@
+"""
+A Bloom filter of the studio word list for the Scrabble front end.
+
+The browser loads it once (a hashed, immutable static file) and rejects
+words that are certainly not in the lexicon without a round trip; words it
+might contain are still confirmed by the validate_word API on submit.
+
+File format (big-endian): b'BLM1', then uint32 bit count, hash count and
+word count, then the bit array (bit i is byte i >> 3, mask 1 << (i & 7)).
+Bit positions use double hashing over the word's UTF-8 bytes:
+(h1 + i * h2) % bits for i in range(hashes), where h1 and h2 are 32-bit
+FNV-1a hashes with different offset bases. scrabble_word_filter.js
+implements the same lookup and must be kept in step with this module.
+"""
+
+import math
+import struct
+
+from django.templatetags.static import static
+
+MAGIC = b'BLM1'
+HEADER = struct.Struct('>4sIII')
+STATIC_NAME = 'studio/lexicon/words.bloom'
+DEFAULT_FALSE_POSITIVE_RATE = 0.01
+MAX_HASHES = 16
+
+FNV_PRIME = 0x01000193
+H1_BASIS = 0x811C9DC5
+H2_BASIS = 0x050C5D1F
+
+
+def _fnv1a(data, basis):
+    h = basis
+    for byte in data:
+        h = ((h ^ byte) * FNV_PRIME) & 0xFFFFFFFF
+    return h
+
+
+def _positions(word, num_bits, num_hashes):
+    data = word.encode('utf-8')
+    h1 = _fnv1a(data, H1_BASIS)
+    h2 = _fnv1a(data, H2_BASIS) | 1
+    return [(h1 + i * h2) % num_bits for i in range(num_hashes)]
+
+
+def optimal_size(count, false_positive_rate):
+    """(bits, hashes) for count words at the given false-positive rate"""
+    count = max(count, 1)
+    num_bits = math.ceil(-count * math.log(false_positive_rate) / math.log(2) ** 2)
+    return num_bits, hashes_for(count, num_bits)
+
+
+def hashes_for(count, num_bits):
+    return min(max(round(num_bits / max(count, 1) * math.log(2)), 1), MAX_HASHES)
+
+
+class BloomFilter:
+
+    def __init__(self, num_bits, num_hashes, count=0, bits=None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.count = count
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+
+    @classmethod
+    def from_words(cls, words, false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE, max_bytes=None):
+        """
+        Size the filter for the words at false_positive_rate; max_bytes caps
+        the size, trading a higher false-positive rate for a smaller download
+        """
+        words = list(words)
+        num_bits, num_hashes = optimal_size(len(words), false_positive_rate)
+        if max_bytes and num_bits > max_bytes * 8:
+            num_bits = max_bytes * 8
+            num_hashes = hashes_for(len(words), num_bits)
+        bloom = cls(num_bits, num_hashes)
+        for word in words:
+            bloom.add(word)
+        return bloom
+
+    def add(self, word):
+        for position in _positions(word, self.num_bits, self.num_hashes):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, word):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in _positions(word, self.num_bits, self.num_hashes)
+        )
+
+    def expected_false_positive_rate(self):
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def to_bytes(self):
+        return HEADER.pack(MAGIC, self.num_bits, self.num_hashes, self.count) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, num_bits, num_hashes, count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError('Not a word filter file')
+        bits = bytearray(data[HEADER.size:])
+        if len(bits) != (num_bits + 7) // 8:
+            raise ValueError('Truncated word filter file')
+        return cls(num_bits, num_hashes, count, bits)
+
+
+def filter_url():
+    """URL of the built filter, or None when it hasn't been built"""
+    try:
+        return static(STATIC_NAME)
+    except ValueError:  # not in the ManifestStaticFilesStorage manifest
+        return None
@@ -0,0 +1,95 @@
+"""
+Compact encodings for stored Scrabble games.
+
+Board: 225 characters, row-major (index = y * 15 + x). '.' is an empty
+square, 'A'-'Z' a lettered tile and 'a'-'z' a blank played as that letter.
+
+Racks and the bag are plain strings of tiles, with ' ' for a blank.
+
+Placements (one move's tiles) are "cell:letter" pairs joined by commas,
+e.g. "112H,113I" for H at (7, 7) and I at (8, 7).
+"""
+
+import random
+
+BOARD_SIZE = 15
+BOARD_CELLS = BOARD_SIZE * BOARD_SIZE
+EMPTY = '.'
+EMPTY_BOARD = EMPTY * BOARD_CELLS
+BLANK = ' '
+RACK_SIZE = 7
+
+# Same distribution as the tile bag in scrabble_engine.js
+TILE_DISTRIBUTION = {
+    'A': 9, 'B': 2, 'C': 2, 'D': 4, 'E': 12,
+    'F': 2, 'G': 3, 'H': 2, 'I': 9, 'J': 1,
+    'K': 1, 'L': 4, 'M': 2, 'N': 6, 'O': 8,
+    'P': 2, 'Q': 1, 'R': 6, 'S': 4, 'T': 6,
+    'U': 4, 'V': 2, 'W': 2, 'X': 1, 'Y': 2,
+    'Z': 1, BLANK: 2,
+}
+
+
+class InvalidMove(ValueError):
+    pass
+
+
+def new_bag(seed=None):
+    tiles = [tile for tile, count in TILE_DISTRIBUTION.items() for _ in range(count)]
+    random.Random(seed).shuffle(tiles)
+    return ''.join(tiles)
+
+
+def return_to_bag(tiles, bag, seed=None):
+    """Shuffle exchanged tiles back into the bag; returns the new bag"""
+    tiles = list(bag + tiles)
+    random.Random(seed).shuffle(tiles)
+    return ''.join(tiles)
+
+
+def draw(rack, bag):
+    """Top the rack up to seven tiles from the end of the bag; returns (rack, bag)"""
+    needed = max(RACK_SIZE - len(rack), 0)
+    if not needed:
+        return rack, bag
+    drawn = bag[-needed:]
+    return rack + drawn, bag[:len(bag) - len(drawn)]
+
+
+def encode_placements(placements):
+    return ','.join(f'{cell}{letter}' for cell, letter in placements)
+
+
+def decode_placements(encoded):
+    if not encoded:
+        return []
+    return [(int(item[:-1]), item[-1]) for item in encoded.split(',')]
+
+
+def apply_placements(board, placements):
+    """Return the board with the placements applied; squares must be empty"""
+    cells = list(board)
+    for cell, letter in placements:
+        if not 0 <= cell < BOARD_CELLS:
+            raise InvalidMove(f'Cell {cell} is off the board')
+        if cells[cell] != EMPTY:
+            raise InvalidMove(f'Cell {cell} is already taken')
+        if not (len(letter) == 1 and letter.isalpha() and letter.isascii()):
+            raise InvalidMove(f'Bad letter {letter!r}')
+        cells[cell] = letter
+    return ''.join(cells)
+
+
+def take_from_rack(rack, letters):
+    """
+    Remove played tiles from a rack. Lower-case letters are blanks, so they
+    take a ' ' tile. Returns the remaining rack.
+    """
+    remaining = list(rack)
+    for letter in letters:
+        tile = BLANK if letter.islower() else letter
+        try:
+            remaining.remove(tile)
+        except ValueError:
+            raise InvalidMove(f'{letter!r} is not on the rack')
+    return ''.join(remaining)
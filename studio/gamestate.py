@@ -0,0 +1,149 @@
+"""
+Saving, resuming and replaying stored Scrabble games.
+
+- start_game(): one game row plus the player rows, racks dealt from a fresh bag
+- load_game(): a single primary-key read of the game row
+- record_move(): one INSERT into the move log and one UPDATE of the game's
+  narrow state columns, guarded by move_count so two concurrent saves of the
+  same turn cannot both win
+- board_at(): rebuild the board after any move from the nearest snapshot
+"""
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from members.stats import GAMES_STARTED
+
+from . import board as boards
+from .models import ScrabbleGame, ScrabbleMove, ScrabblePlayer
+
+SNAPSHOT_INTERVAL = 10
+
+
+class StaleGame(Exception):
+    """The game moved on since it was loaded (another move was saved first)"""
+
+
+def start_game(players, seed=None):
+    """
+    players: list of display names or (name, user) pairs, one per seat.
+    """
+    players = [p if isinstance(p, tuple) else (p, None) for p in players]
+    bag = boards.new_bag(seed)
+    racks = []
+    for _player in players:
+        rack, bag = boards.draw('', bag)
+        racks.append(rack)
+
+    with transaction.atomic():
+        game = ScrabbleGame.objects.create(bag=bag, racks=racks, scores=[0] * len(players))
+        ScrabblePlayer.objects.bulk_create([
+            ScrabblePlayer(game=game, seat=seat, name=name, user=user)
+            for seat, (name, user) in enumerate(players)
+        ])
+    GAMES_STARTED.inc('scrabble')
+    return game
+
+
+def load_game(game_id):
+    return ScrabbleGame.objects.get(pk=game_id)
+
+
+def record_move(game, seat, kind, placements=(), score=0, word='', exchange=''):
+    """
+    Apply a move to game (in memory and in the database) and log it.
+    placements: [(cell, letter), ...] for a play; exchange: tiles to swap back.
+    Raises board.InvalidMove for an illegal move and StaleGame if another move
+    was saved since game was loaded.
+    """
+    if game.status != 'active':
+        raise boards.InvalidMove('Game is over')
+    if seat != game.current_seat:
+        raise boards.InvalidMove('Not your turn')
+
+    placements = list(placements)
+    board = game.board
+    bag = game.bag
+    rack = game.racks[seat]
+
+    if kind == 'play':
+        if not placements:
+            raise boards.InvalidMove('No tiles placed')
+        board = boards.apply_placements(board, placements)
+        rack = boards.take_from_rack(rack, [letter for _cell, letter in placements])
+        rack, bag = boards.draw(rack, bag)
+    elif kind == 'exchange':
+        if len(bag) < boards.RACK_SIZE:
+            raise boards.InvalidMove('Not enough tiles left to exchange')
+        rack = boards.take_from_rack(rack, exchange)
+        rack, bag = boards.draw(rack, bag)
+        bag = boards.return_to_bag(exchange, bag)
+        placements, score = [], 0
+    elif kind == 'pass':
+        placements, score = [], 0
+    else:
+        raise boards.InvalidMove(f'Unknown move {kind!r}')
+
+    racks = list(game.racks)
+    racks[seat] = rack
+    scores = list(game.scores)
+    scores[seat] += score
+    seq = game.move_count + 1
+    next_seat = (seat + 1) % len(racks)
+    now = timezone.now()
+
+    with transaction.atomic():
+        updated = ScrabbleGame.objects.filter(pk=game.pk, move_count=game.move_count).update(
+            board=board,
+            bag=bag,
+            racks=racks,
+            scores=scores,
+            current_seat=next_seat,
+            move_count=F('move_count') + 1,
+            updated_at=now,
+        )
+        if not updated:
+            raise StaleGame(f'Game {game.pk} has moved past move {game.move_count}')
+        move = ScrabbleMove.objects.create(
+            game=game,
+            seq=seq,
+            seat=seat,
+            kind=kind,
+            placements=boards.encode_placements(placements),
+            word=word,
+            score=score,
+            board_snapshot=board if seq % SNAPSHOT_INTERVAL == 0 else '',
+        )
+
+    game.board, game.bag, game.racks, game.scores = board, bag, racks, scores
+    game.current_seat, game.move_count, game.updated_at = next_seat, seq, now
+    return move
+
+
+def board_at(game_id, seq):
+    """
+    The board as it stood after move seq (0 = empty board). Reads the nearest
+    snapshot at or before seq and the moves after it in one range query.
+    """
+    base = (seq // SNAPSHOT_INTERVAL) * SNAPSHOT_INTERVAL
+    board = boards.EMPTY_BOARD
+    moves = ScrabbleMove.objects.filter(
+        game_id=game_id, seq__gte=max(base, 1), seq__lte=seq
+    ).only('seq', 'placements', 'board_snapshot').order_by('seq')
+
+    for move in moves:
+        if move.seq == base and move.board_snapshot:
+            board = move.board_snapshot
+        elif move.placements:
+            board = boards.apply_placements(board, boards.decode_placements(move.placements))
+    return board
+
+
+def replay(game_id):
+    """Yield (move, board after the move) for the whole game, for move-by-move review"""
+    board = boards.EMPTY_BOARD
+    for move in ScrabbleMove.objects.filter(game_id=game_id).order_by('seq'):
+        if move.placements:
+            board = boards.apply_placements(board, boards.decode_placements(move.placements))
+        yield move, board
@@ -0,0 +1,19 @@
+"""
+The studio word list (one word per line in scrabble_words.txt).
+
+Shared by the validate_word API and the offline tools that need the same
+lexicon, such as the crossword grid filler.
+"""
+
+from pathlib import Path
+
+WORD_FILE = Path(__file__).parent / 'scrabble_words.txt'
+
+
+def load_words(path=WORD_FILE):
+    """Return the word list as a set of upper-case words (empty if the file is missing)"""
+    path = Path(path)
+    if not path.exists():
+        return set()
+    with open(path, 'r') as f:
+        return set(word for word in (line.strip().upper() for line in f) if word)
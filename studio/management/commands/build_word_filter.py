@@ -0,0 +1,45 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from studio import bloom
+from studio.lexicon import WORD_FILE, load_words
+
+OUTPUT = Path(__file__).resolve().parents[2] / 'static' / bloom.STATIC_NAME
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the Bloom filter of the word list that the Scrabble front end uses to "
+        "reject invalid words without a request. Run before collectstatic, which "
+        "gives it a content-hashed name."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--words', default=str(WORD_FILE), help="Word list, one word per line")
+        parser.add_argument('--false-positive-rate', type=float, default=bloom.DEFAULT_FALSE_POSITIVE_RATE,
+                            help="Chance that an invalid word passes the pre-check")
+        parser.add_argument('--max-bytes', type=int,
+                            help="Cap the filter size; the false-positive rate rises to fit")
+        parser.add_argument('--output', default=str(OUTPUT))
+
+    def handle(self, *args, **options):
+        rate = options['false_positive_rate']
+        if not 0 < rate < 1:
+            raise CommandError("--false-positive-rate must be between 0 and 1")
+        words = load_words(options['words'])
+        if not words:
+            raise CommandError(f"No words found in {options['words']}")
+
+        start = time.perf_counter()
+        word_filter = bloom.BloomFilter.from_words(sorted(words), rate, options['max_bytes'])
+        output = Path(options['output'])
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_bytes(word_filter.to_bytes())
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {output}: {len(words)} words, {len(word_filter.bits) / 1024:.0f} KiB, "
+            f"{word_filter.num_hashes} hashes, ~{word_filter.expected_false_positive_rate():.2%} false positives "
+            f"({time.perf_counter() - start:.1f}s)"
+        ))
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrabbleGame',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('active', 'Active'), ('finished', 'Finished'), ('abandoned', 'Abandoned')], default='active', max_length=20)),
+                ('board', models.CharField(default='.................................................................................................................................................................................................................................', max_length=225)),
+                ('bag', models.CharField(blank=True, max_length=100)),
+                ('racks', models.JSONField(default=list, help_text='One rack string per seat')),
+                ('scores', models.JSONField(default=list, help_text='One score per seat')),
+                ('current_seat', models.PositiveSmallIntegerField(default=0)),
+                ('move_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Scrabble Game',
+                'verbose_name_plural': 'Scrabble Games',
+            },
+        ),
+        migrations.CreateModel(
+            name='ScrabbleMove',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveIntegerField()),
+                ('seat', models.PositiveSmallIntegerField()),
+                ('kind', models.CharField(choices=[('play', 'Play'), ('pass', 'Pass'), ('exchange', 'Exchange')], max_length=10)),
+                ('placements', models.CharField(blank=True, max_length=40)),
+                ('word', models.CharField(blank=True, max_length=15)),
+                ('score', models.IntegerField(default=0)),
+                ('board_snapshot', models.CharField(blank=True, max_length=225)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='moves', to='studio.scrabblegame')),
+            ],
+            options={
+                'ordering': ['game', 'seq'],
+                'constraints': [models.UniqueConstraint(fields=('game', 'seq'), name='unique_scrabble_move_seq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScrabblePlayer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seat', models.PositiveSmallIntegerField()),
+                ('name', models.CharField(max_length=40)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='players', to='studio.scrabblegame')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='scrabble_seats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['seat'],
+                'constraints': [models.UniqueConstraint(fields=('game', 'seat'), name='unique_scrabble_seat')],
+            },
+        ),
+    ]
@@ -1,3 +1,89 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+from .board import EMPTY_BOARD
+
+
+class ScrabbleGame(models.Model):
+    """
+    Everything needed to resume a game sits on this one row: the board as a
+    fixed 225-character string (see studio.board), the bag, every rack and the
+    scores. Saving a move rewrites only these narrow columns; the history
+    lives in ScrabbleMove
+    """
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('finished', 'Finished'),
+        ('abandoned', 'Abandoned'),
+    ]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    board = models.CharField(max_length=225, default=EMPTY_BOARD)
+    bag = models.CharField(max_length=100, blank=True)
+    racks = models.JSONField(default=list, help_text="One rack string per seat")
+    scores = models.JSONField(default=list, help_text="One score per seat")
+    current_seat = models.PositiveSmallIntegerField(default=0)
+    move_count = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Scrabble Game'
+        verbose_name_plural = 'Scrabble Games'
+
+    def __str__(self):
+        return f"Game {self.pk} ({self.get_status_display()}, {self.move_count} moves)"
+
+
+class ScrabblePlayer(models.Model):
+    game = models.ForeignKey(ScrabbleGame, on_delete=models.CASCADE, related_name='players')
+    seat = models.PositiveSmallIntegerField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='scrabble_seats'
+    )
+    name = models.CharField(max_length=40)
+
+    class Meta:
+        ordering = ['seat']
+        constraints = [
+            models.UniqueConstraint(fields=['game', 'seat'], name='unique_scrabble_seat'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} (seat {self.seat})"
+
+
+class ScrabbleMove(models.Model):
+    """
+    Append-only move log. Every SNAPSHOT_INTERVAL-th move also stores the board
+    after it, so any position can be rebuilt from the nearest snapshot
+    """
+    KIND_CHOICES = [
+        ('play', 'Play'),
+        ('pass', 'Pass'),
+        ('exchange', 'Exchange'),
+    ]
+
+    game = models.ForeignKey(ScrabbleGame, on_delete=models.CASCADE, related_name='moves')
+    seq = models.PositiveIntegerField()
+    seat = models.PositiveSmallIntegerField()
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    placements = models.CharField(max_length=40, blank=True)
+    word = models.CharField(max_length=15, blank=True)
+    score = models.IntegerField(default=0)
+    board_snapshot = models.CharField(max_length=225, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['game', 'seq']
+        constraints = [
+            models.UniqueConstraint(fields=['game', 'seq'], name='unique_scrabble_move_seq'),
+        ]
+
+    def __str__(self):
+        return f"Game {self.game_id} move {self.seq}: {self.kind} {self.word}".rstrip()
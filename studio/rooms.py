@@ -0,0 +1,160 @@
+"""
+Real-time Scrabble rooms.
+
+Room state (seats, scores, whose turn it is, recent moves) lives in memory in
+the ASGI process. Every participant holds one server-sent events stream; a
+move is applied to the room and published through the broker, which hands it
+to each subscriber's asyncio queue, so an idle connection costs a suspended
+coroutine and an empty queue rather than a worker.
+
+The broker is pluggable via settings.STUDIO_ROOM_BROKER. LocalBroker only
+reaches subscribers in the same process; a shared broker (e.g. Redis pub/sub)
+can implement the same methods when rooms must span processes.
+"""
+
+import asyncio
+import json
+import secrets
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+MAX_SEATS = 4
+EVENT_HISTORY = 200          # events kept per room for reconnect replay
+SUBSCRIBER_QUEUE_SIZE = 100  # a subscriber this far behind is disconnected
+ROOM_IDLE_SECONDS = 60 * 60
+MAX_MOVE_SCORE = 1778          # the highest-scoring Scrabble play possible
+
+
+class RoomError(Exception):
+    pass
+
+
+class Room:
+
+    def __init__(self, room_id):
+        self.room_id = room_id
+        self.seats = []          # [{'name': ..., 'token': ...}]
+        self.scores = [0] * MAX_SEATS
+        self.current_turn = 0
+        self.seq = 0
+        self.events = deque(maxlen=EVENT_HISTORY)
+        self.touched = time.monotonic()
+
+    def state(self):
+        return {
+            'room': self.room_id,
+            'players': [seat['name'] for seat in self.seats],
+            'scores': self.scores[:len(self.seats)],
+            'current_turn': self.current_turn,
+        }
+
+    def _event(self, kind, data):
+        self.seq += 1
+        self.touched = time.monotonic()
+        event = {'id': self.seq, 'type': kind, 'data': data}
+        self.events.append(event)
+        return event
+
+    def join(self, name):
+        if len(self.seats) >= MAX_SEATS:
+            raise RoomError('Room is full')
+        seat = len(self.seats)
+        token = secrets.token_urlsafe(16)
+        self.seats.append({'name': name, 'token': token})
+        return seat, token, self._event('join', {'seat': seat, **self.state()})
+
+    def move(self, seat, token, kind, score=0, tiles=()):
+        if not 0 <= seat < len(self.seats) or not secrets.compare_digest(self.seats[seat]['token'], token):
+            raise RoomError('Not seated in this room')
+        if seat != self.current_turn:
+            raise RoomError('Not your turn')
+        if kind not in ('play', 'pass', 'exchange'):
+            raise RoomError('Unknown move')
+        if not 0 <= score <= MAX_MOVE_SCORE:
+            raise RoomError('Impossible score')
+
+        if kind == 'play':
+            self.scores[seat] += score
+        self.current_turn = (self.current_turn + 1) % len(self.seats)
+        return self._event('move', {
+            'seat': seat,
+            'kind': kind,
+            'score': score if kind == 'play' else 0,
+            'tiles': list(tiles),
+            'scores': self.scores[:len(self.seats)],
+            'current_turn': self.current_turn,
+        })
+
+    def events_after(self, last_id):
+        return [event for event in self.events if event['id'] > last_id]
+
+
+class LocalBroker:
+    """In-process publish/subscribe: one bounded asyncio.Queue per listener"""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, room_id):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers[room_id].add(queue)
+        return queue
+
+    def unsubscribe(self, room_id, queue):
+        subscribers = self._subscribers.get(room_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[room_id]
+
+    def subscriber_count(self, room_id):
+        return len(self._subscribers.get(room_id, ()))
+
+    async def publish(self, room_id, event):
+        for queue in list(self._subscribers.get(room_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too slow to keep up: end its stream (None) so the client
+                # reconnects and replays from its Last-Event-ID
+                self.unsubscribe(room_id, queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+
+_rooms = {}
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        path = getattr(settings, 'STUDIO_ROOM_BROKER', 'studio.rooms.LocalBroker')
+        _broker = import_string(path)()
+    return _broker
+
+
+def get_room(room_id, create=True):
+    room = _rooms.get(room_id)
+    if room is None and create:
+        _prune_idle_rooms()
+        room = _rooms[room_id] = Room(room_id)
+    return room
+
+
+def _prune_idle_rooms():
+    cutoff = time.monotonic() - ROOM_IDLE_SECONDS
+    broker = get_broker()
+    for room_id, room in list(_rooms.items()):
+        if room.touched < cutoff and not broker.subscriber_count(room_id):
+            del _rooms[room_id]
+
+
+def format_sse(event):
+    """Encode an event as a text/event-stream message"""
+    data = json.dumps(event['data'], separators=(',', ':'))
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
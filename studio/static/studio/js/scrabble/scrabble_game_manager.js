@@ -14,9 +14,105 @@ const GameManager = {
     layer: null,
     tileBag: [],
     
+    // Networked play (?room=<id>): moves are posted to the room and pushed
+    // back to every participant over server-sent events
+    room: null,
+    applyingRemote: false,
+    turnScore: 0,
+    lastPlacedTiles: [],
+    
     init(gameLayer) {
         this.layer = gameLayer;
         console.log('🎮 GameManager initialized');
+        
+        const roomId = new URLSearchParams(window.location.search).get('room');
+        if (roomId) {
+            this.joinRoom(roomId);
+        }
+    },
+    
+    async joinRoom(roomId, name = 'Player') {
+        const base = `/studio/api/rooms/${encodeURIComponent(roomId)}/`;
+        try {
+            const response = await fetch(base + 'join/', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ name: name })
+            });
+            const data = await response.json();
+            if (!response.ok) {
+                window.showToast(data.error || 'Could not join room', 'error', 3000);
+                return;
+            }
+            
+            this.room = { id: roomId, base: base, seat: data.seat, token: data.token };
+            this.currentPlayerIndex = data.seat;
+            this.applyRoomState(data.state);
+            
+            this.room.source = new EventSource(base + 'events/');
+            this.room.source.addEventListener('state', e => this.applyRoomState(JSON.parse(e.data)));
+            this.room.source.addEventListener('join', e => this.applyRoomState(JSON.parse(e.data)));
+            this.room.source.addEventListener('move', e => this.applyRemoteMove(JSON.parse(e.data)));
+            console.log(`🌐 Joined room ${roomId} in seat ${data.seat}`);
+        } catch (error) {
+            console.error('Room join error:', error);
+        }
+    },
+    
+    applyRoomState(state) {
+        state.players.forEach((name, seat) => {
+            this.players[seat].name = name;
+            this.players[seat].score = state.scores[seat];
+            this.updateScoreDisplay(seat);
+        });
+        this.currentTurn = state.current_turn;
+        this.updateNameHighlights();
+    },
+    
+    applyRemoteMove(move) {
+        // Our own moves come back too; their tiles are already on the board
+        if (this.room && move.seat !== this.room.seat && this.layer) {
+            move.tiles.forEach(t => {
+                const x = CONFIG.BOARD_X_OFFSET + t.x * CONFIG.GRID_SIZE;
+                const y = CONFIG.BOARD_Y_OFFSET + t.y * CONFIG.GRID_SIZE;
+                const tile = createTile(this.layer, x, y, t.letter, CONFIG.TILE_VALUES[t.letter] || 0);
+                tile.status = 'locked';
+            });
+            if (move.tiles.length && typeof window.markBoardStarted === 'function') {
+                window.markBoardStarted();
+            }
+        }
+        
+        this.applyingRemote = true;
+        move.scores.forEach((score, seat) => {
+            this.players[seat].score = score;
+            this.updateScoreDisplay(seat);
+        });
+        this.currentTurn = move.current_turn;
+        this.updateNameHighlights();
+        this.applyingRemote = false;
+    },
+    
+    async sendMove(kind) {
+        const move = {
+            seat: this.room.seat,
+            token: this.room.token,
+            kind: kind,
+            score: this.turnScore,
+            tiles: this.lastPlacedTiles
+        };
+        this.turnScore = 0;
+        this.lastPlacedTiles = [];
+        
+        const response = await fetch(this.room.base + 'moves/', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(move)
+        });
+        if (!response.ok) {
+            const data = await response.json();
+            window.showToast(data.error || 'Move rejected', 'error', 3000);
+        }
     },
     
     registerPlayerUI(viewIndex, nameBox, scoreText) {
@@ -102,6 +198,7 @@ const GameManager = {
     updateScore(points) {
         const player = this.getActivePlayer();
         player.score += points;
+        this.turnScore += points;
         
         console.log(`🎮 Player ${this.currentTurn + 1} scored ${points} points (total: ${player.score})`);
         
@@ -109,6 +206,12 @@ const GameManager = {
     },
     
     nextTurn() {
+        if (this.room) {
+            // The room decides whose turn is next and pushes it back to everyone
+            this.sendMove(this.turnScore > 0 ? 'play' : 'pass');
+            return;
+        }
+        
         this.currentTurn = (this.currentTurn + 1) % 4;
         
         console.log(`🎮 Turn advanced to Player ${this.currentTurn + 1}`);
@@ -283,6 +283,13 @@ window.handleSubmit = async function(layer) {
      */
     async function validateWord(word) {
         console.log('Checking word validity:', word);
+
+        // Certainly not a word: no need to ask the server
+        if (window.WordFilter && !window.WordFilter.mightContain(word)) {
+            console.log('Rejected by word filter:', word);
+            return false;
+        }
+
         window.showToast(`Checking "${word}"...`, 'info', 1500);
         
         try {
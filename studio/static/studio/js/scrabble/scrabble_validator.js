@@ -18,6 +18,13 @@ window.resetToFirstMove = function() {
     console.log('Board reset to first move state');
 };
 
+/**
+ * Mark the board as started (used when another player's move arrives over the network)
+ */
+window.markBoardStarted = function() {
+    isFirstMove = false;
+};
+
 /**
  * Get newly placed tiles (status = 'played-this-turn')
  */
@@ -226,6 +233,14 @@ window.lockTilesOnBoard = function(layer) {
         if (tile.status === 'played-this-turn') {
             tile.status = 'locked';
             
+            // Remember the placement so networked games can send it with the move
+            if (window.GameManager) {
+                const pos = pixelToGrid(tile.x(), tile.y());
+                window.GameManager.lastPlacedTiles.push({
+                    x: pos.gridX, y: pos.gridY, letter: tile.findOne('Text').text()
+                });
+            }
+            
             // Remove click handlers so locked tiles can't be moved
             tile.off('click tap');
             
@@ -0,0 +1,82 @@
+/*
+ * FILE PURPOSE: Offline Word Pre-check
+ * Loads the Bloom filter of the word list (built by "manage.py build_word_filter")
+ * so words that are certainly invalid are rejected without asking the server.
+ * Words the filter might contain are still confirmed by /studio/api/validate-word/.
+ */
+
+/* FILE: studio/static/studio/js/scrabble/scrabble_word_filter.js */
+/* DATE: 2026-10-19 */
+/* SYNC: Must hash exactly like studio/bloom.py */
+
+window.WordFilter = (function() {
+    const FNV_PRIME = 0x01000193;
+    const H1_BASIS = 0x811C9DC5;
+    const H2_BASIS = 0x050C5D1F;
+    const HEADER_SIZE = 16;
+
+    let filter = null;
+
+    function fnv1a(bytes, basis) {
+        let h = basis;
+        for (let i = 0; i < bytes.length; i++) {
+            h = Math.imul(h ^ bytes[i], FNV_PRIME) >>> 0;
+        }
+        return h;
+    }
+
+    function parse(buffer) {
+        const view = new DataView(buffer);
+        const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+        if (magic !== 'BLM1') {
+            throw new Error('Not a word filter file');
+        }
+        return {
+            numBits: view.getUint32(4),
+            numHashes: view.getUint32(8),
+            bits: new Uint8Array(buffer, HEADER_SIZE)
+        };
+    }
+
+    /**
+     * Fetch the filter once; the file name is content-hashed, so the browser caches it
+     */
+    async function load(url) {
+        if (!url) {
+            return;
+        }
+        try {
+            const response = await fetch(url);
+            if (response.ok) {
+                filter = parse(await response.arrayBuffer());
+            }
+        } catch (error) {
+            console.warn('Word filter unavailable, checking words on the server:', error);
+        }
+    }
+
+    /**
+     * false: the word is certainly not in the word list.
+     * true: it probably is (or the filter isn't loaded) - ask the server.
+     */
+    function mightContain(word) {
+        if (!filter) {
+            return true;
+        }
+        const bytes = new TextEncoder().encode(word.toUpperCase());
+        const h1 = fnv1a(bytes, H1_BASIS);
+        const h2 = (fnv1a(bytes, H2_BASIS) | 1) >>> 0;
+        for (let i = 0; i < filter.numHashes; i++) {
+            // Below 2^53, so exact in a double, matching Python's integers
+            const position = (h1 + i * h2) % filter.numBits;
+            if (!(filter.bits[position >>> 3] & (1 << (position & 7)))) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    load(window.WORD_FILTER_URL);
+
+    return { load, mightContain };
+})();
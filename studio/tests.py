@@ -1,3 +1,229 @@
-from django.test import TestCase
+import asyncio
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from . import bloom, board as boards, gamestate, rooms, views
+from .board import InvalidMove
+
+
+class ValidateWordTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()  # rate limit buckets
+
+    async def test_validate_word_is_async(self):
+        self.assertTrue(asyncio.iscoroutinefunction(views.validate_word))
+        url = reverse('studio:validate_word')
+        original = views.SCRABBLE_WORDS
+        views.SCRABBLE_WORDS = {'HELLO'}
+        try:
+            response = await self.async_client.post(url, json.dumps({'word': 'hello '}), content_type='application/json')
+        finally:
+            views.SCRABBLE_WORDS = original
+        self.assertEqual(response.json(), {'valid': True, 'word': 'HELLO'})
+
+
+class WordFilterTests(SimpleTestCase):
+
+    words = [f'{a}{b}{c}' for a in 'ABCDEFGH' for b in 'AEIOU' for c in 'RSTLN']
+
+    def test_no_false_negatives_and_few_false_positives(self):
+        word_filter = bloom.BloomFilter.from_words(self.words, false_positive_rate=0.01)
+        self.assertTrue(all(word in word_filter for word in self.words))
+        others = [f'{word}Q' for word in self.words] + [f'Z{word}' for word in self.words]
+        false_positives = sum(word in word_filter for word in others)
+        self.assertLess(false_positives / len(others), 0.05)
+
+    def test_round_trip(self):
+        word_filter = bloom.BloomFilter.from_words(self.words)
+        loaded = bloom.BloomFilter.from_bytes(word_filter.to_bytes())
+        self.assertEqual((loaded.num_bits, loaded.num_hashes, loaded.count), (word_filter.num_bits, word_filter.num_hashes, 200))
+        self.assertIn('BAR', loaded)
+        with self.assertRaises(ValueError):
+            bloom.BloomFilter.from_bytes(b'XXXX' + bytes(12))
+
+    def test_max_bytes_caps_size(self):
+        word_filter = bloom.BloomFilter.from_words(self.words, false_positive_rate=0.001, max_bytes=64)
+        self.assertEqual(len(word_filter.bits), 64)
+        self.assertGreater(word_filter.expected_false_positive_rate(), 0.001)
+        self.assertTrue(all(word in word_filter for word in self.words))
+
+    def test_build_command(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            word_file = Path(tmp) / 'words.txt'
+            word_file.write_text('\n'.join(word.lower() for word in self.words))
+            output = Path(tmp) / 'words.bloom'
+            out = StringIO()
+            call_command('build_word_filter', words=str(word_file), output=str(output), stdout=out)
+            word_filter = bloom.BloomFilter.from_bytes(output.read_bytes())
+        self.assertIn('200 words', out.getvalue())
+        self.assertIn('HIT', word_filter)
+
+
+class RoomTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()  # rate limit buckets
+        rooms._rooms.clear()
+        rooms._broker = None
+
+    def test_turns_rotate_between_seated_players(self):
+        room = rooms.get_room('table-1')
+        seat_a, token_a, _event = room.join('Evelyn')
+        seat_b, token_b, _event = room.join('Arthur')
+
+        with self.assertRaises(rooms.RoomError):
+            room.move(seat_b, token_b, 'play', 10)
+        with self.assertRaises(rooms.RoomError):
+            room.move(seat_a, token_b, 'play', 10)
+
+        event = room.move(seat_a, token_a, 'play', 12, [{'x': 7, 'y': 7, 'letter': 'A'}])
+        self.assertEqual(event['data']['scores'], [12, 0])
+        self.assertEqual(event['data']['current_turn'], seat_b)
+        self.assertEqual([e['id'] for e in room.events_after(2)], [3])
+
+    async def test_move_is_pushed_to_subscribers(self):
+        join_url = reverse('studio:room_join', args=['table-2'])
+        response = await self.async_client.post(join_url, json.dumps({'name': 'Evelyn'}), content_type='application/json')
+        seat = response.json()
+
+        response = await self.async_client.get(reverse('studio:room_events', args=['table-2']))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        first = await anext(stream)
+        self.assertIn(b'event: state', first)
+
+        move_url = reverse('studio:room_move', args=['table-2'])
+        response = await self.async_client.post(move_url, json.dumps({
+            'seat': seat['seat'], 'token': seat['token'], 'kind': 'play', 'score': 9,
+            'tiles': [{'x': 7, 'y': 7, 'letter': 'Q'}],
+        }), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        chunk = await asyncio.wait_for(anext(stream), 1)
+        self.assertIn(b'event: move', chunk)
+        self.assertIn(b'"score":9', chunk)
+        self.assertEqual(rooms.get_broker().subscriber_count('table-2'), 1)
+        await stream.aclose()
+
+    async def test_last_event_id_past_the_room_is_clamped(self):
+        room = rooms.get_room('table-3')
+        seat, token, _event = room.join('Evelyn')
+        url = reverse('studio:room_events', args=['table-3'])
+        # e.g. an id from before a restart, or a non-integer header
+        for last_id in ('500', 'abc'):
+            response = await self.async_client.get(url, headers={'Last-Event-ID': last_id})
+            stream = aiter(response.streaming_content)
+            await anext(stream)  # state
+            event = room.move(seat, token, 'pass')
+            await rooms.get_broker().publish('table-3', event)
+            chunk = await asyncio.wait_for(anext(stream), 1)
+            self.assertIn(f'id: {event["id"]}'.encode(), chunk)
+            await stream.aclose()
+
+    async def test_bad_bodies_are_rejected(self):
+        join_url = reverse('studio:room_join', args=['table-4'])
+        move_url = reverse('studio:room_move', args=['table-4'])
+        for body in ('[]', '"x"', '1'):
+            response = await self.async_client.post(join_url, body, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+        seat = (await self.async_client.post(join_url, '{}', content_type='application/json')).json()
+        for body in ('[]', '"x"', '1'):
+            response = await self.async_client.post(move_url, body, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+        response = await self.async_client.post(move_url, json.dumps({
+            'seat': seat['seat'], 'token': seat['token'], 'kind': 'play', 'score': 10 ** 9,
+        }), content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+
+
+class RoomEventsTests(TestCase):
+    # A TestCase: 404 responses go through the redirect lookup
+
+    def setUp(self):
+        cache.clear()  # rate limit buckets
+        rooms._rooms.clear()
+        rooms._broker = None
+
+    async def test_events_need_an_existing_room(self):
+        response = await self.async_client.get(reverse('studio:room_events', args=['nobody-here']))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(rooms._rooms, {})
+        self.assertEqual(rooms.get_broker().subscriber_count('nobody-here'), 0)
+
+    @override_settings(RATELIMITS={'game-api': {'rate': 0.1, 'burst': 2}})
+    async def test_events_are_rate_limited(self):
+        url = reverse('studio:room_events', args=['nobody-here'])
+        statuses = [(await self.async_client.get(url)).status_code for _ in range(3)]
+        self.assertEqual(statuses, [404, 404, 429])
+
+
+class GameStateTests(TestCase):
+
+    def setUp(self):
+        self.game = gamestate.start_game(['Evelyn', 'Arthur'], seed=7)
+
+    def play_from_rack(self, cells):
+        game = self.game
+        rack = game.racks[game.current_seat]
+        placements = [(cell, tile if tile != ' ' else 'e') for cell, tile in zip(cells, rack)]
+        return gamestate.record_move(game, game.current_seat, 'play', placements, score=5)
+
+    def test_start_deals_racks(self):
+        self.assertEqual([len(r) for r in self.game.racks], [7, 7])
+        self.assertEqual(len(self.game.bag), 100 - 14)
+        self.assertEqual(len(self.game.board), 225)
+
+    def test_move_is_one_insert_and_one_update(self):
+        with self.assertNumQueries(4):  # savepoint, UPDATE, INSERT, release
+            self.play_from_rack([112, 113])
+        game = gamestate.load_game(self.game.pk)
+        self.assertEqual(game.move_count, 1)
+        self.assertEqual(game.current_seat, 1)
+        self.assertEqual(game.scores, [5, 0])
+        self.assertEqual(len(game.racks[0]), 7)
+        self.assertNotEqual(game.board[112], '.')
+
+    def test_stale_save_is_rejected(self):
+        stale = gamestate.load_game(self.game.pk)
+        self.play_from_rack([112])
+        with self.assertRaises(gamestate.StaleGame):
+            gamestate.record_move(stale, 0, 'pass')
+
+    def test_exchanged_tiles_are_shuffled_into_the_bag(self):
+        tiles = sorted(''.join(self.game.racks) + self.game.bag)
+        gamestate.record_move(self.game, 0, 'exchange', exchange=self.game.racks[0][:3])
+        game = gamestate.load_game(self.game.pk)
+        self.assertEqual(len(game.racks[0]), 7)
+        self.assertEqual(sorted(''.join(game.racks) + game.bag), tiles)
+
+        # Not left at the bottom of a bag drawn from the end
+        bag = boards.return_to_bag('QZ', 'E' * 40, seed=3)
+        self.assertEqual(sorted(bag), sorted('QZ' + 'E' * 40))
+        self.assertNotEqual(bag[:2], 'QZ')
+
+    def test_illegal_moves(self):
+        with self.assertRaises(InvalidMove):
+            gamestate.record_move(self.game, 1, 'pass')
+        with self.assertRaises(InvalidMove):
+            gamestate.record_move(self.game, 0, 'play', [(112, 'Q'), (113, 'Q'), (114, 'Q')])
+
+    def test_board_at_matches_replay(self):
+        for n in range(23):
+            if n % 2:
+                gamestate.record_move(self.game, self.game.current_seat, 'pass')
+            else:
+                self.play_from_rack([n * 9])
+        boards_by_seq = {move.seq: board for move, board in gamestate.replay(self.game.pk)}
+        self.assertEqual(boards_by_seq[23], self.game.board)
+        for seq in (1, 10, 15, 20, 23):
+            with self.assertNumQueries(1):
+                board = gamestate.board_at(self.game.pk, seq)
+            self.assertEqual(board, boards_by_seq[seq])
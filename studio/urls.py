@@ -10,4 +10,7 @@ app_name = 'studio'
 urlpatterns = [
     path('', views.studio_sandbox, name='studio_sandbox'),
     path('api/validate-word/', views.validate_word, name='validate_word'),
+    path('api/rooms/<str:room_id>/events/', views.room_events, name='room_events'),
+    path('api/rooms/<str:room_id>/join/', views.room_join, name='room_join'),
+    path('api/rooms/<str:room_id>/moves/', views.room_move, name='room_move'),
 ]
\ No newline at end of file
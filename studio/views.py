@@ -1,34 +1,47 @@
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt  # ← ADD THIS
+import asyncio
 import json
-from pathlib import Path
+import time
+
+from mysite import metrics
+from mysite.ratelimit import rate_limit
+
+from . import rooms
+from .bloom import filter_url
+from .lexicon import load_words
 
 
 # This is the function your URLs are looking for:
 def studio_sandbox(request):
-    return render(request, 'studio/studio_home.html')
+    return render(request, 'studio/studio_home.html', {'word_filter_url': filter_url()})
 
 
-# Load word list into memory (happens once when server starts)
-SCRABBLE_WORDS = set()
-word_file = Path(__file__).parent / 'scrabble_words.txt'
+WORD_CHECKS = metrics.Counter('studio_word_checks_total', 'validate_word lookups by result', ['result'])
+LEXICON_WORDS = metrics.Gauge('studio_lexicon_words', 'Words in the loaded Scrabble lexicon')
+LEXICON_LOAD_SECONDS = metrics.Gauge('studio_lexicon_load_seconds', 'Time taken to load the lexicon')
 
-if word_file.exists():
-    with open(word_file, 'r') as f:
-        SCRABBLE_WORDS = set(line.strip().upper() for line in f)
+# Load word list into memory (happens once when server starts)
+_load_start = time.perf_counter()
+SCRABBLE_WORDS = load_words()
+LEXICON_LOAD_SECONDS.set(time.perf_counter() - _load_start)
+LEXICON_WORDS.set(len(SCRABBLE_WORDS))
+if SCRABBLE_WORDS:
     print(f"Loaded {len(SCRABBLE_WORDS)} Scrabble words into memory")
 
 
 @csrf_exempt  # ← ADD THIS LINE
 @require_http_methods(["POST"])
-def validate_word(request):
+@rate_limit('word-api')
+async def validate_word(request):
     """
     API endpoint to validate if a word is in the Scrabble dictionary
     POST /studio/api/validate-word/
     Body: {"word": "HELLO"}
     Returns: {"valid": true/false, "word": "HELLO"}
+    Async: an in-memory set lookup has no reason to tie up a worker under ASGI.
     """
     try:
         data = json.loads(request.body)
@@ -38,6 +51,7 @@ def validate_word(request):
             return JsonResponse({'error': 'No word provided'}, status=400)
         
         is_valid = word in SCRABBLE_WORDS
+        WORD_CHECKS.inc('valid' if is_valid else 'invalid')
         
         return JsonResponse({
             'valid': is_valid,
@@ -45,4 +59,134 @@ def validate_word(request):
         })
     
     except json.JSONDecodeError:
-        return JsonResponse({'error': 'Invalid JSON'}, status=400)
\ No newline at end of file
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+
+# ---------------------------------------------------------------------------
+# Real-time rooms (server-sent events). These are async views: under ASGI an
+# open event stream is a suspended coroutine, not a blocked worker.
+# ---------------------------------------------------------------------------
+
+ROOM_HEARTBEAT_SECONDS = 20
+
+
+def _room_id_ok(room_id):
+    return 0 < len(room_id) <= 40 and room_id.replace('-', '').isalnum()
+
+
+@require_http_methods(["GET"])
+@rate_limit('game-api')
+async def room_events(request, room_id):
+    """
+    Event stream for a room
+    GET /studio/api/rooms/<room_id>/events/
+    Sends the current state, replays anything after Last-Event-ID, then pushes
+    join/move events as they happen (with a heartbeat comment when idle).
+    Only joining creates a room; streaming an unknown one is a 404.
+    """
+    if not _room_id_ok(room_id):
+        return JsonResponse({'error': 'Bad room id'}, status=400)
+
+    room = rooms.get_room(room_id, create=False)
+    if room is None:
+        return JsonResponse({'error': 'No such room'}, status=404)
+    broker = rooms.get_broker()
+    queue = broker.subscribe(room_id)
+    # EventSource sends Last-Event-ID when it reconnects; a fresh stream
+    # only needs the current state. An id from before a restart can be past
+    # room.seq: newer events would then never be sent
+    try:
+        last_id = min(int(request.headers.get('Last-Event-ID', room.seq)), room.seq)
+    except ValueError:
+        last_id = room.seq
+
+    async def stream():
+        sent_id = last_id
+        try:
+            yield rooms.format_sse({'id': room.seq, 'type': 'state', 'data': room.state()})
+            for event in room.events_after(last_id):
+                sent_id = event['id']
+                yield rooms.format_sse(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), ROOM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                if event is None:
+                    break
+                if event['id'] > sent_id:  # may already have gone out in the replay
+                    sent_id = event['id']
+                    yield rooms.format_sse(event)
+        finally:
+            broker.unsubscribe(room_id, queue)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@rate_limit('game-api')
+async def room_join(request, room_id):
+    """
+    Take the next free seat
+    POST /studio/api/rooms/<room_id>/join/
+    Body: {"name": "Evelyn"}
+    Returns: {"seat": 0, "token": "...", "state": {...}}
+    """
+    if not _room_id_ok(room_id):
+        return JsonResponse({'error': 'Bad room id'}, status=400)
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'error': 'Expected a JSON object'}, status=400)
+
+    name = str(data.get('name', '')).strip()[:40] or 'Player'
+    room = rooms.get_room(room_id)
+    try:
+        seat, token, event = room.join(name)
+    except rooms.RoomError as exc:
+        return JsonResponse({'error': str(exc)}, status=409)
+
+    await rooms.get_broker().publish(room_id, event)
+    return JsonResponse({'seat': seat, 'token': token, 'state': room.state()})
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@rate_limit('game-api')
+async def room_move(request, room_id):
+    """
+    Play, pass or exchange, and push the move to everyone in the room
+    POST /studio/api/rooms/<room_id>/moves/
+    Body: {"seat": 0, "token": "...", "kind": "play", "score": 12,
+           "tiles": [{"x": 7, "y": 7, "letter": "A"}]}
+    Returns: {"seq": 5}
+    """
+    room = rooms.get_room(room_id, create=False)
+    if room is None:
+        return JsonResponse({'error': 'No such room'}, status=404)
+    try:
+        data = json.loads(request.body)
+        if not isinstance(data, dict):
+            raise TypeError('Expected a JSON object')
+        seat = int(data.get('seat', -1))
+        score = int(data.get('score', 0))
+        tiles = [
+            {'x': int(t['x']), 'y': int(t['y']), 'letter': str(t['letter'])[:1]}
+            for t in data.get('tiles', [])[:7]
+        ]
+    except (json.JSONDecodeError, TypeError, ValueError, KeyError):
+        return JsonResponse({'error': 'Invalid move'}, status=400)
+
+    try:
+        event = room.move(seat, str(data.get('token', '')), data.get('kind', 'play'), score, tiles)
+    except rooms.RoomError as exc:
+        return JsonResponse({'error': str(exc)}, status=409)
+
+    await rooms.get_broker().publish(room_id, event)
+    return JsonResponse({'seq': event['id']})